@@ -38,9 +38,9 @@ export default function Home() {
         .select('*', { count: 'exact', head: true })
         .eq('checked_in', true)
 
-      // Utiliser la vue table_status pour avoir les vrais chiffres (comme page gestion)
+      // Compteurs maintenus par triggers (table_occupancy), sans recalcul à chaque lecture
       const { data: tableStatus } = await supabase
-        .from('table_status')
+        .from('table_occupancy_status')
         .select('occupied_seats, available_seats')
         .neq('table_number', 27)  // Exclure la table enfants
 
@@ -77,9 +77,9 @@ export default function ScannerV2() {
         .from('guests')
         .select('*', { count: 'exact', head: true })
 
-      // Utiliser la vue table_status pour avoir les vrais chiffres (comme page gestion)
+      // Compteurs maintenus par triggers (table_occupancy), sans recalcul à chaque lecture
       const { data: tableStatus } = await supabase
-        .from('table_status')
+        .from('table_occupancy_status')
         .select('available_seats')
         .neq('table_number', 27)  // Exclure la table enfants
 
@@ -97,29 +97,14 @@ export default function ScannerV2() {
 
   const loadTableAvailability = async () => {
     try {
+      // Le nombre d'invités checked-in par table est inclus dans les compteurs
       const { data: tables } = await supabase
-        .from('table_status')
-        .select('table_number, table_name, color_code, color_name, available_seats, occupied_seats, capacity, is_vip')
+        .from('table_occupancy_status')
+        .select('table_number, table_name, color_code, color_name, available_seats, occupied_seats, capacity, is_vip, checked_in_count')
         .neq('table_number', 27)  // Exclure la table enfants
         .order('table_number')
 
-      // Pour chaque table, compter les invités checked-in
-      const tablesWithCheckedIn = await Promise.all(
-        (tables || []).map(async (table) => {
-          const { count } = await supabase
-            .from('seating_assignments')
-            .select('*', { count: 'exact', head: true })
-            .eq('table_id', table.table_number)
-            .eq('checked_in', true)
-
-          return {
-            ...table,
-            checked_in_count: count || 0
-          }
-        })
-      )
-
-      setTableAvailability(tablesWithCheckedIn)
+      setTableAvailability(tables || [])
     } catch (error) {
       console.error('Error loading table availability:', error)
     }
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Accès asynchrone à PostgREST: session HTTP partagée (keep-alive) et concurrence bornée
+"""
+
+import asyncio
+import os
+import time
+
+# Nombre maximal de requêtes simultanées (et de connexions gardées ouvertes)
+MAX_CONCURRENCY = 8
+
+# Nombre d'identifiants par filtre in.(...) (longueur d'URL raisonnable)
+CHUNK_SIZE = 200
+
+PAGE_SIZE = 1000
+
+RESERVED = set(',.:()"\\ ')
+
+
+def quote_value(value):
+    """Protéger une valeur de filtre PostgREST si elle contient des caractères réservés"""
+    if value is None:
+        return 'null'
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    text = str(value)
+    if any(c in RESERVED for c in text):
+        return '"' + text.replace('\\', '\\\\').replace('"', '\\"') + '"'
+    return text
+
+
+def in_filter(values):
+    """Filtre in.(a,b,c)"""
+    return f"in.({','.join(quote_value(v) for v in values)})"
+
+
+def _chunks(values, size=CHUNK_SIZE):
+    values = list(values)
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+
+class AsyncDB:
+    """Client PostgREST asynchrone partagé par les scripts de maintenance
+
+    Une seule session httpx garde les connexions ouvertes entre les requêtes ;
+    un sémaphore limite le nombre de requêtes en vol. Les filtres sont passés
+    au format PostgREST: [('id', 'in.(1,2)'), ('checked_in', 'eq.false')].
+    """
+
+    def __init__(self, url, key, max_concurrency=MAX_CONCURRENCY, transport=None, profiler=None):
+        # Import paresseux: importer ce module (execute_sql_fix, karel) ne charge pas httpx
+        import httpx
+
+        self.http = httpx.AsyncClient(
+            base_url=f"{url.rstrip('/')}/rest/v1",
+            headers={'apikey': key, 'Authorization': f'Bearer {key}'},
+            limits=httpx.Limits(max_connections=max_concurrency,
+                                max_keepalive_connections=max_concurrency),
+            timeout=30.0,
+            transport=transport,
+        )
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.profiler = profiler
+
+    @classmethod
+    def for_client(cls, client, max_concurrency=MAX_CONCURRENCY):
+        """Ouvrir une session vers le même projet qu'un client supabase existant"""
+        transport = getattr(client, 'async_transport', None)
+        url = getattr(client, 'supabase_url', None) or os.getenv('NEXT_PUBLIC_SUPABASE_URL') or 'http://localhost'
+        key = getattr(client, 'supabase_key', None) or os.getenv('NEXT_PUBLIC_SUPABASE_ANON_KEY') or ''
+        return cls(url, key, max_concurrency, transport, getattr(client, 'profiler', None))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        await self.http.aclose()
+
+    async def _get(self, table, params, headers=None):
+        async with self.semaphore:
+            start = time.perf_counter()
+            response = await self.http.get(f"/{table}", params=params, headers=headers)
+            elapsed = time.perf_counter() - start
+
+        if self.profiler is not None:
+            rows = len(response.json()) if response.is_success else 0
+            self.profiler.record(table, 'count' if headers else 'select', elapsed,
+                                 rows, len(response.content), error=not response.is_success)
+
+        response.raise_for_status()
+        return response
+
+    async def select(self, table, columns="*", filters=(), order=None, limit=None):
+        """Une requête GET; retourne la liste des lignes"""
+        params = [('select', columns.replace(' ', ''))] + list(filters)
+        if order:
+            params.append(('order', order))
+        if limit is not None:
+            params.append(('limit', str(limit)))
+        return (await self._get(table, params)).json()
+
+    async def count(self, table, filters=()):
+        """Nombre exact de lignes (en-tête Content-Range), sans les télécharger"""
+        params = [('select', 'id'), ('limit', '1')] + list(filters)
+        response = await self._get(table, params, headers={'Prefer': 'count=exact'})
+        return int(response.headers.get('content-range', '*/0').split('/')[-1])
+
+    async def select_all(self, table, columns, key='id', page_size=PAGE_SIZE):
+        """Toutes les lignes, par pages successives sur la clé (keyset)"""
+        if key not in [c.strip() for c in columns.split(',')]:
+            columns = f"{key}, {columns}"
+        rows = []
+        filters = []
+        while True:
+            page = await self.select(table, columns, filters, order=f"{key}.asc", limit=page_size)
+            rows.extend(page)
+            if len(page) < page_size:
+                return rows
+            filters = [(key, f"gt.{quote_value(page[-1][key])}")]
+
+    async def select_in(self, table, column, values, columns="*"):
+        """Remplacer N requêtes eq() par quelques in.(...) lancées en parallèle"""
+        values = sorted(set(values))
+        pages = await asyncio.gather(*(
+            self.select(table, columns, [(column, in_filter(chunk))])
+            for chunk in _chunks(values)
+        ))
+        return [row for page in pages for row in page]
+
+    async def get_guests_by_ids(self, guest_ids, columns="id, first_name, last_name"):
+        return await self.select_in('guests', 'id', guest_ids, columns)
+
+    async def get_assignments_by_guests(self, guest_ids, columns="guest_id, table_id, seat_number"):
+        return await self.select_in('seating_assignments', 'guest_id', guest_ids, columns)
+
+    async def get_assignments_by_tables(self, table_numbers, columns="guest_id, table_id, seat_number"):
+        return await self.select_in('seating_assignments', 'table_id', table_numbers, columns)
+
+    async def gather(self, *reads):
+        """Lancer des lectures indépendantes en même temps"""
+        return await asyncio.gather(*reads)
+
+
+def run_with(client, work, max_concurrency=MAX_CONCURRENCY):
+    """Exécuter `await work(db)` depuis un script synchrone"""
+    async def runner():
+        async with AsyncDB.for_client(client, max_concurrency) as db:
+            return await work(db)
+    return asyncio.run(runner())
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Banc d'essai des scripts de maintenance sur données synthétiques et faux client Supabase
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import runpy
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import types
+
+import shared_client
+from fake_supabase import FakeAPIError, FakeClient
+from synthetic_data import generate_dataset, write_plan_csv
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Scripts mesurés (nom affiché -> fichier)
+SCRIPTS = {
+    'db_manager': 'db_manager.py',
+    'fix_adechori': 'fix_adechori.py',
+    'execute_sql_fix': 'execute_sql_fix.py',
+    'fix_views': 'fix_views.py',
+    'generate-assignments': 'generate-assignments.py',
+}
+
+DEFAULT_SCALES = (1000, 10000)
+
+# Commandes dont on mesure le démarrage à froid (processus neuf)
+STARTUP_COMMANDS = (
+    ('karel --help', ['karel.py', '--help']),
+    ('karel gen-sql', ['karel.py', 'gen-sql']),
+)
+
+# Exécute la commande puis signale si le SDK supabase a été importé
+STARTUP_PROBE = """
+import runpy, sys
+sys.argv = {argv!r}
+try:
+    runpy.run_path({path!r}, run_name='__main__')
+except SystemExit:
+    pass
+print('SDK_LOADED=' + str('supabase' in sys.modules), file=sys.stderr)
+"""
+
+
+@contextlib.contextmanager
+def fake_environment(client, workdir):
+    """Brancher le faux client à la place de supabase/dotenv/postgrest
+
+    shared_client.get_client() importe le SDK à la première utilisation: on
+    lui fournit des modules de remplacement et un client partagé vierge, puis
+    on restaure l'état d'origine.
+    """
+    fakes = {
+        'supabase': types.ModuleType('supabase'),
+        'dotenv': types.ModuleType('dotenv'),
+        'postgrest': types.ModuleType('postgrest'),
+    }
+    fakes['supabase'].create_client = lambda url, key, *args, **kwargs: client
+    fakes['supabase'].Client = FakeClient
+    fakes['dotenv'].load_dotenv = lambda *args, **kwargs: True
+    fakes['postgrest'].APIError = FakeAPIError
+
+    saved_modules = {name: sys.modules.get(name) for name in fakes}
+    saved_cwd = os.getcwd()
+    saved_path = list(sys.path)
+    sys.modules.update(fakes)
+    sys.path.insert(0, ROOT)
+    os.chdir(workdir)
+    shared_client.set_client(None)
+    try:
+        yield
+    finally:
+        shared_client.set_client(None)
+        os.chdir(saved_cwd)
+        sys.path[:] = saved_path
+        for name, module in saved_modules.items():
+            if module is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = module
+
+
+def prepare_workdir(workdir, scale, seed=0):
+    """Dossier de travail: plandetable.csv à l'échelle voulue et dossier supabase/"""
+    os.makedirs(os.path.join(workdir, 'supabase'), exist_ok=True)
+    write_plan_csv(os.path.join(workdir, 'plandetable.csv'), scale, seed)
+
+
+def measure(target, client, workdir, argv=None, trace_memory=True):
+    """Exécuter un script comme __main__ et relever temps, requêtes et mémoire"""
+    client.reset_counters()
+    output = io.StringIO()
+    error = None
+    saved_argv = sys.argv
+    sys.argv = [target] + list(argv or [])
+
+    with fake_environment(client, workdir):
+        if trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(output):
+                runpy.run_path(os.path.join(ROOT, target), run_name='__main__')
+        except SystemExit:
+            pass
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+        if trace_memory:
+            tracemalloc.stop()
+
+    sys.argv = saved_argv
+    return {
+        'seconds': elapsed,
+        'round_trips': client.round_trips,
+        'rows_returned': client.rows_returned,
+        'calls': {f"{table}.{method}": n for (table, method), n in sorted(client.calls.items())},
+        'peak_memory_mb': peak / 1e6 if peak is not None else None,
+        'error': error,
+    }
+
+
+def run_benchmarks(scripts, scales, trace_memory=True, seed=0):
+    """Mesurer chaque script à chaque échelle, sur un jeu de données neuf"""
+    results = []
+    for scale in scales:
+        with tempfile.TemporaryDirectory() as workdir:
+            prepare_workdir(workdir, scale, seed)
+            for name in scripts:
+                client = FakeClient(generate_dataset(scale, seed=seed))
+                result = measure(SCRIPTS[name], client, workdir, trace_memory=trace_memory)
+                result.update({'script': name, 'scale': scale})
+                results.append(result)
+    return results
+
+
+def measure_startup(workdir, runs=5):
+    """Temps de démarrage à froid des commandes du CLI (médiane sur `runs` processus)"""
+    results = []
+    for label, argv in STARTUP_COMMANDS:
+        code = STARTUP_PROBE.format(argv=argv, path=os.path.join(ROOT, argv[0]))
+        timings = []
+        sdk_loaded = None
+        for _ in range(runs):
+            start = time.perf_counter()
+            completed = subprocess.run([sys.executable, '-c', code], cwd=workdir,
+                                       capture_output=True, text=True)
+            timings.append(time.perf_counter() - start)
+            sdk_loaded = 'SDK_LOADED=True' in completed.stderr
+        results.append({
+            'command': label,
+            'median_ms': statistics.median(timings) * 1000,
+            'min_ms': min(timings) * 1000,
+            'sdk_loaded': sdk_loaded,
+        })
+    return results
+
+
+def print_startup_report(results):
+    print(f"\n{'Commande':<22} {'Médiane (ms)':>13} {'Min (ms)':>10} {'SDK importé':>12}")
+    print("-" * 60)
+    for r in results:
+        print(f"{r['command']:<22} {r['median_ms']:>13.1f} {r['min_ms']:>10.1f} "
+              f"{'oui' if r['sdk_loaded'] else 'non':>12}")
+
+
+def print_report(results):
+    """Tableau récapitulatif"""
+    print(f"{'Script':<22} {'Invités':>9} {'Temps (s)':>10} {'Requêtes':>9} {'Lignes':>9} {'Mém. (Mo)':>10}")
+    print("-" * 74)
+    for r in results:
+        memory = f"{r['peak_memory_mb']:.1f}" if r['peak_memory_mb'] is not None else "-"
+        print(f"{r['script']:<22} {r['scale']:>9} {r['seconds']:>10.3f} {r['round_trips']:>9} "
+              f"{r['rows_returned']:>9} {memory:>10}")
+        if r['error']:
+            print(f"    ✗ {r['error']}")
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Mesurer les scripts de maintenance sans Supabase")
+    parser.add_argument('--scales', default=','.join(map(str, DEFAULT_SCALES)),
+                        help="nombres d'invités séparés par des virgules (ex: 1000,10000,1000000)")
+    parser.add_argument('--scripts', default=','.join(SCRIPTS), help="scripts à mesurer")
+    parser.add_argument('--no-memory', action='store_true', help="ne pas tracer la mémoire (plus rapide)")
+    parser.add_argument('--json', help="écrire les résultats détaillés dans ce fichier")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--startup', action='store_true', help="mesurer aussi le démarrage du CLI karel")
+    args = parser.parse_args()
+
+    scales = [int(s) for s in args.scales.split(',') if s]
+    scripts = [s for s in args.scripts.split(',') if s]
+    unknown = [s for s in scripts if s not in SCRIPTS]
+    if unknown:
+        parser.error(f"scripts inconnus: {', '.join(unknown)}")
+
+    results = run_benchmarks(scripts, scales, not args.no_memory, args.seed)
+    print_report(results)
+
+    if args.startup:
+        with tempfile.TemporaryDirectory() as workdir:
+            prepare_workdir(workdir, min(scales), args.seed)
+            startup = measure_startup(workdir)
+        print_startup_report(startup)
+        results = {'scripts': results, 'startup': startup}
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✓ Résultats écrits dans {args.json}")
+
+
+if __name__ == "__main__":
+    main()
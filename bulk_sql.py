@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Génération SQL ensembliste des assignations (une table de transit + un INSERT ... SELECT)
+"""
+
+
+def sql_literal(value):
+    """Échapper une valeur texte pour l'insérer dans du SQL"""
+    if value is None:
+        return "NULL"
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+STAGING_HEADER = """-- Script SQL généré automatiquement depuis plandetable.csv (mode ensembliste)
+-- Exécuter dans Supabase SQL Editor
+
+BEGIN;
+
+-- Table de transit avec le plan de table brut
+CREATE TEMP TABLE staging_assignments (
+    line_no INTEGER NOT NULL,
+    first_name TEXT NOT NULL,
+    last_name TEXT NOT NULL,
+    table_number INTEGER NOT NULL
+) ON COMMIT DROP;
+"""
+
+# Une seule instruction: jointure sur les noms normalisés, puis le n-ième invité
+# d'une table prend son n-ième siège libre (trous compris). Les invités au-delà
+# de la capacité ne sont pas insérés: UNPLACED les liste avant le COMMIT (la
+# table de transit disparaît ensuite)
+BULK_ASSIGN = """
+-- Assignation de tous les invités en une instruction
+INSERT INTO seating_assignments (guest_id, table_id, seat_number)
+SELECT
+    m.guest_id,
+    m.table_number,
+    f.seat
+FROM (
+    SELECT guest_id, table_number,
+           ROW_NUMBER() OVER (PARTITION BY table_number ORDER BY line_no) AS rank
+    FROM (
+        -- Un seul invité par ligne du plan, puis une seule ligne par invité
+        SELECT DISTINCT ON (guest_id) guest_id, table_number, line_no
+        FROM (
+            SELECT DISTINCT ON (s.line_no) g.id AS guest_id, s.table_number, s.line_no
+            FROM staging_assignments s
+            JOIN guests g
+              ON UPPER(TRIM(g.first_name)) = UPPER(TRIM(s.first_name))
+             AND UPPER(TRIM(g.last_name)) = UPPER(TRIM(s.last_name))
+            JOIN tables t ON t.table_number = s.table_number
+            ORDER BY s.line_no, g.id
+        ) per_line
+        ORDER BY guest_id, line_no
+    ) per_guest
+) m
+JOIN (
+    -- Sièges libres (trous compris) numérotés par table, jusqu'à la capacité
+    SELECT t.table_number, s.seat,
+           ROW_NUMBER() OVER (PARTITION BY t.table_number ORDER BY s.seat) AS rank
+    FROM tables t
+    CROSS JOIN LATERAL generate_series(1, t.capacity) AS s(seat)
+    WHERE NOT EXISTS (
+        SELECT 1 FROM seating_assignments sa
+        WHERE sa.table_id = t.table_number AND sa.seat_number = s.seat
+    )
+) f ON f.table_number = m.table_number AND f.rank = m.rank
+ON CONFLICT (guest_id) DO UPDATE
+SET table_id = EXCLUDED.table_id,
+    seat_number = EXCLUDED.seat_number;
+"""
+
+UNPLACED = """
+-- Lignes du plan restées sans place
+SELECT
+    s.line_no,
+    s.first_name,
+    s.last_name,
+    s.table_number,
+    CASE
+        WHEN NOT EXISTS (SELECT 1 FROM tables t WHERE t.table_number = s.table_number) THEN 'table inconnue'
+        WHEN NOT EXISTS (
+            SELECT 1 FROM guests g
+            WHERE UPPER(TRIM(g.first_name)) = UPPER(TRIM(s.first_name))
+              AND UPPER(TRIM(g.last_name)) = UPPER(TRIM(s.last_name))
+        ) THEN 'invité introuvable'
+        ELSE 'table pleine ou ligne en double'
+    END AS reason
+FROM staging_assignments s
+WHERE NOT EXISTS (
+    SELECT 1 FROM guests g
+    JOIN seating_assignments sa ON sa.guest_id = g.id
+    WHERE sa.table_id = s.table_number
+      AND UPPER(TRIM(g.first_name)) = UPPER(TRIM(s.first_name))
+      AND UPPER(TRIM(g.last_name)) = UPPER(TRIM(s.last_name))
+)
+ORDER BY s.line_no;
+
+COMMIT;
+"""
+
+VERIFICATION = """
+-- Vérification des résultats
+SELECT
+    t.table_number,
+    t.table_name,
+    COUNT(sa.guest_id) as guests_assigned,
+    t.capacity,
+    t.capacity - COUNT(sa.guest_id) as seats_available
+FROM tables t
+LEFT JOIN seating_assignments sa ON t.table_number = sa.table_id
+GROUP BY t.id, t.table_number, t.table_name, t.capacity
+ORDER BY t.table_number;
+"""
+
+
+def iter_bulk_sql(plan):
+    """Générer le script ensembliste morceau par morceau
+
+    `plan` est un itérable de paires (GuestRecord, table) produit par
+    csv_ingest.iter_plan: chaque ligne d'un bloc porte la table du bloc.
+    """
+    yield STAGING_HEADER
+
+    first = True
+    for record, table in plan:
+        if first:
+            yield "\nINSERT INTO staging_assignments (line_no, first_name, last_name, table_number) VALUES\n"
+        else:
+            yield ",\n"
+        yield (f"({record.line}, {sql_literal(record.first_name)}, "
+               f"{sql_literal(record.last_name)}, {int(table)})")
+        first = False
+    if not first:
+        yield ";\n"
+
+    yield BULK_ASSIGN
+    yield UNPLACED
+    yield VERIFICATION
+
+
+def generate_bulk_sql(plan):
+    """Construire le script ensembliste complet"""
+    return ''.join(iter_bulk_sql(plan))
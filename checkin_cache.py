@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Service local de check-in: réponses en mémoire, écritures différées par lots
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from shared_client import get_client
+from snapshot import iter_rows
+
+STATUS_COLUMNS = "id, first_name, last_name, qr_code, table_number, table_name, seat_number, checked_in"
+
+# Intervalle entre deux envois des check-ins en attente (secondes)
+FLUSH_INTERVAL = 5
+
+# Nombre d'invités par requête in_()
+CHUNK_SIZE = 200
+
+
+class CheckinCache:
+    """Carte qr_code -> invité/table/siège chargée depuis all_guests_status
+
+    Les check-ins sont validés en mémoire puis mis en file ; flush() les
+    envoie par lots. La file est recopiée dans `queue_path` pour survivre à
+    un redémarrage pendant une coupure réseau.
+    """
+
+    def __init__(self, client, queue_path='checkin-queue.json'):
+        self.client = client
+        self.queue_path = queue_path
+        self.by_qr = {}
+        self.pending = {}
+        self.lock = threading.Lock()
+        self._load_queue()
+
+    def load(self):
+        """Précharger tous les QR codes (une lecture paginée de la vue)"""
+        by_qr = {}
+        for row in iter_rows(self.client, 'all_guests_status', STATUS_COLUMNS):
+            if row.get('qr_code'):
+                by_qr[row['qr_code']] = row
+        with self.lock:
+            # Les check-ins encore en file restent acquis après rechargement
+            for guest in by_qr.values():
+                if guest['id'] in self.pending:
+                    guest['checked_in'] = True
+            self.by_qr = by_qr
+        return len(by_qr)
+
+    def check_in(self, qr_code):
+        """Enregistrer un invité; même forme de réponse que check_in_guest_by_qr"""
+        with self.lock:
+            guest = self.by_qr.get(qr_code)
+            if guest is None:
+                raise KeyError('Invalid QR code')
+
+            already_checked_in = bool(guest.get('checked_in'))
+            if not already_checked_in:
+                guest['checked_in'] = True
+                self.pending[guest['id']] = datetime.now(timezone.utc).isoformat(timespec='seconds')
+                self._save_queue()
+
+            return {
+                'guest_id': guest['id'],
+                'guest_name': f"{guest['first_name']} {guest['last_name']}",
+                'table_number': guest.get('table_number'),
+                'table_name': guest.get('table_name'),
+                'seat_number': guest.get('seat_number'),
+                'already_checked_in': already_checked_in
+            }
+
+    def flush(self):
+        """Envoyer les check-ins en attente; retourne le nombre envoyé
+
+        Les mises à jour filtrent sur checked_in = false: rejouer un lot déjà
+        appliqué ne change rien (idempotent). En cas d'erreur réseau, les
+        check-ins restent en file pour le prochain essai.
+        """
+        with self.lock:
+            batch = dict(self.pending)
+        if not batch:
+            return 0
+
+        by_time = {}
+        for guest_id, checked_in_at in batch.items():
+            by_time.setdefault(checked_in_at, []).append(guest_id)
+
+        for checked_in_at, guest_ids in sorted(by_time.items()):
+            values = {'checked_in': True, 'checked_in_at': checked_in_at}
+            for i in range(0, len(guest_ids), CHUNK_SIZE):
+                chunk = guest_ids[i:i + CHUNK_SIZE]
+                self.client.table('guests').update(values) \
+                    .in_('id', chunk).eq('checked_in', False).execute()
+                self.client.table('seating_assignments').update(values) \
+                    .in_('guest_id', chunk).eq('checked_in', False).execute()
+
+        with self.lock:
+            for guest_id, checked_in_at in batch.items():
+                if self.pending.get(guest_id) == checked_in_at:
+                    del self.pending[guest_id]
+            self._save_queue()
+        return len(batch)
+
+    def _load_queue(self):
+        if self.queue_path and os.path.exists(self.queue_path):
+            with open(self.queue_path, 'r', encoding='utf-8') as f:
+                # Les clés JSON sont du texte: rendre leur type aux identifiants entiers
+                self.pending = {int(k) if k.isdigit() else k: v for k, v in json.load(f).items()}
+
+    def _save_queue(self):
+        if not self.queue_path:
+            return
+        tmp_path = self.queue_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.pending, f)
+        os.replace(tmp_path, self.queue_path)
+
+
+def flush_loop(cache, interval=FLUSH_INTERVAL, stop=None):
+    """Envoyer la file périodiquement, sans jamais interrompre le service"""
+    stop = stop or threading.Event()
+    while not stop.wait(interval):
+        try:
+            sent = cache.flush()
+            if sent:
+                print(f"✓ {sent} check-ins synchronisés")
+        except Exception as e:
+            print(f"⚠️  Synchronisation impossible ({len(cache.pending)} en attente): {e}")
+
+
+def make_handler(cache):
+    """Handler HTTP: POST /check-in {"qr_code": ...}, GET /health
+
+    Le scanner est servi depuis une autre origine: le POST JSON est précédé
+    d'une requête OPTIONS (CORS) à laquelle do_OPTIONS répond.
+    """
+
+    class CheckinHandler(BaseHTTPRequestHandler):
+        def _reply(self, status, payload):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_OPTIONS(self):
+            self.send_response(204)
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
+            self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+            self.send_header('Access-Control-Max-Age', '86400')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+        def do_GET(self):
+            if self.path == '/health':
+                self._reply(200, {'guests': len(cache.by_qr), 'pending': len(cache.pending)})
+            else:
+                self._reply(404, {'error': 'Not found'})
+
+        def do_POST(self):
+            if self.path != '/check-in':
+                self._reply(404, {'error': 'Not found'})
+                return
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                qr_code = json.loads(self.rfile.read(length) or b'{}').get('qr_code')
+                self._reply(200, cache.check_in(qr_code))
+            except KeyError as e:
+                self._reply(404, {'error': e.args[0]})
+            except (ValueError, AttributeError):
+                self._reply(400, {'error': 'Invalid request'})
+
+        def log_message(self, format, *args):
+            pass
+
+    return CheckinHandler
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Service local de check-in avec écritures différées")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8787)
+    parser.add_argument('--interval', type=float, default=FLUSH_INTERVAL, help="secondes entre deux synchronisations")
+    parser.add_argument('--queue', default='checkin-queue.json', help="fichier de la file locale")
+    args = parser.parse_args()
+
+    client = get_client()
+
+    cache = CheckinCache(client, args.queue)
+    start = time.perf_counter()
+    count = cache.load()
+    print(f"✓ {count} QR codes chargés en {time.perf_counter() - start:.2f}s")
+    if cache.pending:
+        print(f"⚠️  {len(cache.pending)} check-ins en attente de synchronisation")
+
+    stop = threading.Event()
+    threading.Thread(target=flush_loop, args=(cache, args.interval, stop), daemon=True).start()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(cache))
+    print(f"Service de check-in sur http://{args.host}:{args.port}/check-in")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        server.server_close()
+        try:
+            cache.flush()
+        except Exception as e:
+            print(f"⚠️  {len(cache.pending)} check-ins restent en file ({args.queue}): {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Modèle en colonnes (tableaux NumPy) des invités, tables et assignations, avec agrégats vectorisés
+"""
+
+import sys
+from array import array
+
+import numpy as np
+
+from snapshot import PAGE_SIZE, iter_rows
+
+COLUMNAR_GUEST_COLUMNS = "id, first_name, last_name, checked_in"
+COLUMNAR_ASSIGNMENT_COLUMNS = "id, guest_id, table_id, seat_number, checked_in"
+COLUMNAR_TABLE_COLUMNS = "id, table_number, capacity"
+
+
+class StringPool:
+    """Chaînes internées: chaque nom distinct est stocké une fois, les lignes gardent un code int32"""
+
+    def __init__(self):
+        self.values = []
+        self._codes = {}
+
+    def code(self, value):
+        value = value or ""
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.values.append(sys.intern(value))
+            self._codes[value] = code
+        return code
+
+    def __getitem__(self, code):
+        return self.values[code]
+
+    def __len__(self):
+        return len(self.values)
+
+
+class ColumnarModel:
+    """Invités, assignations et tables sous forme de colonnes
+
+    Les lignes sont accumulées dans des array.array compacts pendant la
+    lecture paginée, puis exposées en tableaux NumPy: aucun dict par ligne
+    n'est conservé.
+    """
+
+    def __init__(self):
+        self.names = StringPool()
+
+        self.guest_ids = np.empty(0, dtype=np.int64)
+        self.guest_first = np.empty(0, dtype=np.int32)
+        self.guest_last = np.empty(0, dtype=np.int32)
+        self.guest_checked_in = np.empty(0, dtype=bool)
+
+        self.assignment_guest_ids = np.empty(0, dtype=np.int64)
+        self.assignment_tables = np.empty(0, dtype=np.int32)
+        self.assignment_seats = np.empty(0, dtype=np.int32)
+        self.assignment_checked_in = np.empty(0, dtype=bool)
+
+        self.table_numbers = np.empty(0, dtype=np.int32)
+        self.table_capacities = np.empty(0, dtype=np.int32)
+
+    @classmethod
+    def load(cls, client, page_size=PAGE_SIZE):
+        """Construire le modèle en trois lectures paginées"""
+        model = cls()
+        model.load_guests(iter_rows(client, 'guests', COLUMNAR_GUEST_COLUMNS, page_size))
+        model.load_assignments(iter_rows(client, 'seating_assignments', COLUMNAR_ASSIGNMENT_COLUMNS, page_size))
+        model.load_tables(iter_rows(client, 'tables', COLUMNAR_TABLE_COLUMNS, page_size))
+        return model
+
+    def load_guests(self, rows):
+        ids, first, last, checked_in = array('q'), array('i'), array('i'), array('b')
+        for row in rows:
+            ids.append(row['id'])
+            first.append(self.names.code(row['first_name']))
+            last.append(self.names.code(row['last_name']))
+            checked_in.append(bool(row.get('checked_in')))
+        self.guest_ids = np.frombuffer(ids, dtype=np.int64)
+        self.guest_first = np.frombuffer(first, dtype=np.int32)
+        self.guest_last = np.frombuffer(last, dtype=np.int32)
+        self.guest_checked_in = np.frombuffer(checked_in, dtype=np.int8).astype(bool)
+
+    def load_assignments(self, rows):
+        guest_ids, tables, seats, checked_in = array('q'), array('i'), array('i'), array('b')
+        for row in rows:
+            guest_ids.append(row['guest_id'])
+            tables.append(row['table_id'])
+            seats.append(row['seat_number'])
+            checked_in.append(bool(row.get('checked_in')))
+        self.assignment_guest_ids = np.frombuffer(guest_ids, dtype=np.int64)
+        self.assignment_tables = np.frombuffer(tables, dtype=np.int32)
+        self.assignment_seats = np.frombuffer(seats, dtype=np.int32)
+        self.assignment_checked_in = np.frombuffer(checked_in, dtype=np.int8).astype(bool)
+
+    def load_tables(self, rows):
+        numbers, capacities = array('i'), array('i')
+        for row in rows:
+            numbers.append(row['table_number'])
+            capacities.append(row['capacity'] or 0)
+        self.table_numbers = np.frombuffer(numbers, dtype=np.int32)
+        self.table_capacities = np.frombuffer(capacities, dtype=np.int32)
+
+    def nbytes(self):
+        """Mémoire occupée par les colonnes (hors chaînes internées)"""
+        return sum(getattr(self, name).nbytes for name in vars(self) if isinstance(getattr(self, name), np.ndarray))
+
+    def guest(self, position):
+        """Reconstituer un invité (dict) à partir de sa position"""
+        return {
+            'id': int(self.guest_ids[position]),
+            'first_name': self.names[self.guest_first[position]],
+            'last_name': self.names[self.guest_last[position]],
+        }
+
+    # Agrégats vectorisés
+
+    def occupancy(self):
+        """(numéros de table, nombre d'invités assignés), triés par table"""
+        return np.unique(self.assignment_tables, return_counts=True)
+
+    def checkin_by_table(self):
+        """Par table: numéros, assignés, présents et taux de présence"""
+        tables, inverse = np.unique(self.assignment_tables, return_inverse=True)
+        occupied = np.bincount(inverse, minlength=len(tables))
+        checked_in = np.bincount(inverse, weights=self.assignment_checked_in, minlength=len(tables)).astype(np.int64)
+        rate = np.divide(checked_in, occupied, out=np.zeros(len(tables)), where=occupied > 0)
+        return tables, occupied, checked_in, rate
+
+    def unassigned_mask(self):
+        """Masque booléen des invités sans assignation"""
+        return np.isin(self.guest_ids, self.assignment_guest_ids, invert=True)
+
+    def free_seats(self):
+        """Par table connue: numéros, capacité, assignés et places libres"""
+        tables, counts = self.occupancy()
+        occupied = np.zeros(len(self.table_numbers), dtype=np.int64)
+        positions = np.searchsorted(tables, self.table_numbers)
+        found = positions < len(tables)
+        found[found] = tables[positions[found]] == self.table_numbers[found]
+        occupied[found] = counts[positions[found]]
+        return self.table_numbers, self.table_capacities, occupied, self.table_capacities - occupied
+
+    def assignment_snapshot(self, sample_size=10):
+        """Mêmes agrégats que snapshot.load_assignment_snapshot"""
+        tables, counts = self.occupancy()
+        unassigned = np.flatnonzero(self.unassigned_mask())
+        return {
+            'total_guests': int(len(self.guest_ids)),
+            'total_assignments': int(len(self.assignment_tables)),
+            'unassigned_count': int(len(unassigned)),
+            'unassigned_sample': [self.guest(i) for i in unassigned[:sample_size]],
+            'tables_with_guests': dict(zip(tables.tolist(), counts.tolist()))
+        }
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Lecture en flux du plan de table CSV (plandetable.csv)
+"""
+
+import csv
+from typing import NamedTuple, Optional, Tuple
+
+# Numéro de la table des enfants (libellé "TABLE ENFANT" dans le CSV)
+CHILDREN_TABLE = 27
+
+
+class GuestRecord(NamedTuple):
+    """Une ligne invitée du plan de table"""
+    line: int
+    last_name: str
+    first_name: str
+    email: str
+    events: Tuple[str, ...]
+    table: Optional[int]
+
+
+def parse_events(fields):
+    """Extraire la liste d'événements répartie sur plusieurs colonnes
+
+    L'export écrit la liste sous la forme ["A", B, C] éclatée en colonnes.
+    """
+    events = []
+    for field in fields:
+        event = field.strip().strip('[]').strip().strip('"').strip()
+        if event:
+            events.append(event)
+    return tuple(events)
+
+
+def parse_table(value):
+    """Convertir la dernière colonne en numéro de table (None si vide)"""
+    value = value.strip()
+    if not value:
+        return None
+    if value.upper() == "TABLE ENFANT":
+        return CHILDREN_TABLE
+    if value.isdigit():
+        return int(value)
+    raise ValueError(f"numéro de table invalide: {value!r}")
+
+
+def iter_guest_records(path='plandetable.csv', rejects=None):
+    """Générer les invités du CSV un par un, en mémoire constante
+
+    Les champs entre guillemets (retours à la ligne, virgules) sont gérés par
+    le lecteur csv. Les lignes rejetées sont ajoutées à `rejects` sous la
+    forme (numéro de ligne, raison, ligne brute).
+    """
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        line = 1
+        for row in reader:
+            start_line, line = line, reader.line_num + 1
+
+            # Ignorer les lignes vides
+            if not any(field.strip() for field in row):
+                continue
+
+            if len(row) < 2:
+                if rejects is not None:
+                    rejects.append((start_line, "colonnes manquantes", row))
+                continue
+
+            last_name = row[0].strip()
+            first_name = row[1].strip()
+            if not last_name or not first_name:
+                if rejects is not None:
+                    rejects.append((start_line, "nom ou prénom manquant", row))
+                continue
+
+            try:
+                table = parse_table(row[-1]) if len(row) > 3 else None
+            except ValueError as e:
+                if rejects is not None:
+                    rejects.append((start_line, str(e), row))
+                continue
+
+            yield GuestRecord(
+                line=start_line,
+                last_name=last_name,
+                first_name=first_name,
+                email=row[2].strip() if len(row) > 2 else "",
+                events=parse_events(row[3:-1]),
+                table=table
+            )
+
+
+def iter_plan(records):
+    """Associer chaque invité du CSV à sa table
+
+    Le numéro n'apparaît que sur la première ligne d'un bloc de table ; les
+    lignes suivantes du bloc héritent du dernier numéro rencontré. Tous les
+    modes de generate-assignments.py partent de ce plan.
+    """
+    table = None
+    for record in records:
+        if record.table is not None:
+            table = record.table
+        if table is not None:
+            yield record, table
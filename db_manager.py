@@ -3,62 +3,67 @@
 Script pour gérer directement la base de données Supabase
 """
 
-import os
-from dotenv import load_dotenv
-from supabase import create_client, Client
+import argparse
 import json
 
-# Charger les variables d'environnement
-load_dotenv('.env.local')
+from local_mirror import LocalMirror
+from mutations import BulkMutation
+from name_index import NameIndex
+from profiling import add_profile_arguments, report
+from reconcile import reconcile_assignments
+from seat_allocator import SeatAllocator
+from shared_client import enable_profiling, get_client
+from snapshot import GUEST_COLUMNS, iter_rows, load_assignment_snapshot
 
-# Configuration Supabase
-url = os.getenv('NEXT_PUBLIC_SUPABASE_URL')
-key = os.getenv('NEXT_PUBLIC_SUPABASE_ANON_KEY')
-
-# Créer le client Supabase
-supabase: Client = create_client(url, key)
-
-def check_assignments():
+def check_assignments(mirror=None, columnar=False):
     """Vérifier l'état des assignations"""
+    supabase = get_client()
     print("\n=== ÉTAT DES ASSIGNATIONS ===")
 
-    # Compter les invités
-    guests = supabase.table('guests').select("*").execute()
-    print(f"Total invités: {len(guests.data)}")
-
-    # Compter les assignations
-    assignments = supabase.table('seating_assignments').select("*").execute()
-    print(f"Total assignations: {len(assignments.data)}")
+    if columnar:
+        # Colonnes NumPy et agrégats vectorisés (gros volumes)
+        from columnar import ColumnarModel
+        model = ColumnarModel.load(supabase)
+        snapshot = model.assignment_snapshot()
+    elif mirror is not None:
+        # Ne télécharger que les lignes modifiées, puis agréger localement
+        for stats in mirror.sync(supabase):
+            print(f"Synchro {stats['table']} ({stats['mode']}): "
+                  f"{stats['fetched']} lignes reçues, {stats['deleted']} supprimées")
+        snapshot = mirror.assignment_snapshot()
+    else:
+        # Charger les agrégats page par page (colonnes utiles uniquement)
+        snapshot = load_assignment_snapshot(supabase)
+    print(f"Total invités: {snapshot['total_guests']}")
+    print(f"Total assignations: {snapshot['total_assignments']}")
 
     # Tables avec invités
-    tables_with_guests = {}
-    for assignment in assignments.data:
-        table_id = assignment['table_id']
-        if table_id not in tables_with_guests:
-            tables_with_guests[table_id] = 0
-        tables_with_guests[table_id] += 1
+    tables_with_guests = snapshot['tables_with_guests']
 
     print(f"\n=== RÉPARTITION PAR TABLE ===")
     for table_num in sorted(tables_with_guests.keys()):
         print(f"Table {table_num}: {tables_with_guests[table_num]} invités")
 
-    # Invités non assignés
-    assigned_guest_ids = {a['guest_id'] for a in assignments.data}
-    unassigned_guests = [g for g in guests.data if g['id'] not in assigned_guest_ids]
+    if columnar:
+        print("\n=== PRÉSENCE PAR TABLE ===")
+        for table_num, occupied, checked_in, rate in zip(*model.checkin_by_table()):
+            print(f"Table {table_num}: {checked_in}/{occupied} présents ({rate:.0%})")
 
-    print(f"\n=== INVITÉS NON ASSIGNÉS ({len(unassigned_guests)}) ===")
-    for guest in unassigned_guests[:10]:  # Afficher les 10 premiers
+    # Invités non assignés
+    print(f"\n=== INVITÉS NON ASSIGNÉS ({snapshot['unassigned_count']}) ===")
+    for guest in snapshot['unassigned_sample']:  # Afficher les 10 premiers
         print(f"- {guest['first_name']} {guest['last_name']}")
 
     return {
-        'total_guests': len(guests.data),
-        'total_assignments': len(assignments.data),
-        'unassigned_count': len(unassigned_guests),
+        'total_guests': snapshot['total_guests'],
+        'total_assignments': snapshot['total_assignments'],
+        'unassigned_count': snapshot['unassigned_count'],
         'tables_with_guests': tables_with_guests
     }
 
 def execute_sql(query):
     """Exécuter une requête SQL directement"""
+    supabase = get_client()
     try:
         result = supabase.rpc('sql', {'query': query}).execute()
         return result.data
@@ -67,21 +72,49 @@ def execute_sql(query):
         # Alternative: utiliser les méthodes du SDK
         return None
 
-def fix_missing_assignments():
+# Les invités qui doivent être assignés selon les screenshots
+MISSING_ASSIGNMENTS = [
+    ('Anne', 'DAHO', 4),  # Anne DAHO existe comme "Anne DAHO Daho"
+    ('Iradatou', 'ADECHORI', 1),
+    ('Werner', 'Kiefer', 8),
+    ('Gwladys', 'Mazamba', 20),
+    ('Gisèle Valérie', 'SAIH', 20),
+    ('Marie Adéla', 'FONANT', 18),
+]
+
+def fix_missing_assignments(batch=True):
     """Assigner les invités manquants"""
+    supabase = get_client()
     print("\n=== CORRECTION DES INVITÉS MANQUANTS ===")
 
-    # Les invités qui doivent être assignés selon les screenshots
-    missing_assignments = [
-        ('Anne', 'DAHO', 4),  # Anne DAHO existe comme "Anne DAHO Daho"
-        ('Iradatou', 'ADECHORI', 1),
-        ('Werner', 'Kiefer', 8),
-        ('Gwladys', 'Mazamba', 20),
-        ('Gisèle Valérie', 'SAIH', 20),
-        ('Marie Adéla', 'FONANT', 18),
-    ]
-
-    for first_name, last_name, table_num in missing_assignments:
+    if batch:
+        # Mode groupé: nombre constant de requêtes quel que soit le nombre d'invités
+        try:
+            # Index des noms construit une fois (accents, casse et espaces ignorés)
+            index = NameIndex(iter_rows(supabase, 'guests', GUEST_COLUMNS))
+            mutation = BulkMutation(supabase, 'fix-missing')
+            report = reconcile_assignments(supabase, MISSING_ASSIGNMENTS, index, mutation)
+            mutation.apply()
+        except Exception as e:
+            print(f"✗ Erreur lors de la réconciliation groupée: {e}")
+            return
+
+        for first_name, last_name, table_num in report['assigned']:
+            print(f"✓ Assigné {first_name} {last_name} à la table {table_num}")
+        for first_name, last_name in report['already_assigned']:
+            print(f"- {first_name} {last_name} déjà assigné")
+        for first_name, last_name in report['not_found']:
+            print(f"✗ Invité non trouvé: {first_name} {last_name}")
+        for first_name, last_name, table_num in report['table_full']:
+            print(f"✗ Table {table_num} complète, {first_name} {last_name} non assigné")
+        for first_name, last_name, table_num, guest, method in report['uncertain']:
+            print(f"⚠️  Correspondance incertaine ({method}): {first_name} {last_name} -> "
+                  f"{guest['first_name']} {guest['last_name']}, non assigné à la table {table_num}")
+        if mutation.path:
+            print(f"Journal: {mutation.path} (annulation: python mutations.py --undo last)")
+        return
+
+    for first_name, last_name, table_num in MISSING_ASSIGNMENTS:
         try:
             # Chercher l'invité
             guest_result = supabase.table('guests').select("*").eq('first_name', first_name).execute()
@@ -98,16 +131,20 @@ def fix_missing_assignments():
                 existing = supabase.table('seating_assignments').select("*").eq('guest_id', guest_id).execute()
 
                 if not existing.data:
-                    # Trouver le prochain siège
-                    seats = supabase.table('seating_assignments').select("seat_number").eq('table_id', table_num).execute()
-                    next_seat = max([s['seat_number'] for s in seats.data], default=0) + 1
+                    # Trouver le plus petit siège libre (dans la limite de la capacité)
+                    table = supabase.table('tables').select("capacity").eq('table_number', table_num).execute()
+                    capacities = {table_num: table.data[0]['capacity'] or 10} if table.data else {}
+                    seats = supabase.table('seating_assignments').select("guest_id, table_id, seat_number").eq('table_id', table_num).execute()
+                    next_seat = SeatAllocator(capacities, seats.data).allocate(table_num)
+                    if next_seat is None:
+                        print(f"✗ Table {table_num} complète, {first_name} {last_name} non assigné")
+                        continue
 
                     # Créer l'assignation
                     assignment = {
                         'guest_id': guest_id,
                         'table_id': table_num,
                         'seat_number': next_seat,
-                        'qr_code': f'WEDDING-{guest_id}-TABLE{table_num}',
                         'checked_in': False
                     }
 
@@ -121,12 +158,12 @@ def fix_missing_assignments():
         except Exception as e:
             print(f"✗ Erreur pour {first_name} {last_name}: {e}")
 
-def main():
+def main(mirror=None, columnar=False):
     """Fonction principale"""
     print("=== GESTIONNAIRE DE BASE DE DONNÉES WEDDING ===")
 
     # Vérifier l'état actuel
-    stats = check_assignments()
+    stats = check_assignments(mirror, columnar)
 
     # Si des invités ne sont pas assignés, les corriger automatiquement
     if stats['unassigned_count'] > 0:
@@ -135,7 +172,22 @@ def main():
         fix_missing_assignments()
         # Revérifier
         print("\n=== VÉRIFICATION APRÈS CORRECTION ===")
-        check_assignments()
+        check_assignments(mirror, columnar)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Gestionnaire de base de données du mariage")
+    # Le rapport en colonnes lit toujours Supabase: pas de combinaison avec le miroir
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--local', action='store_true',
+                        help="rapport calculé sur le miroir SQLite local (synchronisation incrémentale)")
+    source.add_argument('--columnar', action='store_true',
+                        help="rapport calculé en colonnes NumPy (gros volumes, nécessite numpy)")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    # Instrumenter le client pour compter et chronométrer chaque requête
+    profiler = enable_profiling() if args.profile or args.profile_json else None
+
+    mirror = LocalMirror() if args.local else None
+    main(mirror, args.columnar)
+    report(profiler, args)
\ No newline at end of file
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Détection et fusion des invités en double (généralise fix_adechori.py)
+"""
+
+import argparse
+import re
+
+from mutations import BulkMutation
+from name_index import name_tokens, normalize_name, trigrams
+from shared_client import get_client
+from snapshot import iter_rows
+
+# Nombre de voisins comparés dans chaque bloc trié
+WINDOW = 5
+
+# Similarité minimale des trigrammes pour considérer deux noms identiques
+SIMILARITY = 0.8
+
+# Chiffres minimum pour comparer deux téléphones (numéro local sans indicatif)
+PHONE_MIN_DIGITS = 8
+
+# Mots qui désignent une personne rattachée (accompagnant, enfant, conjoint)
+ROLE_MARKERS = ('accompagnant', 'enfant', 'epouse', 'epoux')
+
+DEDUP_GUEST_COLUMNS = "id, first_name, last_name, email, phone, checked_in"
+
+# Force d'une correspondance (same_person): seules les deux premières
+# fusionnent automatiquement
+SAME_NAME = 'nom'
+SAME_CONTACT = 'contact'
+PROBABLE = 'probable'
+
+
+def load_guests(client):
+    """Charger les invités et l'état de leur assignation"""
+    assigned = {}
+    for row in iter_rows(client, 'seating_assignments', "guest_id, checked_in"):
+        assigned[row['guest_id']] = bool(row.get('checked_in'))
+
+    guests = []
+    for guest in iter_rows(client, 'guests', DEDUP_GUEST_COLUMNS):
+        guest['assigned'] = guest['id'] in assigned
+        guest['checked_in'] = bool(guest.get('checked_in')) or assigned.get(guest['id'], False)
+        guests.append(guest)
+    return guests
+
+
+def _full_name(guest):
+    return f"{guest.get('first_name') or ''} {guest.get('last_name') or ''}"
+
+
+def surname_key(guest):
+    """Clé de bloc: dernier mot du nom de famille normalisé"""
+    tokens = normalize_name(guest.get('last_name')).split()
+    return tokens[-1] if tokens else ""
+
+
+def email_key(guest):
+    """Clé de bloc: e-mail normalisé"""
+    return (guest.get('email') or "").strip().casefold()
+
+
+def phone_key(guest):
+    """Téléphone réduit à ses chiffres"""
+    return re.sub(r'\D', '', guest.get('phone') or "")
+
+
+def same_contact(a, b):
+    """Même e-mail, ou même téléphone à l'indicatif près (8 chiffres au moins)"""
+    if email_key(a) and email_key(a) == email_key(b):
+        return True
+    short, long_ = sorted((phone_key(a), phone_key(b)), key=len)
+    return len(short) >= PHONE_MIN_DIGITS and long_.endswith(short)
+
+
+def _role_tokens(tokens):
+    return {t for t in tokens if t.isdigit() or t.startswith(ROLE_MARKERS)}
+
+
+def same_person(a, b):
+    """Deux fiches désignent-elles la même personne ? SAME_NAME, SAME_CONTACT, PROBABLE ou None
+
+    Un ménage partage souvent un e-mail (les deux Kalou) : le nom doit donc
+    toujours correspondre. Mêmes mots normalisés: SAME_NAME. Inclusion des
+    mots ("Karimou ADECHORI" et "Iradatou Karimou ADECHORI") ou trigrammes
+    très proches: SAME_CONTACT si l'e-mail ou le téléphone concorde, sinon
+    PROBABLE ("Jean Dupont" et "Jean Pierre Dupont" peuvent être deux
+    personnes), à vérifier à la main. Un nom de substitution ("Epouse Kalou",
+    "Enfant 1 NGANGA") peut désigner plusieurs personnes: même identique, il
+    ne fusionne qu'avec un contact concordant.
+    """
+    tokens_a, tokens_b = name_tokens(_full_name(a)), name_tokens(_full_name(b))
+    if not tokens_a or not tokens_b:
+        return None
+
+    # "Enfant 1" et "Enfant 2", ou "X" et "X accompagnant", restent distincts
+    roles = _role_tokens(tokens_a)
+    if roles != _role_tokens(tokens_b):
+        return None
+
+    if tokens_a == tokens_b and not roles:
+        return SAME_NAME
+
+    small, large = sorted((tokens_a, tokens_b), key=len)
+    close = len(small) >= 2 and small <= large
+    if not close:
+        grams_a, grams_b = trigrams(_full_name(a)), trigrams(_full_name(b))
+        common = len(grams_a & grams_b)
+        close = common / (len(grams_a) + len(grams_b) - common) >= SIMILARITY
+    if not close:
+        return None
+    return SAME_CONTACT if same_contact(a, b) else PROBABLE
+
+
+def find_duplicate_groups(guests, window=WINDOW, probable=None):
+    """Regrouper les doublons par voisinage trié dans chaque bloc
+
+    Chaque passe (nom de famille, e-mail) trie les fiches une fois puis ne
+    compare que les `window` voisins du même bloc: O(n log n) au lieu de O(n²).
+    Seules les correspondances SAME_NAME et SAME_CONTACT regroupent; les
+    paires PROBABLE sont ajoutées à la liste `probable` sans être fusionnées.
+    """
+    parent = {g['id']: g['id'] for g in guests}
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for block_key in (surname_key, email_key):
+        keyed = [(block_key(g), normalize_name(_full_name(g)), g) for g in guests]
+        keyed = [item for item in keyed if item[0]]
+        keyed.sort(key=lambda item: (item[0], item[1]))
+
+        for i, (key, _, guest) in enumerate(keyed):
+            for other_key, _, other in keyed[i + 1:i + window]:
+                if other_key != key:
+                    break
+                match = same_person(guest, other)
+                if match == PROBABLE:
+                    if probable is not None and find(guest['id']) != find(other['id']):
+                        probable.append((guest, other))
+                elif match is not None:
+                    parent[find(guest['id'])] = find(other['id'])
+
+    groups = {}
+    by_id = {g['id']: g for g in guests}
+    for guest_id in parent:
+        groups.setdefault(find(guest_id), []).append(by_id[guest_id])
+    return [group for group in groups.values() if len(group) > 1]
+
+
+def survivor_rank(guest):
+    """Ordre de préférence: enregistré, puis assigné, puis nom le plus complet, puis plus ancien"""
+    return (
+        not guest['checked_in'],
+        not guest['assigned'],
+        -len(name_tokens(_full_name(guest))),
+        guest['id']
+    )
+
+
+def plan_merges(groups):
+    """Choisir le survivant de chaque groupe: [(survivant, [doublons])]"""
+    merges = []
+    for group in groups:
+        ranked = sorted(group, key=survivor_rank)
+        merges.append((ranked[0], ranked[1:]))
+    return merges
+
+
+def apply_merges(client, merges):
+    """Supprimer les doublons (assignations puis invités) en une correction journalisée
+
+    Retourne (nombre supprimé, chemin du journal pour mutations.py --undo).
+    """
+    to_delete = sorted(g['id'] for _, duplicates in merges for g in duplicates)
+    mutation = BulkMutation(client, 'dedup')
+    mutation.delete('seating_assignments', 'guest_id', to_delete)
+    mutation.delete('guests', 'id', to_delete)
+    mutation.apply()
+    return len(to_delete), mutation.path
+
+
+def main(argv=None):
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Détecter et fusionner les invités en double")
+    parser.add_argument('--apply', action='store_true', help="supprimer réellement les doublons")
+    parser.add_argument('--window', type=int, default=WINDOW, help="taille de la fenêtre de comparaison")
+    args = parser.parse_args(argv)
+
+    client = get_client()
+
+    print("=== DÉTECTION DES DOUBLONS ===\n")
+    guests = load_guests(client)
+    probable = []
+    merges = plan_merges(find_duplicate_groups(guests, args.window, probable))
+    print(f"{len(guests)} invités analysés, {len(merges)} groupes de doublons\n")
+
+    for survivor, duplicates in merges:
+        print(f"✓ Garder {survivor['first_name']} {survivor['last_name']} (ID: {survivor['id']})")
+        for guest in duplicates:
+            print(f"   - Supprimer {guest['first_name']} {guest['last_name']} (ID: {guest['id']})")
+
+    for a, b in probable:
+        print(f"⚠️  À vérifier (noms proches, contact différent): {a['first_name']} {a['last_name']} "
+              f"(ID: {a['id']}) / {b['first_name']} {b['last_name']} (ID: {b['id']})")
+
+    if not args.apply:
+        print("\nMode simulation: relancer avec --apply pour supprimer les doublons")
+        return
+
+    deleted, path = apply_merges(client, merges)
+    print(f"\n✅ {deleted} doublons supprimés")
+    if path:
+        print(f"Journal: {path} (annulation: python mutations.py --undo last)")
+
+
+if __name__ == "__main__":
+    main()
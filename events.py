@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Événements suivis par invité (colonne RSVP du CSV) sous forme de masque de bits, et index des effectifs
+"""
+
+import argparse
+
+from csv_ingest import iter_guest_records
+from name_index import SAFE_MATCHES, normalize_name
+from snapshot import iter_rows
+
+# Un bit par événement, dans l'ordre de la liste du formulaire RSVP
+CIVIL = 1
+RELIGIOUS = 2
+RECEPTION = 4
+
+EVENTS = (
+    (CIVIL, 'civil', "Le mariage civil"),
+    (RELIGIOUS, 'religieux', "Le mariage religieux et le vin d'honneur"),
+    (RECEPTION, 'reception', "La réception (soirée dansante)"),
+)
+
+ALL_EVENTS = CIVIL | RELIGIOUS | RECEPTION
+
+# Libellé normalisé (accents, casse, espaces) -> bit
+EVENT_BITS = {normalize_name(label): bit for bit, _, label in EVENTS}
+
+EVENT_GUEST_COLUMNS = "id, first_name, last_name, events_mask"
+
+
+def event_mask(events, unknown=None):
+    """Masque d'une liste de libellés; les libellés inconnus sont ajoutés à `unknown`"""
+    mask = 0
+    for event in events:
+        bit = EVENT_BITS.get(normalize_name(event))
+        if bit is None:
+            if unknown is not None:
+                unknown.append(event)
+            continue
+        mask |= bit
+    return mask
+
+
+def mask_keys(mask):
+    """Noms courts des événements d'un masque, ex: ('civil', 'reception')"""
+    return tuple(key for bit, key, _ in EVENTS if mask & bit)
+
+
+class EventIndex:
+    """Effectifs par combinaison d'événements
+
+    Un compteur par valeur de masque (2^3 = 8 combinaisons) et l'ensemble
+    des invités de chaque combinaison: un effectif se lit en sommant au plus
+    huit compteurs, sans parcourir les invités.
+    """
+
+    def __init__(self, masks=()):
+        self.counts = [0] * (ALL_EVENTS + 1)
+        self.members = [set() for _ in range(ALL_EVENTS + 1)]
+        self.mask_of = {}
+        for guest_id, mask in masks:
+            self.set(guest_id, mask)
+
+    def __len__(self):
+        return len(self.mask_of)
+
+    def set(self, guest_id, mask):
+        """Ajouter un invité ou changer son masque"""
+        self.remove(guest_id)
+        mask &= ALL_EVENTS
+        self.mask_of[guest_id] = mask
+        self.counts[mask] += 1
+        self.members[mask].add(guest_id)
+
+    def remove(self, guest_id):
+        mask = self.mask_of.pop(guest_id, None)
+        if mask is not None:
+            self.counts[mask] -= 1
+            self.members[mask].discard(guest_id)
+
+    def _masks(self, required, excluded):
+        return [m for m in range(ALL_EVENTS + 1) if m & required == required and not m & excluded]
+
+    def count(self, required=0, excluded=0):
+        """Invités qui assistent à tous les `required` et à aucun des `excluded`"""
+        return sum(self.counts[m] for m in self._masks(required, excluded))
+
+    def guests(self, required=0, excluded=0):
+        """Identifiants correspondants (ex: réception seule: guests(RECEPTION, CIVIL | RELIGIOUS))"""
+        ids = set()
+        for m in self._masks(required, excluded):
+            ids |= self.members[m]
+        return ids
+
+    def headcounts(self):
+        """Effectif par événement"""
+        return {key: self.count(bit) for bit, key, _ in EVENTS}
+
+    def combinations(self):
+        """Effectif de chaque combinaison présente, la plus fréquente d'abord"""
+        return sorted(((mask_keys(m), c) for m, c in enumerate(self.counts) if c),
+                      key=lambda item: -item[1])
+
+
+def index_from_csv(path='plandetable.csv', unknown=None):
+    """Index construit en une lecture du CSV (clé: numéro de ligne)"""
+    return EventIndex((record.line, event_mask(record.events, unknown))
+                      for record in iter_guest_records(path))
+
+
+def load_event_index(client):
+    """Index construit depuis guests.events_mask (une lecture paginée)"""
+    return EventIndex((row['id'], row['events_mask'] or 0)
+                      for row in iter_rows(client, 'guests', "id, events_mask"))
+
+
+def plan_event_masks(records, index, allow_fuzzy=False):
+    """Lignes {id, events_mask} à écrire, seulement si le masque change
+
+    `index` est un NameIndex construit avec EVENT_GUEST_COLUMNS. Seules les correspondances exactes (noms normalisés) sont écrites, sauf
+    avec `allow_fuzzy`. Retourne (lignes, enregistrements non trouvés,
+    lignes ignorées (record, invité, raison)).
+    """
+    rows = {}
+    claimed = set()
+    not_found = []
+    skipped = []
+    for record in records:
+        guest, method = index.match(record.first_name, record.last_name)
+        if guest is not None and guest['id'] in claimed:
+            # Homonymes exacts: chaque ligne du CSV prend un invité distinct
+            other = next((g for g in index.exact(record.first_name, record.last_name)
+                          if g['id'] not in claimed), None)
+            if other is None:
+                skipped.append((record, guest, "invité déjà pris par une autre ligne"))
+                continue
+            guest, method = other, 'exact'
+        if guest is None:
+            not_found.append(record)
+            continue
+        if method not in SAFE_MATCHES and not allow_fuzzy:
+            skipped.append((record, guest, f"correspondance {method}"))
+            continue
+        claimed.add(guest['id'])
+        mask = event_mask(record.events)
+        if (guest.get('events_mask') or 0) != mask:
+            rows[guest['id']] = {'id': guest['id'], 'events_mask': mask}
+    return list(rows.values()), not_found, skipped
+
+
+def print_headcounts(index):
+    print(f"Invités: {len(index)}")
+    for bit, key, label in EVENTS:
+        print(f"  {label}: {index.count(bit)}")
+    print(f"  Réception seulement: {index.count(RECEPTION, CIVIL | RELIGIOUS)}")
+    print(f"  Aucun événement: {index.count(0, ALL_EVENTS)}")
+    print("\nCombinaisons:")
+    for keys, count in index.combinations():
+        print(f"  {' + '.join(keys) or '(aucun)'}: {count}")
+
+
+def main(argv=None):
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Effectifs par événement (civil, religieux, réception)")
+    parser.add_argument('--csv', default='plandetable.csv')
+    parser.add_argument('--database', action='store_true', help="effectifs depuis guests.events_mask")
+    parser.add_argument('--apply', action='store_true',
+                        help="écrire les masques du CSV dans guests.events_mask (journalisé)")
+    parser.add_argument('--allow-fuzzy', action='store_true',
+                        help="avec --apply: accepter les correspondances de nom par mots ou approchées")
+    args = parser.parse_args(argv)
+
+    print("=== EFFECTIFS PAR ÉVÉNEMENT ===\n")
+
+    if not (args.database or args.apply):
+        unknown = []
+        print_headcounts(index_from_csv(args.csv, unknown))
+        for event in sorted(set(unknown)):
+            print(f"⚠️  Événement inconnu ignoré: {event}")
+        return
+
+    from mutations import BulkMutation
+    from name_index import NameIndex
+    from shared_client import get_client
+
+    client = get_client()
+    if args.apply:
+        index = NameIndex(iter_rows(client, 'guests', EVENT_GUEST_COLUMNS))
+        rows, not_found, skipped = plan_event_masks(iter_guest_records(args.csv), index, args.allow_fuzzy)
+        for record in not_found:
+            print(f"✗ Ligne {record.line}: invité non trouvé: {record.first_name} {record.last_name}")
+        for record, guest, reason in skipped:
+            print(f"⚠️  Ligne {record.line}: {record.first_name} {record.last_name} ~ "
+                  f"{guest['first_name']} {guest['last_name']} ({reason}), ignoré")
+        # Une mise à jour in_() par valeur de masque (8 au plus), sans toucher aux noms
+        by_mask = {}
+        for row in rows:
+            by_mask.setdefault(row['events_mask'], []).append(row['id'])
+        mutation = BulkMutation(client, 'events-mask')
+        for mask, guest_ids in sorted(by_mask.items()):
+            mutation.update('guests', {'events_mask': mask}, 'id', guest_ids)
+        mutation.apply()
+        print(f"✓ {len(rows)} masques mis à jour")
+        if mutation.path:
+            print(f"Journal: {mutation.path} (annulation: python mutations.py --undo last)\n")
+
+    print_headcounts(load_event_index(client))
+
+
+if __name__ == "__main__":
+    main()
@@ -3,53 +3,13 @@
 Exécuter les commandes SQL pour corriger les vues via psycopg2
 """
 
-import os
-from dotenv import load_dotenv
+import argparse
 
-# Charger les variables d'environnement
-load_dotenv('.env.local')
+from async_db import run_with
+from profiling import add_profile_arguments, report
+from shared_client import enable_profiling, get_client
 
-from supabase import create_client, Client
-
-url = os.getenv('NEXT_PUBLIC_SUPABASE_URL')
-key = os.getenv('NEXT_PUBLIC_SUPABASE_ANON_KEY')
-
-supabase: Client = create_client(url, key)
-
-print("=== CORRECTION DES VUES AVEC SUPABASE SDK ===\n")
-
-# Puisque nous ne pouvons pas exécuter DDL directement,
-# vérifions d'abord si les vues existent et leur structure
-
-print("1. Vérification de l'état actuel des vues...\n")
-
-try:
-    # Tester table_status
-    result = supabase.table('table_status').select("*").limit(1).execute()
-    print("✓ Vue 'table_status' existe et est accessible")
-    
-    # Vérifier la structure
-    if result.data and len(result.data) > 0:
-        columns = result.data[0].keys()
-        print(f"  Colonnes: {', '.join(columns)}")
-except Exception as e:
-    print(f"✗ Erreur avec 'table_status': {e}")
-
-try:
-    # Tester all_guests_status
-    result = supabase.table('all_guests_status').select("*").limit(1).execute()
-    print("✓ Vue 'all_guests_status' existe et est accessible")
-    
-    # Vérifier la structure
-    if result.data and len(result.data) > 0:
-        columns = result.data[0].keys()
-        print(f"  Colonnes: {', '.join(columns)}")
-except Exception as e:
-    print(f"✗ Erreur avec 'all_guests_status': {e}")
-
-print("\n2. Génération du SQL pour corriger les vues...\n")
-
-# Générer le fichier SQL complet
+# Fichier SQL complet de correction des vues
 sql_content = """
 -- ========================================
 -- CORRECTION DES VUES POUR UTILISER LES BONNES JOINTURES
@@ -159,36 +119,91 @@ SELECT
 FROM tables;
 """
 
-# Sauvegarder le SQL
-with open('supabase/fix-all-views.sql', 'w') as f:
-    f.write(sql_content)
-
-print("✓ Fichier SQL généré: supabase/fix-all-views.sql")
-print("\n⚠️  IMPORTANT: Exécutez ce fichier dans l'éditeur SQL de Supabase")
-print("   1. Allez sur https://gdksgmkwbprdjthzjbvs.supabase.co")
-print("   2. Ouvrez l'éditeur SQL")
-print("   3. Copiez-collez le contenu de supabase/fix-all-views.sql")
-print("   4. Exécutez le script")
-
-print("\n3. Vérification des données actuelles...\n")
-
-# Vérifier les totaux actuels
-try:
-    # Total invités
-    guests = supabase.table('guests').select("*", count='exact').execute()
-    print(f"Total invités: {guests.count}")
-    
-    # Total assignations
-    assignments = supabase.table('seating_assignments').select("*", count='exact').execute()
-    print(f"Total assignations: {assignments.count}")
-    
-    # Capacité totale des tables
-    tables = supabase.table('tables').select("capacity").execute()
-    total_capacity = sum(t['capacity'] for t in tables.data)
-    print(f"Capacité totale: {total_capacity}")
-    print(f"Places libres: {total_capacity - assignments.count}")
-    
-except Exception as e:
-    print(f"Erreur: {e}")
-
-print("\n✅ Script terminé!")
\ No newline at end of file
+
+def main(argv=None):
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Générer le SQL de correction des vues et vérifier les totaux")
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+
+    # Instrumenter le client pour compter et chronométrer chaque requête
+    profiler = enable_profiling() if args.profile or args.profile_json else None
+    supabase = get_client()
+
+    print("=== CORRECTION DES VUES AVEC SUPABASE SDK ===\n")
+
+    # Puisque nous ne pouvons pas exécuter DDL directement,
+    # vérifions d'abord si les vues existent et leur structure
+
+    print("1. Vérification de l'état actuel des vues...\n")
+
+    try:
+        # Tester table_status
+        result = supabase.table('table_status').select("*").limit(1).execute()
+        print("✓ Vue 'table_status' existe et est accessible")
+
+        # Vérifier la structure
+        if result.data and len(result.data) > 0:
+            columns = result.data[0].keys()
+            print(f"  Colonnes: {', '.join(columns)}")
+    except Exception as e:
+        print(f"✗ Erreur avec 'table_status': {e}")
+
+    try:
+        # Tester all_guests_status
+        result = supabase.table('all_guests_status').select("*").limit(1).execute()
+        print("✓ Vue 'all_guests_status' existe et est accessible")
+
+        # Vérifier la structure
+        if result.data and len(result.data) > 0:
+            columns = result.data[0].keys()
+            print(f"  Colonnes: {', '.join(columns)}")
+    except Exception as e:
+        print(f"✗ Erreur avec 'all_guests_status': {e}")
+
+    print("\n2. Génération du SQL pour corriger les vues...\n")
+
+    # Sauvegarder le SQL
+    with open('supabase/fix-all-views.sql', 'w') as f:
+        f.write(sql_content)
+
+    print("✓ Fichier SQL généré: supabase/fix-all-views.sql")
+    print("\n⚠️  IMPORTANT: Exécutez ce fichier dans l'éditeur SQL de Supabase")
+    print("   1. Allez sur https://gdksgmkwbprdjthzjbvs.supabase.co")
+    print("   2. Ouvrez l'éditeur SQL")
+    print("   3. Copiez-collez le contenu de supabase/fix-all-views.sql")
+    print("   4. Exécutez le script")
+
+    print("\n3. Vérification des données actuelles...\n")
+
+    # Vérifier les totaux actuels
+    try:
+        # Les trois lectures sont indépendantes: lancées en parallèle, sans
+        # télécharger les lignes pour les comptages
+        guest_count, assignment_count, tables = run_with(supabase, lambda db: db.gather(
+            db.count('guests'),
+            db.count('seating_assignments'),
+            db.select_all('tables', "capacity"),
+        ))
+
+        # Total invités
+        print(f"Total invités: {guest_count}")
+
+        # Total assignations
+        print(f"Total assignations: {assignment_count}")
+
+        # Capacité totale des tables
+        total_capacity = sum(t['capacity'] for t in tables)
+        print(f"Capacité totale: {total_capacity}")
+        print(f"Places libres: {total_capacity - assignment_count}")
+
+    except Exception as e:
+        print(f"Erreur: {e}")
+
+    print("\n✅ Script terminé!")
+
+    report(profiler, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,489 @@
+#!/usr/bin/env python3
+"""
+Faux client Supabase en mémoire (API table/rpc) qui compte les aller-retours
+"""
+
+import re
+from collections import Counter
+from datetime import datetime, timezone
+
+# Limite de lignes par réponse, comme max-rows côté PostgREST
+MAX_ROWS = 1000
+
+# Contraintes d'unicité du schéma (01-main-schema.sql)
+UNIQUE = {
+    'guests': [('id',), ('qr_code',), ('invitation_code',), ('guest_code',)],
+    'tables': [('id',), ('table_number',)],
+    'seating_assignments': [('id',), ('guest_id',), ('table_id', 'seat_number')],
+    'access_codes': [('id',), ('code',)],
+}
+
+# Colonnes du schéma (01-main-schema.sql, plus updated_at de 06 et events_mask
+# de 09): une écriture avec une autre colonne est refusée comme par PostgREST
+COLUMNS = {
+    'guests': {'id', 'first_name', 'last_name', 'email', 'phone', 'has_plus_one',
+               'dietary_restrictions', 'rsvp_status', 'invitation_code', 'guest_code',
+               'checked_in', 'checked_in_at', 'qr_code', 'created_at', 'updated_at', 'events_mask'},
+    'tables': {'id', 'table_number', 'table_name', 'capacity', 'is_vip', 'color_code', 'color_name',
+               'created_at', 'updated_at'},
+    'seating_assignments': {'id', 'guest_id', 'table_id', 'seat_number', 'checked_in', 'checked_in_at',
+                            'created_at', 'updated_at'},
+    'access_codes': {'id', 'code', 'is_valid', 'created_at'},
+}
+
+
+class FakeAPIError(Exception):
+    """Erreur renvoyée comme le ferait PostgREST"""
+
+
+class FakeResponse:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _like(pattern, value, case_insensitive):
+    if value is None:
+        return False
+    regex = '^' + '.*'.join(re.escape(part) for part in re.split(r'[%*]', pattern)) + '$'
+    return re.match(regex, str(value), re.IGNORECASE if case_insensitive else 0) is not None
+
+
+def _coerce(value):
+    """Les valeurs des filtres or=(...) arrivent en texte"""
+    if value.startswith('"') and value.endswith('"'):
+        return value[1:-1].replace('\\"', '"').replace('\\\\', '\\')
+    if re.fullmatch(r'-?\d+', value):
+        return int(value)
+    return {'true': True, 'false': False, 'null': None}.get(value, value)
+
+
+def _split_or(expression):
+    """Découper "a.eq.1,b.ilike.\"x,y\"" en clauses en respectant les guillemets"""
+    clauses, current, quoted, escaped = [], '', False, False
+    for char in expression:
+        if escaped:
+            current += char
+            escaped = False
+        elif char == '\\':
+            current += char
+            escaped = True
+        elif char == '"':
+            current += char
+            quoted = not quoted
+        elif char == ',' and not quoted:
+            clauses.append(current)
+            current = ''
+        else:
+            current += char
+    if current:
+        clauses.append(current)
+    return clauses
+
+
+OPERATORS = {
+    'eq': lambda v, x: v == x,
+    'neq': lambda v, x: v != x,
+    'gt': lambda v, x: v is not None and v > x,
+    'gte': lambda v, x: v is not None and v >= x,
+    'lt': lambda v, x: v is not None and v < x,
+    'lte': lambda v, x: v is not None and v <= x,
+    'like': lambda v, x: _like(x, v, False),
+    'ilike': lambda v, x: _like(x, v, True),
+    'is': lambda v, x: v is x,
+    'in': lambda v, x: v in x,
+}
+
+
+class FakeQuery:
+    """Constructeur de requête compatible avec l'usage fait par les scripts"""
+
+    def __init__(self, client, table):
+        self.client = client
+        self.table = table
+        self.method = 'select'
+        self.columns = None
+        self.count_mode = None
+        self.filters = []
+        self.ordering = []
+        self.row_limit = None
+        self.row_offset = 0
+        self.payload = None
+        self.on_conflict = None
+
+    # Lecture et écriture
+    def select(self, columns="*", count=None):
+        self.columns = [c.strip() for c in columns.split(',')] if columns.strip() != '*' else None
+        self.count_mode = count
+        return self
+
+    def insert(self, rows, **kwargs):
+        self.method, self.payload = 'insert', rows
+        return self
+
+    def upsert(self, rows, on_conflict='id', **kwargs):
+        self.method, self.payload, self.on_conflict = 'upsert', rows, on_conflict
+        return self
+
+    def update(self, values, **kwargs):
+        self.method, self.payload = 'update', values
+        return self
+
+    def delete(self, **kwargs):
+        self.method = 'delete'
+        return self
+
+    # Filtres
+    def _filter(self, op, column, value):
+        self.filters.append((op, column, value))
+        return self
+
+    def eq(self, column, value):
+        return self._filter('eq', column, value)
+
+    def neq(self, column, value):
+        return self._filter('neq', column, value)
+
+    def gt(self, column, value):
+        return self._filter('gt', column, value)
+
+    def gte(self, column, value):
+        return self._filter('gte', column, value)
+
+    def lt(self, column, value):
+        return self._filter('lt', column, value)
+
+    def lte(self, column, value):
+        return self._filter('lte', column, value)
+
+    def like(self, column, pattern):
+        return self._filter('like', column, pattern)
+
+    def ilike(self, column, pattern):
+        return self._filter('ilike', column, pattern)
+
+    def is_(self, column, value):
+        return self._filter('is', column, None if value in (None, 'null') else value)
+
+    def in_(self, column, values):
+        return self._filter('in', column, set(values))
+
+    def or_(self, expression):
+        clauses = []
+        for clause in _split_or(expression):
+            column, op, value = clause.split('.', 2)
+            clauses.append((column, op, _coerce(value)))
+        self.filters.append(('or', None, clauses))
+        return self
+
+    # Tri et pagination
+    def order(self, column, desc=False, **kwargs):
+        self.ordering.append((column, desc))
+        return self
+
+    def limit(self, count):
+        self.row_limit = count
+        return self
+
+    def range(self, start, end):
+        self.row_offset, self.row_limit = start, end - start + 1
+        return self
+
+    def execute(self):
+        return self.client._execute(self)
+
+
+class FakeRPC:
+    def __init__(self, client, name, params):
+        self.client, self.name, self.params = client, name, params
+
+    def execute(self):
+        self.client._count(f"rpc:{self.name}", 'rpc')
+        handler = self.client.functions.get(self.name)
+        if handler is None:
+            raise FakeAPIError(f"Could not find the function public.{self.name}")
+        return FakeResponse(handler(self.client, **(self.params or {})))
+
+
+class FakeClient:
+    """Remplace supabase.Client: tables en mémoire, vues calculées, compteurs d'appels
+
+    `calls` compte les requêtes par (table, méthode) et `rows_returned` le
+    nombre de lignes renvoyées ; `round_trips` est le total des requêtes.
+    """
+
+    def __init__(self, data=None, max_rows=MAX_ROWS):
+        self.data = {name: list(rows) for name, rows in (data or {}).items()}
+        for name in ('guests', 'tables', 'seating_assignments', 'access_codes'):
+            self.data.setdefault(name, [])
+        self.max_rows = max_rows
+        self.functions = {}
+        self.views = {
+            'all_guests_status': all_guests_status,
+            'guest_checkin_info': all_guests_status,
+            'table_status': table_status,
+        }
+        self.calls = Counter()
+        self.rows_returned = 0
+        self._next_id = {name: max((r.get('id') or 0 for r in rows), default=0) + 1
+                         for name, rows in self.data.items()}
+
+    @property
+    def round_trips(self):
+        return sum(self.calls.values())
+
+    def reset_counters(self):
+        self.calls.clear()
+        self.rows_returned = 0
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+    # Alias utilisé par supabase-py
+    from_ = table
+
+    def rpc(self, name, params=None):
+        return FakeRPC(self, name, params)
+
+    @property
+    def async_transport(self):
+        """Transport httpx qui sert l'API REST depuis ce faux client (voir async_db)"""
+        import httpx
+        return httpx.MockTransport(self.handle_rest)
+
+    def handle_rest(self, request):
+        """Répondre à une requête GET PostgREST (/rest/v1/<table>?select=...&col=op.val)"""
+        import httpx
+
+        if request.method != 'GET':
+            return httpx.Response(405, json={'message': 'Méthode non gérée par le faux client'})
+
+        query = FakeQuery(self, request.url.path.rsplit('/', 1)[-1])
+        query.select(request.url.params.get('select', '*'),
+                     count='exact' if 'count=exact' in request.headers.get('prefer', '') else None)
+        for name, value in request.url.params.multi_items():
+            if name == 'select':
+                continue
+            elif name == 'order':
+                for part in value.split(','):
+                    column, _, direction = part.partition('.')
+                    query.order(column, desc=direction.startswith('desc'))
+            elif name == 'limit':
+                query.limit(int(value))
+            elif name == 'offset':
+                query.row_offset = int(value)
+            elif name == 'or':
+                query.or_(value.strip('()'))
+            else:
+                op, _, operand = value.partition('.')
+                if op == 'in':
+                    query.in_(name, [_coerce(v) for v in _split_or(operand.strip('()'))])
+                else:
+                    query._filter(op, name, _coerce(operand))
+
+        try:
+            response = query.execute()
+        except FakeAPIError as e:
+            return httpx.Response(404, json={'message': str(e)})
+
+        headers = {}
+        if response.count is not None:
+            headers['Content-Range'] = f"0-{max(len(response.data) - 1, 0)}/{response.count}"
+        return httpx.Response(200, json=response.data, headers=headers)
+
+    def _count(self, table, method):
+        self.calls[(table, method)] += 1
+
+    def _rows(self, table):
+        if table in self.views:
+            return self.views[table](self)
+        if table not in self.data:
+            raise FakeAPIError(f"relation \"public.{table}\" does not exist")
+        return self.data[table]
+
+    def _check_columns(self, query):
+        known = COLUMNS.get(query.table)
+        if known is None or query.method not in ('insert', 'upsert', 'update'):
+            return
+        rows = query.payload if isinstance(query.payload, list) else [query.payload]
+        for row in rows:
+            for column in row:
+                if column not in known:
+                    raise FakeAPIError(
+                        f"Could not find the '{column}' column of '{query.table}' in the schema cache")
+
+    def _execute(self, query):
+        self._count(query.table, query.method)
+        self._check_columns(query)
+        handler = getattr(self, f"_do_{query.method}")
+        response = handler(query)
+        self.rows_returned += len(response.data)
+        return response
+
+    def _matching(self, query):
+        """Appliquer les filtres un à un (l'ensemble se réduit à chaque étape)"""
+        rows = self._rows(query.table)
+        for op, column, value in query.filters:
+            if op == 'eq':
+                rows = [r for r in rows if r.get(column) == value]
+            elif op == 'in':
+                rows = [r for r in rows if r.get(column) in value]
+            elif op == 'or':
+                rows = [r for r in rows if any(OPERATORS[o](r.get(c), v) for c, o, v in value)]
+            else:
+                test = OPERATORS[op]
+                rows = [r for r in rows if test(r.get(column), value)]
+        return list(rows)
+
+    def _do_select(self, query):
+        rows = self._matching(query)
+        total = len(rows)
+        for column, desc in reversed(query.ordering):
+            rows.sort(key=lambda r: (r.get(column) is None, r.get(column)), reverse=desc)
+
+        limit = self.max_rows if query.row_limit is None else min(query.row_limit, self.max_rows)
+        rows = rows[query.row_offset:query.row_offset + limit]
+
+        if query.columns is not None:
+            rows = [{c: row.get(c) for c in query.columns} for row in rows]
+        else:
+            rows = [dict(row) for row in rows]
+        return FakeResponse(rows, total if query.count_mode else None)
+
+    def _check_unique(self, table, row, ignore=None):
+        for columns in UNIQUE.get(table, []):
+            values = tuple(row.get(c) for c in columns)
+            if any(v is None for v in values):
+                continue
+            for other in self.data[table]:
+                if other is not ignore and tuple(other.get(c) for c in columns) == values:
+                    raise FakeAPIError(
+                        f"duplicate key value violates unique constraint ({', '.join(columns)})")
+
+    def _prepare(self, table, row):
+        row = dict(row)
+        if row.get('id') is None:
+            row['id'] = self._next_id.get(table, 1)
+        self._next_id[table] = max(self._next_id.get(table, 1), row['id'] + 1)
+        if table == 'guests':
+            row.setdefault('checked_in', False)
+            row.setdefault('created_at', _now())
+            row.setdefault('updated_at', row['created_at'])
+        return row
+
+    def _do_insert(self, query):
+        rows = query.payload if isinstance(query.payload, list) else [query.payload]
+        table = self.data.setdefault(query.table, [])
+        inserted = []
+        for row in rows:
+            row = self._prepare(query.table, row)
+            self._check_unique(query.table, row)
+            table.append(row)
+            inserted.append(row)
+        return FakeResponse([dict(r) for r in inserted])
+
+    def _do_upsert(self, query):
+        rows = query.payload if isinstance(query.payload, list) else [query.payload]
+        keys = [c.strip() for c in query.on_conflict.split(',')]
+        table = self.data.setdefault(query.table, [])
+        index = {tuple(r.get(k) for k in keys): r for r in table}
+        result = []
+        for row in rows:
+            existing = index.get(tuple(row.get(k) for k in keys))
+            if existing is None:
+                row = self._prepare(query.table, row)
+                self._check_unique(query.table, row)
+                table.append(row)
+                index[tuple(row.get(k) for k in keys)] = row
+                result.append(row)
+            else:
+                self._check_unique(query.table, {**existing, **row}, ignore=existing)
+                existing.update(row)
+                if query.table == 'guests':
+                    existing['updated_at'] = _now()
+                result.append(existing)
+        return FakeResponse([dict(r) for r in result])
+
+    def _do_update(self, query):
+        rows = self._matching(query)
+        for row in rows:
+            self._check_unique(query.table, {**row, **query.payload}, ignore=row)
+            row.update(query.payload)
+            # Trigger update_guests_updated_at
+            if query.table == 'guests':
+                row['updated_at'] = _now()
+        return FakeResponse([dict(r) for r in rows])
+
+    def _do_delete(self, query):
+        doomed = self._matching(query)
+        doomed_ids = {id(r) for r in doomed}
+        self.data[query.table] = [r for r in self.data[query.table] if id(r) not in doomed_ids]
+        # ON DELETE CASCADE de seating_assignments.guest_id
+        if query.table == 'guests' and doomed:
+            gone = {r['id'] for r in doomed}
+            self.data['seating_assignments'] = [
+                a for a in self.data['seating_assignments'] if a.get('guest_id') not in gone]
+        return FakeResponse([dict(r) for r in doomed])
+
+
+def all_guests_status(client):
+    """Équivalent de la vue all_guests_status (02-views.sql)"""
+    tables = {t['table_number']: t for t in client.data['tables']}
+    assignments = {a['guest_id']: a for a in client.data['seating_assignments']}
+    rows = []
+    for g in client.data['guests']:
+        sa = assignments.get(g['id'])
+        t = tables.get(sa['table_id']) if sa else None
+        rows.append({
+            'id': g['id'],
+            'first_name': g.get('first_name'),
+            'last_name': g.get('last_name'),
+            'email': g.get('email'),
+            'phone': g.get('phone'),
+            'checked_in': g.get('checked_in', False),
+            'checked_in_at': g.get('checked_in_at'),
+            'qr_code': g.get('qr_code'),
+            'table_id': sa['table_id'] if sa else None,
+            'table_number': t['table_number'] if t else None,
+            'table_name': t.get('table_name') if t else None,
+            'color_code': t.get('color_code') if t else None,
+            'color_name': t.get('color_name') if t else None,
+            'seat_number': sa['seat_number'] if sa else None,
+            'is_assigned': sa is not None,
+            'status': 'checked_in' if g.get('checked_in') else ('assigned' if sa else 'unassigned'),
+        })
+    return rows
+
+
+def table_status(client):
+    """Équivalent de la vue table_status (02-views.sql)"""
+    guests = {g['id']: g for g in client.data['guests']}
+    seated = {}
+    for a in client.data['seating_assignments']:
+        seated.setdefault(a['table_id'], []).append(a)
+
+    rows = []
+    for t in client.data['tables']:
+        assignments = sorted(seated.get(t['table_number'], []), key=lambda a: a['seat_number'])
+        capacity = t.get('capacity') or 10
+        rows.append({
+            **{k: t.get(k) for k in ('id', 'table_number', 'table_name', 'capacity',
+                                     'is_vip', 'color_code', 'color_name')},
+            'occupied_seats': len(assignments),
+            'available_seats': capacity - len(assignments),
+            'seated_guests': [
+                {
+                    'guest_id': a['guest_id'],
+                    'seat_number': a['seat_number'],
+                    'guest_name': f"{guests.get(a['guest_id'], {}).get('first_name')} "
+                                  f"{guests.get(a['guest_id'], {}).get('last_name')}",
+                    'checked_in': a.get('checked_in', False),
+                }
+                for a in assignments
+            ] or None,
+        })
+    return rows
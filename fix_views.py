@@ -3,21 +3,7 @@
 Corriger les vues SQL pour qu'elles utilisent les bonnes jointures
 """
 
-import os
-from dotenv import load_dotenv
-from supabase import create_client, Client
-
-# Charger les variables d'environnement
-load_dotenv('.env.local')
-
-# Configuration Supabase
-url = os.getenv('NEXT_PUBLIC_SUPABASE_URL')
-key = os.getenv('NEXT_PUBLIC_SUPABASE_ANON_KEY')
-
-# Créer le client Supabase
-supabase: Client = create_client(url, key)
-
-print("=== CORRECTION DES VUES SQL ===\n")
+from shared_client import get_client
 
 # Les requêtes SQL pour corriger les vues
 sql_commands = [
@@ -90,46 +76,56 @@ sql_commands = [
     """
 ]
 
-# Exécuter chaque commande
-for i, sql in enumerate(sql_commands, 1):
+def main():
+    """Fonction principale"""
+    supabase = get_client()
+
+    print("=== CORRECTION DES VUES SQL ===\n")
+
+    # Exécuter chaque commande
+    for i, sql in enumerate(sql_commands, 1):
+        try:
+            # Utiliser postgrest pour exécuter du SQL brut
+            # Malheureusement, le SDK Supabase Python ne supporte pas les DDL directement
+            # On doit passer par l'API REST
+            from postgrest import APIError
+
+            # Alternative: essayer avec rpc si disponible
+            result = supabase.rpc('exec_sql', {'query': sql.strip()}).execute()
+            print(f"✓ Commande {i} exécutée")
+        except Exception as e:
+            # Si rpc n'existe pas, afficher le SQL à exécuter manuellement
+            print(f"⚠️  Impossible d'exécuter automatiquement la commande {i}")
+            print(f"    Erreur: {e}")
+            print(f"\n    SQL à exécuter manuellement dans Supabase:\n")
+            print(sql.strip()[:200] + "..." if len(sql.strip()) > 200 else sql.strip())
+            print()
+
+    # Vérifier le résultat
+    print("\n=== VÉRIFICATION DES TABLES ===\n")
     try:
-        # Utiliser postgrest pour exécuter du SQL brut
-        # Malheureusement, le SDK Supabase Python ne supporte pas les DDL directement
-        # On doit passer par l'API REST
-        from postgrest import APIError
-        
-        # Alternative: essayer avec rpc si disponible
-        result = supabase.rpc('exec_sql', {'query': sql.strip()}).execute()
-        print(f"✓ Commande {i} exécutée")
+        # Utiliser une requête sur la vue table_status
+        result = supabase.table('table_status').select("table_number, table_name, occupied_seats, available_seats").execute()
+
+        total_occupied = 0
+        total_available = 0
+
+        for table in sorted(result.data, key=lambda x: x['table_number']):
+            print(f"Table {table['table_number']:2d}: {table['occupied_seats']:2d}/{table['occupied_seats'] + table['available_seats']:2d} occupés, {table['available_seats']:2d} libres")
+            total_occupied += table['occupied_seats']
+            total_available += table['available_seats']
+
+        print(f"\n=== TOTAUX ===")
+        print(f"Total invités assignés: {total_occupied}")
+        print(f"Total places libres: {total_available}")
+        print(f"Capacité totale: {total_occupied + total_available}")
+
     except Exception as e:
-        # Si rpc n'existe pas, afficher le SQL à exécuter manuellement
-        print(f"⚠️  Impossible d'exécuter automatiquement la commande {i}")
-        print(f"    Erreur: {e}")
-        print(f"\n    SQL à exécuter manuellement dans Supabase:\n")
-        print(sql.strip()[:200] + "..." if len(sql.strip()) > 200 else sql.strip())
-        print()
+        print(f"Erreur lors de la vérification: {e}")
+        print("\nVeuillez exécuter les commandes SQL manuellement dans Supabase.")
+
+    print("\n✅ Script terminé!")
 
-# Vérifier le résultat
-print("\n=== VÉRIFICATION DES TABLES ===\n")
-try:
-    # Utiliser une requête sur la vue table_status
-    result = supabase.table('table_status').select("table_number, table_name, occupied_seats, available_seats").execute()
-    
-    total_occupied = 0
-    total_available = 0
-    
-    for table in sorted(result.data, key=lambda x: x['table_number']):
-        print(f"Table {table['table_number']:2d}: {table['occupied_seats']:2d}/{table['occupied_seats'] + table['available_seats']:2d} occupés, {table['available_seats']:2d} libres")
-        total_occupied += table['occupied_seats']
-        total_available += table['available_seats']
-    
-    print(f"\n=== TOTAUX ===")
-    print(f"Total invités assignés: {total_occupied}")
-    print(f"Total places libres: {total_available}")
-    print(f"Capacité totale: {total_occupied + total_available}")
-    
-except Exception as e:
-    print(f"Erreur lors de la vérification: {e}")
-    print("\nVeuillez exécuter les commandes SQL manuellement dans Supabase.")
 
-print("\n✅ Script terminé!")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -3,64 +3,17 @@
 Script pour générer les assignations SQL depuis le fichier CSV
 """
 
-import csv
-import re
+import argparse
 
-def parse_csv_and_generate_sql():
-    assignments = []
+from bulk_sql import VERIFICATION, generate_bulk_sql, sql_literal
+from csv_ingest import iter_guest_records, iter_plan
+from plan_diff import apply_diff, plan_diff, print_summary
+from shared_client import get_client
+from sql_stream import BATCH_SIZE, StreamingSQLWriter, iter_batch_assign
 
-    with open('plandetable.csv', 'r', encoding='utf-8') as f:
-        lines = f.readlines()
-
-    for line in lines:
-        # Nettoyer la ligne
-        line = line.strip()
-        if not line:
-            continue
-
-        # Parser la ligne manuellement
-        parts = line.split(',')
-        if len(parts) < 2:
-            continue
-
-        # Extraire nom et prénom
-        last_name = parts[0].strip()
-        first_name = parts[1].strip() if len(parts) > 1 else ""
-
-        # Chercher le numéro de table dans la ligne
-        table_num = None
-
-        # Chercher "TABLE ENFANT" d'abord
-        if "TABLE ENFANT" in line:
-            table_num = 27
-        else:
-            # Chercher un nombre seul qui pourrait être le numéro de table
-            # Généralement c'est le dernier élément ou proche de la fin
-            for part in reversed(parts):
-                part = part.strip()
-                if part.isdigit():
-                    table_num = int(part)
-                    break
-
-        # Nettoyer les noms
-        if not last_name or not first_name or last_name == "" or first_name == "":
-            continue
-
-        # Gérer les cas spéciaux d'époux/épouse
-        if first_name.lower() in ['epouse', 'épouse', 'enfant 1', 'enfant 2', 'accompagnant']:
-            # Garder tel quel pour ces cas spéciaux
-            pass
-
-        if table_num:
-            assignments.append({
-                'last_name': last_name.replace("'", "''"),
-                'first_name': first_name.replace("'", "''"),
-                'table': table_num
-            })
-            print(f"Trouvé: {first_name} {last_name} -> Table {table_num}")
+OUTPUT_PATH = 'supabase/complete-assignments.sql'
 
-    # Générer le SQL
-    sql_lines = ["""-- Script SQL généré automatiquement depuis plandetable.csv
+FUNCTION_PREAMBLE = """-- Script SQL généré automatiquement depuis plandetable.csv
 -- Exécuter dans Supabase SQL Editor
 
 -- Créer la table 27 pour les enfants
@@ -96,10 +49,22 @@ BEGIN
         -- Supprimer les anciennes assignations
         DELETE FROM seat_assignments WHERE guest_id = v_guest_id;
 
-        -- Trouver le prochain siège
-        SELECT COALESCE(MAX(seat_number), 0) + 1 INTO v_next_seat
-        FROM seat_assignments
-        WHERE table_id = v_table_id AND is_active = true;
+        -- Plus petit siège libre, sans dépasser la capacité de la table
+        SELECT s.seat INTO v_next_seat
+        FROM tables t
+        CROSS JOIN LATERAL generate_series(1, t.capacity) AS s(seat)
+        WHERE t.id = v_table_id
+          AND NOT EXISTS (
+              SELECT 1 FROM seat_assignments sa
+              WHERE sa.table_id = v_table_id AND sa.seat_number = s.seat AND sa.is_active = true
+          )
+        ORDER BY s.seat
+        LIMIT 1;
+
+        IF v_next_seat IS NULL THEN
+            RAISE WARNING 'Table % complète: % % non assigné', table_num, guest_first_name, guest_last_name;
+            RETURN;
+        END IF;
 
         -- Créer l'assignation
         INSERT INTO seat_assignments (guest_id, table_id, seat_number, is_active)
@@ -114,24 +79,9 @@ END;
 $$ LANGUAGE plpgsql;
 
 -- Assignations des invités
-"""]
-
-    # Grouper par table
-    tables = {}
-    for assignment in assignments:
-        table = assignment['table']
-        if table not in tables:
-            tables[table] = []
-        tables[table].append(assignment)
-
-    # Générer les assignations par table
-    for table_num in sorted(tables.keys()):
-        sql_lines.append(f"\n-- Table {table_num}")
-        for guest in tables[table_num]:
-            sql_lines.append(f"SELECT assign_guest_to_table_number('{guest['first_name']}', '{guest['last_name']}', {table_num});")
+"""
 
-    # Ajouter la vérification
-    sql_lines.append("""
+FUNCTION_VERIFICATION = """
 -- Vérification des résultats
 SELECT
     t.table_number,
@@ -143,16 +93,152 @@ FROM tables t
 LEFT JOIN seat_assignments sa ON t.id = sa.table_id AND sa.is_active = true
 GROUP BY t.id, t.table_number, t.table_name, t.capacity
 ORDER BY t.table_number;
-""")
+"""
+
+def parse_csv_and_generate_sql(bulk=False):
+    assignments = []
+    plan = []
+    rejects = []
+
+    for record, table in iter_plan(iter_guest_records('plandetable.csv', rejects)):
+        assignments.append({
+            'last_name': record.last_name.replace("'", "''"),
+            'first_name': record.first_name.replace("'", "''"),
+            'table': table
+        })
+        plan.append((record, table))
+        print(f"Trouvé: {record.first_name} {record.last_name} -> Table {table}")
+
+    for line, reason, row in rejects:
+        print(f"Ligne {line} rejetée ({reason}): {','.join(row)}")
+
+    # Grouper par table
+    tables = {}
+    for assignment in assignments:
+        table = assignment['table']
+        if table not in tables:
+            tables[table] = []
+        tables[table].append(assignment)
+
+    if bulk:
+        # Mode ensembliste: une table de transit + un seul INSERT ... SELECT
+        sql = generate_bulk_sql(plan)
+    else:
+        sql = generate_function_sql(tables)
 
     # Écrire le fichier SQL complet
-    with open('supabase/complete-assignments.sql', 'w', encoding='utf-8') as f:
-        f.write('\n'.join(sql_lines))
+    with open(OUTPUT_PATH, 'w', encoding='utf-8') as f:
+        f.write(sql)
 
     print(f"Script SQL généré avec {len(assignments)} assignations")
     print(f"Tables utilisées: {sorted(tables.keys())}")
     for table_num in sorted(tables.keys()):
         print(f"  Table {table_num}: {len(tables[table_num])} invités")
 
+def generate_function_sql(tables):
+    """Un appel à assign_guest_to_table_number par invité"""
+    # Générer le SQL
+    sql_lines = [FUNCTION_PREAMBLE]
+
+    # Générer les assignations par table
+    for table_num in sorted(tables.keys()):
+        sql_lines.append(f"\n-- Table {table_num}")
+        for guest in tables[table_num]:
+            sql_lines.append(f"SELECT assign_guest_to_table_number('{guest['first_name']}', '{guest['last_name']}', {table_num});")
+
+    # Ajouter la vérification
+    sql_lines.append(FUNCTION_VERIFICATION)
+
+    return '\n'.join(sql_lines)
+
+def stream_csv_to_sql(bulk=False, batch_size=BATCH_SIZE, max_bytes=None, compress=False):
+    """Écrire le SQL au fil de la lecture du CSV, par transactions de batch_size
+
+    Aucune liste d'invités n'est construite: mémoire constante quelle que
+    soit la taille du plan.
+    """
+    rejects = []
+    plan = iter_plan(iter_guest_records('plandetable.csv', rejects))
+
+    if bulk:
+        # Un INSERT ... SELECT autonome par lot, chacun dans sa transaction
+        writer = StreamingSQLWriter(OUTPUT_PATH, 1, max_bytes, compress,
+                                    preamble="-- Script SQL généré automatiquement depuis plandetable.csv "
+                                             "(mode ensembliste, par lots)\n",
+                                    postamble=VERIFICATION)
+        statements = iter_batch_assign(plan, batch_size)
+    else:
+        writer = StreamingSQLWriter(OUTPUT_PATH, batch_size, max_bytes, compress,
+                                    preamble=FUNCTION_PREAMBLE, postamble=FUNCTION_VERIFICATION)
+        statements = (f"SELECT assign_guest_to_table_number({sql_literal(r.first_name)}, "
+                      f"{sql_literal(r.last_name)}, {table});" for r, table in plan)
+
+    with writer:
+        for statement in statements:
+            writer.write(statement)
+
+    for line, reason, row in rejects:
+        print(f"Ligne {line} rejetée ({reason}): {','.join(row)}")
+    print(f"Script SQL généré: {writer.statements} instructions en {writer.batches} transactions")
+    for path in writer.paths:
+        print(f"  {path}")
+
+def diff_with_database(apply=False, prune=False, allow_fuzzy=False):
+    """Comparer le plan CSV à la base et n'écrire que les changements"""
+    client = get_client()
+
+    rejects = []
+    diff, capacities = plan_diff(client, iter_guest_records('plandetable.csv', rejects), prune, allow_fuzzy)
+    for line, reason, row in rejects:
+        print(f"Ligne {line} rejetée ({reason}): {','.join(row)}")
+
+    print_summary(diff, capacities)
+
+    if not apply:
+        print("\n(simulation: relancer avec --apply pour écrire)")
+        return diff
+
+    written = apply_diff(client, diff, prune)
+    print(f"\n✅ {written['inserted']} insertions, {written['moved']} déplacements, "
+          f"{written['removed']} retraits")
+    if diff['unplaced']:
+        print(f"⚠️  {len(diff['unplaced'])} invités non placés (tables pleines)")
+    return diff
+
+def main(argv=None):
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Générer les assignations SQL depuis plandetable.csv")
+    parser.add_argument('--bulk', action='store_true',
+                        help="un seul INSERT ... SELECT ensembliste au lieu d'un appel de fonction par invité")
+    parser.add_argument('--diff', action='store_true',
+                        help="comparer le plan à la base et afficher les changements (simulation)")
+    parser.add_argument('--apply', action='store_true',
+                        help="avec --diff: écrire les insertions et déplacements")
+    parser.add_argument('--prune', action='store_true',
+                        help="avec --apply: retirer aussi les assignations des invités absents du plan")
+    parser.add_argument('--allow-fuzzy', action='store_true',
+                        help="avec --diff/--apply ou --events: accepter les correspondances de nom "
+                             "par mots ou approchées (sinon seules les correspondances exactes sont écrites)")
+    parser.add_argument('--events', action='store_true',
+                        help="effectifs par événement du CSV (avec --apply: écrire guests.events_mask)")
+    parser.add_argument('--stream', action='store_true',
+                        help="écrire au fil de l'eau, une transaction BEGIN/COMMIT par lot")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                        help=f"avec --stream: invités par transaction (défaut: {BATCH_SIZE})")
+    parser.add_argument('--gzip', action='store_true', help="avec --stream: compresser la sortie")
+    parser.add_argument('--max-part-kb', type=int,
+                        help="avec --stream: découper en parties numérotées de cette taille maximale")
+    args = parser.parse_args(argv)
+    if args.events:
+        import events
+        events.main((['--apply'] if args.apply else []) + (['--allow-fuzzy'] if args.allow_fuzzy else []))
+    elif args.diff or args.apply:
+        diff_with_database(apply=args.apply, prune=args.prune, allow_fuzzy=args.allow_fuzzy)
+    elif args.stream:
+        max_bytes = args.max_part_kb * 1024 if args.max_part_kb else None
+        stream_csv_to_sql(args.bulk, args.batch_size, max_bytes, args.gzip)
+    else:
+        parse_csv_and_generate_sql(bulk=args.bulk)
+
 if __name__ == "__main__":
-    parse_csv_and_generate_sql()
\ No newline at end of file
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Point d'entrée unique des scripts de maintenance: python karel.py <commande>
+"""
+
+import argparse
+import importlib.util
+import os
+
+from profiling import add_profile_arguments, report
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def _load_script(filename):
+    """Importer un script dont le nom n'est pas un identifiant Python (generate-assignments.py)"""
+    spec = importlib.util.spec_from_file_location(
+        filename[:-3].replace('-', '_'), os.path.join(ROOT, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def cmd_status(args):
+    from db_manager import check_assignments
+
+    mirror = None
+    if args.local:
+        from local_mirror import LocalMirror
+        mirror = LocalMirror()
+    check_assignments(mirror, args.columnar)
+
+
+def cmd_fix_missing(args):
+    from db_manager import check_assignments, fix_missing_assignments
+
+    fix_missing_assignments(batch=not args.per_guest)
+    print("\n=== VÉRIFICATION APRÈS CORRECTION ===")
+    check_assignments()
+
+
+def cmd_dedup(args):
+    import dedup
+    dedup.main(args.extra)
+
+
+def cmd_gen_sql(args):
+    # Hors ligne: le SDK n'est importé que pour --diff / --apply
+    _load_script('generate-assignments.py').main(args.extra)
+
+
+def cmd_journal(args):
+    import mutations
+    mutations.main(args.extra)
+
+
+def cmd_fix_views(args):
+    if args.rpc:
+        import fix_views
+        fix_views.main()
+    else:
+        import execute_sql_fix
+        execute_sql_fix.main([])
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='karel', description="Outils de maintenance de la base du mariage")
+    add_profile_arguments(parser)
+    parser.add_argument('--cache', action='store_true',
+                        help="mettre les lectures en cache (TTL par table/vue) et afficher les succès/échecs")
+    commands = parser.add_subparsers(dest='command', required=True, metavar='commande')
+
+    status = commands.add_parser('status', help="état des assignations")
+    # Le rapport en colonnes lit toujours Supabase: pas de combinaison avec le miroir
+    source = status.add_mutually_exclusive_group()
+    source.add_argument('--local', action='store_true',
+                        help="calculer sur le miroir SQLite local (synchronisation incrémentale)")
+    source.add_argument('--columnar', action='store_true',
+                        help="agrégats vectorisés sur colonnes NumPy (gros volumes)")
+    status.set_defaults(handler=cmd_status, forward=False)
+
+    fix_missing = commands.add_parser('fix-missing', help="assigner les invités manquants")
+    fix_missing.add_argument('--per-guest', action='store_true',
+                             help="ancien mode: quelques requêtes par invité")
+    fix_missing.set_defaults(handler=cmd_fix_missing, forward=False)
+
+    # Ces commandes transmettent leurs options au script d'origine (--help compris)
+    dedup = commands.add_parser('dedup', add_help=False, help="détecter et fusionner les doublons")
+    dedup.set_defaults(handler=cmd_dedup, forward=True)
+
+    gen_sql = commands.add_parser('gen-sql', add_help=False,
+                                  help="générer le SQL des assignations depuis plandetable.csv")
+    gen_sql.set_defaults(handler=cmd_gen_sql, forward=True)
+
+    fix_views = commands.add_parser('fix-views', help="SQL de correction des vues et vérification des totaux")
+    fix_views.add_argument('--rpc', action='store_true',
+                           help="tenter d'exécuter les commandes via la fonction exec_sql")
+    fix_views.set_defaults(handler=cmd_fix_views, forward=False)
+
+    journal = commands.add_parser('journal', add_help=False,
+                                  help="lister ou annuler les corrections journalisées (--undo last)")
+    journal.set_defaults(handler=cmd_journal, forward=True)
+    return parser
+
+
+def main(argv=None):
+    """Fonction principale"""
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+    if extra and not args.forward:
+        parser.error(f"arguments non reconnus: {' '.join(extra)}")
+    args.extra = extra
+
+    # Un seul client pour toute la commande, créé au premier accès à la base
+    profiler = None
+    if args.profile or args.profile_json:
+        from shared_client import enable_profiling
+        profiler = enable_profiling()
+    cache = None
+    if args.cache:
+        from shared_client import enable_caching
+        cache = enable_caching()
+
+    args.handler(args)
+    report(profiler, args)
+    if cache is not None:
+        cache.print_summary()
+
+
+if __name__ == "__main__":
+    main()
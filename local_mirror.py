@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Miroir SQLite local de guests / tables / seating_assignments, synchronisé par delta sur updated_at
+"""
+
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+from snapshot import iter_rows
+
+DEFAULT_PATH = '.karel-mirror.sqlite3'
+
+# Colonnes recopiées localement pour chaque table
+MIRRORED = {
+    'guests': ('id', 'first_name', 'last_name', 'email', 'phone', 'rsvp_status',
+               'checked_in', 'checked_in_at', 'qr_code', 'updated_at'),
+    'tables': ('id', 'table_number', 'table_name', 'capacity', 'is_vip',
+               'color_code', 'color_name', 'updated_at'),
+    'seating_assignments': ('id', 'guest_id', 'table_id', 'seat_number',
+                            'checked_in', 'checked_in_at', 'updated_at'),
+}
+
+# Marge de recouvrement: CURRENT_TIMESTAMP est l'heure de début de
+# transaction, une ligne validée tard peut porter une date antérieure
+OVERLAP = timedelta(minutes=5)
+
+
+class LocalMirror:
+    """Copie locale des tables, rafraîchie en ne téléchargeant que les lignes modifiées
+
+    Première synchronisation: chargement complet. Ensuite: lignes dont
+    updated_at dépasse le repère stocké (moins OVERLAP), puis suppression des
+    identifiants qui n'existent plus côté serveur.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.row_factory = sqlite3.Row
+        self._create_schema()
+
+    def close(self):
+        self.db.close()
+
+    def _create_schema(self):
+        with self.db:
+            for table, columns in MIRRORED.items():
+                others = ', '.join(c for c in columns if c != 'id')
+                self.db.execute(f"CREATE TABLE IF NOT EXISTS {table} (id INTEGER PRIMARY KEY, {others})")
+            self.db.execute("CREATE INDEX IF NOT EXISTS idx_seating_guest_id ON seating_assignments(guest_id)")
+            self.db.execute("CREATE INDEX IF NOT EXISTS idx_seating_table_id ON seating_assignments(table_id)")
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS sync_state (table_name TEXT PRIMARY KEY, high_water TEXT, synced_at REAL)")
+
+    def _high_water(self, table):
+        row = self.db.execute("SELECT high_water FROM sync_state WHERE table_name = ?", (table,)).fetchone()
+        return row['high_water'] if row else None
+
+    def _store(self, table, columns, rows):
+        placeholders = ', '.join('?' for _ in columns)
+        self.db.executemany(
+            f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({placeholders})",
+            ([row.get(c) for c in columns] for row in rows))
+
+    def sync_table(self, client, table):
+        """Synchroniser une table; retourne un résumé (mode, lignes reçues, suppressions)"""
+        columns = MIRRORED[table]
+        high_water = self._high_water(table)
+        fetched = []
+
+        if high_water is not None:
+            since = (datetime.fromisoformat(high_water) - OVERLAP).isoformat()
+            try:
+                fetched = list(iter_rows(client, table, ', '.join(columns),
+                                         filters=[('gte', 'updated_at', since)]))
+                mode = 'delta'
+            except Exception:
+                # Colonne updated_at absente côté serveur (06-sync-updated-at.sql non appliqué)
+                high_water = None
+
+        if high_water is None:
+            try:
+                fetched = list(iter_rows(client, table, ', '.join(columns)))
+            except Exception:
+                columns = tuple(c for c in columns if c != 'updated_at')
+                fetched = list(iter_rows(client, table, ', '.join(columns)))
+            mode = 'full'
+
+        deleted = 0
+        with self.db:
+            if mode == 'full':
+                self.db.execute(f"DELETE FROM {table}")
+            self._store(table, columns, fetched)
+
+            if mode == 'delta':
+                # Suppressions: comparer les ensembles d'identifiants
+                remote_ids = {row['id'] for row in iter_rows(client, table, 'id')}
+                local_ids = {row[0] for row in self.db.execute(f"SELECT id FROM {table}")}
+                gone = local_ids - remote_ids
+                self.db.executemany(f"DELETE FROM {table} WHERE id = ?", ((i,) for i in gone))
+                deleted = len(gone)
+
+            stamps = [row['updated_at'] for row in fetched if row.get('updated_at')]
+            new_high_water = max(stamps + ([high_water] if high_water else []), default=None)
+            self.db.execute(
+                "INSERT OR REPLACE INTO sync_state (table_name, high_water, synced_at) VALUES (?, ?, ?)",
+                (table, new_high_water, time.time()))
+
+        return {'table': table, 'mode': mode, 'fetched': len(fetched), 'deleted': deleted}
+
+    def sync(self, client):
+        """Synchroniser les trois tables"""
+        return [self.sync_table(client, table) for table in MIRRORED]
+
+    def assignment_snapshot(self, sample_size=10):
+        """Mêmes agrégats que snapshot.load_assignment_snapshot, lus localement"""
+        total_guests = self.db.execute("SELECT COUNT(*) FROM guests").fetchone()[0]
+        total_assignments = self.db.execute("SELECT COUNT(*) FROM seating_assignments").fetchone()[0]
+        tables_with_guests = dict(self.db.execute(
+            "SELECT table_id, COUNT(*) FROM seating_assignments GROUP BY table_id").fetchall())
+
+        unassigned = """
+            FROM guests g
+            WHERE NOT EXISTS (SELECT 1 FROM seating_assignments sa WHERE sa.guest_id = g.id)
+        """
+        unassigned_count = self.db.execute(f"SELECT COUNT(*) {unassigned}").fetchone()[0]
+        unassigned_sample = [dict(row) for row in self.db.execute(
+            f"SELECT g.id, g.first_name, g.last_name {unassigned} ORDER BY g.id LIMIT ?", (sample_size,))]
+
+        return {
+            'total_guests': total_guests,
+            'total_assignments': total_assignments,
+            'unassigned_count': unassigned_count,
+            'unassigned_sample': unassigned_sample,
+            'tables_with_guests': tables_with_guests
+        }
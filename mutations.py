@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Corrections groupées journalisées: suppressions, insertions et déplacements annulables
+"""
+
+import argparse
+import glob
+import json
+import os
+from datetime import datetime, timezone
+
+from seat_allocator import write_moves
+
+JOURNAL_DIR = '.karel-journal'
+
+# Identifiants par filtre in_() (longueur d'URL raisonnable)
+CHUNK_SIZE = 200
+
+# Lignes par insertion / upsert groupé
+BATCH_SIZE = 500
+
+
+def _chunks(values, size):
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+
+class _Journal:
+    """Fichier JSON Lines écrit avant chaque écriture en base (une ligne par événement)"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def write(self, **entry):
+        self._file.write(json.dumps(entry, separators=(',', ':'), ensure_ascii=False, default=str) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+
+def read_journal(path):
+    """Lire un journal: (en-tête, étapes par numéro, ids insérés par étape, étapes terminées, annulé)"""
+    header, steps, inserted, done, undone = None, {}, {}, set(), False
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            kind = entry['type']
+            if kind == 'run':
+                header = entry
+            elif kind == 'step':
+                steps[entry['n']] = entry
+            elif kind == 'inserted':
+                inserted.setdefault(entry['n'], []).extend(entry['keys'])
+            elif kind == 'done':
+                done.add(entry['n'])
+            elif kind == 'undone':
+                undone = True
+    return header, steps, inserted, done, undone
+
+
+class BulkMutation:
+    """Plan de modifications appliqué en lots, avec journal local pour l'annuler
+
+    Les opérations sont d'abord collectées (delete, insert, upsert, update, move),
+    puis apply() photographie les lignes concernées, écrit le journal sur
+    disque et seulement ensuite modifie la base: suppressions in_() par
+    paquets, insertions et upserts groupés, mises à jour in_() des seules
+    colonnes modifiées, déplacements de sièges via
+    seat_allocator.write_moves. En cas d'arrêt au milieu, undo() sur le
+    journal remet les lignes dans leur état d'avant.
+
+    Les suppressions en cascade ne sont pas photographiées: planifier
+    explicitement la suppression des assignations avant celle des invités.
+    """
+
+    def __init__(self, client, label, journal_dir=JOURNAL_DIR):
+        self.client = client
+        self.label = label
+        self.journal_dir = journal_dir
+        self.steps = []
+        self.path = None
+
+    def __len__(self):
+        return len(self.steps)
+
+    def delete(self, table, column, values):
+        """Supprimer les lignes dont `column` est dans `values`"""
+        values = list(dict.fromkeys(v for v in values if v is not None))
+        if values:
+            self.steps.append({'op': 'delete', 'table': table, 'key': column, 'values': values})
+
+    def insert(self, table, rows, key='id'):
+        """Insérer des lignes (les clés générées sont journalisées pour l'annulation)"""
+        if rows:
+            self.steps.append({'op': 'insert', 'table': table, 'key': key, 'rows': list(rows)})
+
+    def upsert(self, table, rows, on_conflict='id'):
+        """Insérer ou remplacer des lignes identifiées par `on_conflict`"""
+        if rows:
+            self.steps.append({'op': 'upsert', 'table': table, 'key': on_conflict, 'rows': list(rows)})
+
+    def update(self, table, values, column, keys):
+        """Écrire `values` (seulement ces colonnes) sur les lignes dont `column` est dans `keys`"""
+        keys = list(dict.fromkeys(k for k in keys if k is not None))
+        if keys:
+            self.steps.append({'op': 'update', 'table': table, 'key': column, 'values': keys,
+                               'set': dict(values)})
+
+    def move(self, rows):
+        """Déplacer des assignations: lignes {id, guest_id, table_id, seat_number}"""
+        if rows:
+            self.steps.append({'op': 'move', 'table': 'seating_assignments', 'key': 'id', 'rows': list(rows)})
+
+    def _fetch(self, table, column, values, columns="*"):
+        """Photographier les lignes (complètes par défaut) avant modification"""
+        rows = []
+        for chunk in _chunks(values, CHUNK_SIZE):
+            rows.extend(self.client.table(table).select(columns).in_(column, chunk).execute().data or [])
+        return rows
+
+    def _before(self, step):
+        if step['op'] == 'delete':
+            return self._fetch(step['table'], step['key'], step['values'])
+        if step['op'] == 'update':
+            return self._fetch(step['table'], step['key'], step['values'],
+                               ', '.join([step['key'], *step['set']]))
+        if step['op'] in ('upsert', 'move'):
+            return self._fetch(step['table'], step['key'], [row[step['key']] for row in step['rows']])
+        return []
+
+    def apply(self):
+        """Photographier, journaliser puis écrire; retourne le nombre de lignes par opération"""
+        summary = {'delete': 0, 'insert': 0, 'upsert': 0, 'update': 0, 'move': 0}
+        if not self.steps:
+            return summary
+
+        os.makedirs(self.journal_dir, exist_ok=True)
+        stamp = datetime.now(timezone.utc)
+        self.path = os.path.join(self.journal_dir, f"{stamp:%Y%m%d-%H%M%S-%f}-{self.label}.jsonl")
+        journal = _Journal(self.path)
+        try:
+            journal.write(type='run', label=self.label, created_at=stamp.isoformat(), steps=len(self.steps))
+            # Toutes les photos avant la première écriture: l'annulation retrouve l'état initial
+            for n, step in enumerate(self.steps):
+                extra = {'rows': step['rows']} if step['op'] == 'upsert' else {}
+                if step['op'] == 'update':
+                    extra = {'set': step['set']}
+                journal.write(type='step', n=n, op=step['op'], table=step['table'],
+                              key=step['key'], before=self._before(step), **extra)
+
+            for n, step in enumerate(self.steps):
+                summary[step['op']] += self._execute(n, step, journal)
+                journal.write(type='done', n=n)
+        finally:
+            journal.close()
+        return summary
+
+    def _execute(self, n, step, journal):
+        table = self.client.table
+        if step['op'] == 'delete':
+            for chunk in _chunks(step['values'], CHUNK_SIZE):
+                table(step['table']).delete().in_(step['key'], chunk).execute()
+            return len(step['values'])
+        if step['op'] == 'insert':
+            for chunk in _chunks(step['rows'], BATCH_SIZE):
+                rows = table(step['table']).insert(chunk).execute().data or []
+                journal.write(type='inserted', n=n, keys=[row[step['key']] for row in rows])
+            return len(step['rows'])
+        if step['op'] == 'upsert':
+            for chunk in _chunks(step['rows'], BATCH_SIZE):
+                table(step['table']).upsert(chunk, on_conflict=step['key']).execute()
+            return len(step['rows'])
+        if step['op'] == 'update':
+            for chunk in _chunks(step['values'], CHUNK_SIZE):
+                table(step['table']).update(step['set']).in_(step['key'], chunk).execute()
+            return len(step['values'])
+        return write_moves(self.client, step['rows'], BATCH_SIZE)
+
+
+def undo(client, path, force=False):
+    """Rejouer un journal à l'envers
+
+    Toutes les étapes sont annulées, de la dernière à la première, qu'elles
+    aient été terminées ou non: les lignes supprimées ou remplacées sont
+    réécrites depuis leur photo (upsert, sans effet si elles sont intactes),
+    les lignes insérées sont supprimées, les colonnes mises à jour reprennent
+    leurs anciennes valeurs (une mise à jour in_() par combinaison de
+    valeurs), les sièges déplacés sont remis en place.
+    """
+    header, steps, inserted, done, undone = read_journal(path)
+    if header is None:
+        raise ValueError(f"Journal illisible: {path}")
+    if undone and not force:
+        raise ValueError(f"Journal déjà annulé: {path}")
+
+    summary = {'restored': 0, 'removed': 0}
+    for n in sorted(steps, reverse=True):
+        step = steps[n]
+        name, key, before = step['table'], step['key'], step['before']
+        if step['op'] == 'insert':
+            keys = inserted.get(n, [])
+            for chunk in _chunks(keys, CHUNK_SIZE):
+                client.table(name).delete().in_(key, chunk).execute()
+            summary['removed'] += len(keys)
+            if n not in done and not keys:
+                print(f"⚠️  Étape {n}: insertion interrompue sans clé journalisée, vérifier {name}")
+        elif step['op'] == 'update':
+            groups = {}
+            for row in before:
+                old = tuple((column, row.get(column)) for column in step['set'])
+                groups.setdefault(old, []).append(row[key])
+            for old, keys in groups.items():
+                for chunk in _chunks(keys, CHUNK_SIZE):
+                    client.table(name).update(dict(old)).in_(key, chunk).execute()
+            summary['restored'] += len(before)
+        elif step['op'] == 'move':
+            write_moves(client, [{c: row[c] for c in ('id', 'guest_id', 'table_id', 'seat_number')}
+                                 for row in before], BATCH_SIZE)
+            summary['restored'] += len(before)
+        else:
+            for chunk in _chunks(before, BATCH_SIZE):
+                client.table(name).upsert(chunk, on_conflict=key).execute()
+            summary['restored'] += len(before)
+            if step['op'] == 'upsert':
+                # Lignes créées par l'upsert: elles n'existaient pas avant
+                existed = {row[key] for row in before}
+                created = [row[key] for row in step['rows'] if row.get(key) not in existed]
+                for chunk in _chunks(created, CHUNK_SIZE):
+                    client.table(name).delete().in_(key, chunk).execute()
+                summary['removed'] += len(created)
+
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps({'type': 'undone', 'at': datetime.now(timezone.utc).isoformat()}) + "\n")
+    return summary
+
+
+def list_journals(journal_dir=JOURNAL_DIR):
+    """Journaux du plus ancien au plus récent"""
+    return sorted(glob.glob(os.path.join(journal_dir, '*.jsonl')))
+
+
+def main(argv=None):
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Lister ou annuler les corrections groupées journalisées")
+    parser.add_argument('--undo', metavar='JOURNAL', help="journal à annuler ('last' pour le plus récent)")
+    parser.add_argument('--force', action='store_true', help="annuler même un journal déjà annulé")
+    parser.add_argument('--journal-dir', default=JOURNAL_DIR)
+    args = parser.parse_args(argv)
+
+    paths = list_journals(args.journal_dir)
+    if not args.undo:
+        print("=== JOURNAUX DE CORRECTION ===\n")
+        if not paths:
+            print("Aucun journal")
+        for path in paths:
+            header, steps, inserted, done, undone = read_journal(path)
+            status = "annulé" if undone else ("complet" if len(done) == len(steps) else "interrompu")
+            ops = ', '.join(f"{s['op']} {s['table']}" for _, s in sorted(steps.items()))
+            print(f"{os.path.basename(path)}: {status} ({ops})")
+        return
+
+    path = paths[-1] if args.undo == 'last' and paths else args.undo
+    if not path or not os.path.exists(path):
+        print("✗ Aucun journal à annuler")
+        return
+
+    from shared_client import get_client
+
+    print(f"=== ANNULATION: {os.path.basename(path)} ===\n")
+    try:
+        summary = undo(get_client(), path, args.force)
+    except ValueError as e:
+        print(f"✗ {e}")
+        return
+    print(f"✓ {summary['restored']} lignes restaurées, {summary['removed']} lignes insérées retirées")
+
+
+if __name__ == "__main__":
+    main()
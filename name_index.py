@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Index local des noms d'invités, insensible aux accents, à la casse et aux espaces
+"""
+
+import unicodedata
+
+# Seuil de similarité (Jaccard sur les trigrammes) pour la recherche approchée
+FUZZY_THRESHOLD = 0.5
+
+# Méthodes de match() sûres pour une écriture sans confirmation (noms
+# normalisés identiques); 'tokens' et 'fuzzy' peuvent désigner un autre invité
+SAFE_MATCHES = ('exact',)
+
+
+def normalize_name(value):
+    """Normaliser un nom: accents retirés (NFKD), casse repliée, espaces fusionnés"""
+    if not value:
+        return ""
+    decomposed = unicodedata.normalize('NFKD', value)
+    stripped = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return ' '.join(stripped.casefold().split())
+
+
+def name_tokens(value):
+    """Ensemble des mots d'un nom normalisé"""
+    return frozenset(normalize_name(value).split())
+
+
+def trigrams(value):
+    """Trigrammes d'un nom normalisé (avec bornes de mots)"""
+    grams = set()
+    for token in normalize_name(value).split():
+        padded = f"  {token} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class NameIndex:
+    """Index en mémoire construit une fois depuis un instantané des invités
+
+    Trois niveaux de recherche, du plus strict au plus tolérant: nom exact
+    normalisé, ensemble de mots (ordre et doublons ignorés), trigrammes.
+    """
+
+    def __init__(self, guests=()):
+        self.guests = {}
+        self._exact = {}
+        self._token_sets = {}
+        self._by_token = {}
+        self._by_trigram = {}
+        self._trigrams = {}
+        for guest in guests:
+            self.add(guest)
+
+    def __len__(self):
+        return len(self.guests)
+
+    def add(self, guest):
+        """Indexer un invité (dict avec id, first_name, last_name)"""
+        guest_id = guest['id']
+        self.guests[guest_id] = guest
+
+        first = normalize_name(guest.get('first_name'))
+        last = normalize_name(guest.get('last_name'))
+        full = f"{first} {last}"
+
+        self._exact.setdefault((first, last), []).append(guest_id)
+
+        tokens = name_tokens(full)
+        self._token_sets.setdefault(tokens, []).append(guest_id)
+        for token in tokens:
+            self._by_token.setdefault(token, set()).add(guest_id)
+
+        grams = trigrams(full)
+        self._trigrams[guest_id] = grams
+        for gram in grams:
+            self._by_trigram.setdefault(gram, set()).add(guest_id)
+
+    def _rows(self, ids):
+        return [self.guests[i] for i in sorted(ids)]
+
+    def exact(self, first_name, last_name):
+        """Invités dont prénom et nom normalisés sont identiques"""
+        key = (normalize_name(first_name), normalize_name(last_name))
+        return self._rows(self._exact.get(key, ()))
+
+    def token_set(self, first_name, last_name=""):
+        """Invités dont le nom complet contient tous les mots recherchés
+
+        Retrouve par exemple "Anne DAHO Daho" pour ("Anne", "DAHO").
+        """
+        wanted = name_tokens(f"{first_name} {last_name}")
+        if not wanted:
+            return []
+
+        same = self._token_sets.get(wanted)
+        if same:
+            return self._rows(same)
+
+        ids = None
+        for token in sorted(wanted, key=lambda t: len(self._by_token.get(t, ()))):
+            candidates = self._by_token.get(token)
+            if not candidates:
+                return []
+            ids = set(candidates) if ids is None else ids & candidates
+            if not ids:
+                return []
+        return self._rows(ids)
+
+    def fuzzy(self, first_name, last_name="", threshold=FUZZY_THRESHOLD, limit=5):
+        """Invités les plus proches au sens des trigrammes, avec leur score"""
+        wanted = trigrams(f"{first_name} {last_name}")
+        if not wanted:
+            return []
+
+        shared = {}
+        for gram in wanted:
+            for guest_id in self._by_trigram.get(gram, ()):
+                shared[guest_id] = shared.get(guest_id, 0) + 1
+
+        scored = []
+        for guest_id, common in shared.items():
+            score = common / (len(wanted) + len(self._trigrams[guest_id]) - common)
+            if score >= threshold:
+                scored.append((score, guest_id))
+
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [(self.guests[guest_id], score) for score, guest_id in scored[:limit]]
+
+    def match(self, first_name, last_name, threshold=FUZZY_THRESHOLD):
+        """Meilleur invité pour un nom: (invité, méthode) ou (None, None)"""
+        found = self.exact(first_name, last_name)
+        if found:
+            return found[0], 'exact'
+
+        found = self.token_set(first_name, last_name)
+        if found:
+            return found[0], 'tokens'
+
+        found = self.fuzzy(first_name, last_name, threshold, limit=1)
+        if found:
+            return found[0][0], 'fuzzy'
+
+        return None, None
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Compteurs d'occupation par table maintenus par triggers (remplace le JSON_AGG de table_status pour les lectures fréquentes)
+"""
+
+import argparse
+
+from shared_client import get_client
+from snapshot import iter_rows
+
+OUTPUT_PATH = 'supabase/07-table-occupancy.sql'
+
+COUNTER_COLUMNS = ('capacity', 'occupied_seats', 'checked_in_count')
+
+OCCUPANCY_SQL = """-- ====================================================
+-- COMPTEURS D'OCCUPATION PAR TABLE
+-- ====================================================
+-- Fichier généré par occupancy.py (ne pas modifier à la main)
+-- Description: table_occupancy garde, pour chaque table, le nombre de places
+-- occupées, d'invités présents et de places libres. Les triggers ci-dessous
+-- la tiennent à jour à chaque écriture ; la lecture coûte O(tables) au lieu
+-- de recalculer COUNT + JSON_AGG sur toutes les assignations.
+-- Idempotent: peut être exécuté plusieurs fois (recalcule les compteurs).
+
+-- ====================================================
+-- 1. TABLE DES COMPTEURS
+-- ====================================================
+CREATE TABLE IF NOT EXISTS table_occupancy (
+  table_number INTEGER PRIMARY KEY REFERENCES tables(table_number) ON DELETE CASCADE ON UPDATE CASCADE,
+  capacity INTEGER NOT NULL DEFAULT 0,
+  occupied_seats INTEGER NOT NULL DEFAULT 0,
+  checked_in_count INTEGER NOT NULL DEFAULT 0,
+  available_seats INTEGER GENERATED ALWAYS AS (capacity - occupied_seats) STORED,
+  updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- ====================================================
+-- 2. TRIGGERS
+-- ====================================================
+
+-- Ajuster les compteurs d'une table (une seule ligne verrouillée)
+CREATE OR REPLACE FUNCTION occupancy_bump(p_table_number INTEGER, p_occupied INTEGER, p_checked_in INTEGER)
+RETURNS VOID AS $$
+BEGIN
+  UPDATE table_occupancy
+  SET occupied_seats = occupied_seats + p_occupied,
+      checked_in_count = checked_in_count + p_checked_in,
+      updated_at = CURRENT_TIMESTAMP
+  WHERE table_number = p_table_number;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Assignations: insertion, suppression, déplacement, check-in
+CREATE OR REPLACE FUNCTION occupancy_on_assignment()
+RETURNS TRIGGER AS $$
+BEGIN
+  IF TG_OP = 'UPDATE'
+     AND OLD.table_id = NEW.table_id
+     AND COALESCE(OLD.checked_in, false) = COALESCE(NEW.checked_in, false) THEN
+    RETURN NULL;
+  END IF;
+
+  IF TG_OP IN ('DELETE', 'UPDATE') THEN
+    PERFORM occupancy_bump(OLD.table_id, -1, -(COALESCE(OLD.checked_in, false)::int));
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    PERFORM occupancy_bump(NEW.table_id, 1, COALESCE(NEW.checked_in, false)::int);
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS occupancy_seating_assignments ON seating_assignments;
+CREATE TRIGGER occupancy_seating_assignments
+AFTER INSERT OR DELETE OR UPDATE OF table_id, checked_in ON seating_assignments
+FOR EACH ROW
+EXECUTE FUNCTION occupancy_on_assignment();
+
+-- Invités: un check-in écrit seulement sur guests est reporté sur
+-- l'assignation, ce qui déclenche le trigger ci-dessus
+CREATE OR REPLACE FUNCTION occupancy_on_guest_checkin()
+RETURNS TRIGGER AS $$
+BEGIN
+  UPDATE seating_assignments
+  SET checked_in = NEW.checked_in,
+      checked_in_at = NEW.checked_in_at
+  WHERE guest_id = NEW.id
+    AND checked_in IS DISTINCT FROM NEW.checked_in;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS occupancy_guests_checkin ON guests;
+CREATE TRIGGER occupancy_guests_checkin
+AFTER UPDATE OF checked_in ON guests
+FOR EACH ROW
+WHEN (OLD.checked_in IS DISTINCT FROM NEW.checked_in)
+EXECUTE FUNCTION occupancy_on_guest_checkin();
+
+-- Tables: création et changement de capacité
+CREATE OR REPLACE FUNCTION occupancy_on_table()
+RETURNS TRIGGER AS $$
+BEGIN
+  INSERT INTO table_occupancy (table_number, capacity)
+  VALUES (NEW.table_number, COALESCE(NEW.capacity, 0))
+  ON CONFLICT (table_number) DO UPDATE
+  SET capacity = EXCLUDED.capacity,
+      updated_at = CURRENT_TIMESTAMP;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS occupancy_tables ON tables;
+CREATE TRIGGER occupancy_tables
+AFTER INSERT OR UPDATE OF capacity ON tables
+FOR EACH ROW
+EXECUTE FUNCTION occupancy_on_table();
+
+-- ====================================================
+-- 3. INITIALISATION / RECALCUL DES COMPTEURS
+-- ====================================================
+BEGIN;
+
+-- Bloquer les écritures sur les assignations pendant le recalcul
+LOCK TABLE seating_assignments IN SHARE MODE;
+
+INSERT INTO table_occupancy (table_number, capacity, occupied_seats, checked_in_count)
+SELECT
+    t.table_number,
+    COALESCE(t.capacity, 0),
+    COUNT(sa.id),
+    COUNT(sa.id) FILTER (WHERE sa.checked_in)
+FROM tables t
+LEFT JOIN seating_assignments sa ON sa.table_id = t.table_number
+GROUP BY t.table_number, t.capacity
+ON CONFLICT (table_number) DO UPDATE
+SET capacity = EXCLUDED.capacity,
+    occupied_seats = EXCLUDED.occupied_seats,
+    checked_in_count = EXCLUDED.checked_in_count,
+    updated_at = CURRENT_TIMESTAMP;
+
+COMMIT;
+
+-- ====================================================
+-- 4. VUE LÉGÈRE POUR LES ÉCRANS QUI INTERROGENT EN BOUCLE
+-- ====================================================
+DROP VIEW IF EXISTS table_occupancy_status CASCADE;
+
+CREATE VIEW table_occupancy_status AS
+SELECT
+    t.id,
+    t.table_number,
+    t.table_name,
+    t.capacity,
+    t.is_vip,
+    t.color_code,
+    t.color_name,
+    o.occupied_seats,
+    o.available_seats,
+    o.checked_in_count
+FROM tables t
+JOIN table_occupancy o ON o.table_number = t.table_number;
+
+-- ====================================================
+-- 5. VÉRIFICATION (doit retourner 0 ligne)
+-- ====================================================
+SELECT o.table_number, o.occupied_seats, COUNT(sa.id) AS expected_occupied,
+       o.checked_in_count, COUNT(sa.id) FILTER (WHERE sa.checked_in) AS expected_checked_in
+FROM table_occupancy o
+LEFT JOIN seating_assignments sa ON sa.table_id = o.table_number
+GROUP BY o.table_number, o.occupied_seats, o.checked_in_count
+HAVING o.occupied_seats <> COUNT(sa.id)
+    OR o.checked_in_count <> COUNT(sa.id) FILTER (WHERE sa.checked_in);
+"""
+
+
+def generate_occupancy_sql(path=OUTPUT_PATH):
+    """Écrire le DDL des compteurs (table, triggers, recalcul, vue)"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(OCCUPANCY_SQL)
+    return path
+
+
+def expected_occupancy(client):
+    """Recalculer les compteurs depuis les tables sources (lecture paginée)"""
+    expected = {}
+    for table in iter_rows(client, 'tables', "table_number, capacity"):
+        expected[table['table_number']] = {
+            'table_number': table['table_number'],
+            'capacity': table['capacity'] or 0,
+            'occupied_seats': 0,
+            'checked_in_count': 0,
+        }
+
+    for assignment in iter_rows(client, 'seating_assignments', "table_id, checked_in"):
+        counters = expected.get(assignment['table_id'])
+        if counters is None:
+            continue  # table inexistante: ignorée, comme par le trigger
+        counters['occupied_seats'] += 1
+        counters['checked_in_count'] += int(bool(assignment['checked_in']))
+    return expected
+
+
+def verify_occupancy(client, expected=None):
+    """Comparer table_occupancy aux valeurs recalculées
+
+    Retourne la liste des écarts (table_number, colonne, attendu, trouvé) ;
+    une table sans ligne de compteurs apparaît avec la colonne 'missing'.
+    """
+    expected = expected if expected is not None else expected_occupancy(client)
+    actual = {row['table_number']: row for row in iter_rows(
+        client, 'table_occupancy', ', '.join(COUNTER_COLUMNS), key='table_number')}
+
+    drift = []
+    for table_number, counters in sorted(expected.items()):
+        row = actual.get(table_number)
+        if row is None:
+            drift.append((table_number, 'missing', counters['occupied_seats'], None))
+            continue
+        for column in COUNTER_COLUMNS:
+            if row[column] != counters[column]:
+                drift.append((table_number, column, counters[column], row[column]))
+    for table_number in sorted(set(actual) - set(expected)):
+        drift.append((table_number, 'orphan', None, actual[table_number]['occupied_seats']))
+    return drift
+
+
+def backfill_occupancy(client, expected=None):
+    """Réécrire tous les compteurs en un seul upsert
+
+    Les écritures concurrentes pendant le calcul peuvent laisser un écart:
+    préférer la section 3 du fichier SQL (sous verrou) quand c'est possible.
+    """
+    expected = expected if expected is not None else expected_occupancy(client)
+    rows = [expected[n] for n in sorted(expected)]
+    if rows:
+        client.table('table_occupancy').upsert(rows, on_conflict='table_number').execute()
+    return len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compteurs d'occupation des tables (DDL, vérification, recalcul)")
+    parser.add_argument('--output', default=OUTPUT_PATH, help="fichier SQL généré")
+    parser.add_argument('--verify', action='store_true', help="comparer les compteurs aux assignations")
+    parser.add_argument('--backfill', action='store_true', help="réécrire les compteurs depuis les assignations")
+    args = parser.parse_args()
+
+    if not (args.verify or args.backfill):
+        generate_occupancy_sql(args.output)
+        print(f"✓ Fichier SQL généré: {args.output}")
+        print("\n⚠️  Exécutez ce fichier dans l'éditeur SQL de Supabase")
+        return
+
+    client = get_client()
+
+    print("=== COMPTEURS D'OCCUPATION ===\n")
+    expected = expected_occupancy(client)
+
+    if args.backfill:
+        count = backfill_occupancy(client, expected)
+        print(f"✓ {count} tables recalculées")
+
+    drift = verify_occupancy(client, expected)
+    if not drift:
+        print(f"✅ Compteurs cohérents ({len(expected)} tables)")
+        return
+    print(f"✗ {len(drift)} écarts détectés:")
+    for table_number, column, wanted, found in drift:
+        print(f"  Table {table_number}: {column} attendu {wanted}, trouvé {found}")
+    print("\nRelancez avec --backfill pour corriger")
+
+
+if __name__ == "__main__":
+    main()
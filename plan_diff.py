@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Différence minimale entre le plan de table CSV et les assignations en base
+"""
+
+from csv_ingest import iter_plan
+from name_index import SAFE_MATCHES, NameIndex
+from seat_allocator import SeatAllocator, load_capacities, write_moves
+from snapshot import GUEST_COLUMNS, iter_rows
+
+# Nombre d'identifiants par suppression in_()
+CHUNK_SIZE = 200
+
+PLAN_ASSIGNMENT_COLUMNS = "id, guest_id, table_id, seat_number"
+
+
+def load_current_state(client):
+    """Charger une fois les invités (indexés par nom), les assignations et les capacités"""
+    index = NameIndex(iter_rows(client, 'guests', GUEST_COLUMNS))
+    assignments = {row['guest_id']: row for row in iter_rows(
+        client, 'seating_assignments', PLAN_ASSIGNMENT_COLUMNS)}
+    return index, assignments, load_capacities(client)
+
+
+def diff_plan(plan, index, assignments, prune=False, capacities=None, allow_fuzzy=False):
+    """Comparer le plan (record, table) à l'état courant
+
+    Retourne un dict de listes: inserts (guest, table, seat), moves
+    (guest, assignment, table, seat), removals (assignment), unchanged
+    (guest, table), not_found (record), duplicates (record, guest: ligne
+    qui retombe sur un invité déjà pris par une autre ligne), unplaced
+    (guest, table: table pleine, rien n'est écrit pour cet invité),
+    uncertain (record, guest, méthode: correspondance par mots ou
+    approchée, ignorée sans `allow_fuzzy`). methods donne la méthode de
+    correspondance de chaque invité planifié. Un invité déjà à la bonne
+    table garde son siège. Les sièges des retraits ne sont réutilisés que
+    si ces retraits seront appliqués (prune). Sans `capacities`, les tables
+    ne sont pas bornées.
+    """
+    diff = {'inserts': [], 'moves': [], 'removals': [], 'unchanged': [],
+            'not_found': [], 'duplicates': [], 'unplaced': [], 'uncertain': [], 'methods': {}}
+
+    planned = {}
+    held = set()
+    for record, table in plan:
+        guest, method = index.match(record.first_name, record.last_name)
+        if guest is not None and guest['id'] in planned:
+            # Homonymes exacts: chaque ligne du CSV prend un invité distinct
+            other = next((g for g in index.exact(record.first_name, record.last_name)
+                          if g['id'] not in planned), None)
+            if other is not None:
+                guest, method = other, 'exact'
+        if guest is None:
+            diff['not_found'].append(record)
+        elif guest['id'] in planned or guest['id'] in held:
+            diff['duplicates'].append((record, guest))
+        elif method not in SAFE_MATCHES and not allow_fuzzy:
+            diff['uncertain'].append((record, guest, method))
+            held.add(guest['id'])
+        else:
+            planned[guest['id']] = (guest, table)
+            diff['methods'][guest['id']] = method
+
+    for guest_id, assignment in assignments.items():
+        # Un invité retenu par une correspondance incertaine n'est pas retiré
+        if guest_id not in planned and guest_id not in held:
+            diff['removals'].append(assignment)
+
+    for guest_id, (guest, table) in planned.items():
+        assignment = assignments.get(guest_id)
+        if assignment is None:
+            continue
+        if assignment['table_id'] == table:
+            diff['unchanged'].append((guest, table))
+        else:
+            diff['moves'].append((guest, assignment, table))
+
+    for guest_id, (guest, table) in planned.items():
+        if guest_id not in assignments:
+            diff['inserts'].append((guest, table))
+
+    return _allocate(diff, SeatAllocator(capacities, assignments.values()), prune)
+
+
+def _allocate(diff, seats, prune):
+    """Choisir les sièges dans l'ordre d'écriture: suppressions, déplacements, insertions
+
+    Un déplacement vers une table pleine est retenté après les autres (un
+    départ de cette table peut libérer une place). Les déplacements restants
+    peuvent former un cycle (échange entre tables pleines): ils sont placés
+    ensemble, tous sièges libérés, ou pas du tout. Ce qui ne trouve toujours
+    pas de siège part dans unplaced au lieu d'être écrit.
+    """
+    if prune:
+        for assignment in diff['removals']:
+            seats.unassign(assignment['guest_id'])
+
+    moves, pending = [], diff['moves']
+    while pending:
+        waiting = []
+        for guest, assignment, table in pending:
+            seat = seats.move_guest_to_seat(guest['id'], table)
+            if seat is None:
+                waiting.append((guest, assignment, table))
+            else:
+                moves.append((guest, assignment, table, seat))
+        if len(waiting) == len(pending):
+            break
+        pending = waiting
+    if pending:
+        # Tout libérer puis tout replacer; en cas d'échec, chacun retrouve son siège
+        previous = [seats.unassign(guest['id']) for guest, _, _ in pending]
+        placed = [(guest, assignment, table, seats.assign(guest['id'], table))
+                  for guest, assignment, table in pending]
+        if all(seat is not None for _, _, _, seat in placed):
+            moves.extend(placed)
+            pending = []
+        else:
+            for guest, _, _, seat in placed:
+                if seat is not None:
+                    seats.unassign(guest['id'])
+            for (guest, _, _), position in zip(pending, previous):
+                seats.assign(guest['id'], *position)
+    diff['moves'] = moves
+    diff['unplaced'].extend((guest, table) for guest, _, table in pending)
+
+    inserts = []
+    for guest, table in diff['inserts']:
+        seat = seats.assign(guest['id'], table)
+        if seat is None:
+            diff['unplaced'].append((guest, table))
+        else:
+            inserts.append((guest, table, seat))
+    diff['inserts'] = inserts
+    return diff
+
+
+def print_summary(diff, capacities=None):
+    """Résumé lisible de ce qui sera écrit"""
+    print("\n=== DIFFÉRENCE PLAN CSV / BASE ===")
+    print(f"Inchangés: {len(diff['unchanged'])}")
+    methods = diff['methods']
+    print(f"Insertions: {len(diff['inserts'])}")
+    for guest, table, seat in diff['inserts']:
+        print(f"  + {guest['first_name']} {guest['last_name']} -> table {table}, siège {seat} "
+              f"[{methods.get(guest['id'])}]")
+    print(f"Déplacements: {len(diff['moves'])}")
+    for guest, assignment, table, seat in diff['moves']:
+        print(f"  ~ {guest['first_name']} {guest['last_name']}: table {assignment['table_id']} "
+              f"-> table {table}, siège {seat} [{methods.get(guest['id'])}]")
+    print(f"Retraits (invités absents du plan): {len(diff['removals'])}")
+    for assignment in diff['removals']:
+        print(f"  - invité {assignment['guest_id']} (table {assignment['table_id']}, "
+              f"siège {assignment['seat_number']})")
+
+    for record in diff['not_found']:
+        print(f"✗ Ligne {record.line}: invité non trouvé: {record.first_name} {record.last_name}")
+    for record, guest in diff['duplicates']:
+        print(f"⚠️  Ligne {record.line}: {record.first_name} {record.last_name} "
+              f"correspond déjà à l'invité {guest['id']}, ignoré")
+    for record, guest, method in diff['uncertain']:
+        print(f"⚠️  Ligne {record.line}: {record.first_name} {record.last_name} ~ "
+              f"{guest['first_name']} {guest['last_name']} (correspondance {method}), ignoré "
+              f"(--allow-fuzzy pour l'appliquer)")
+    for guest, table in diff['unplaced']:
+        print(f"✗ {guest['first_name']} {guest['last_name']}: table {table} pleine, non placé")
+
+    if capacities:
+        # Les insertions et déplacements respectent la capacité: seul un
+        # dépassement déjà présent en base peut subsister
+        occupancy = {}
+        for guest, table in diff['unchanged']:
+            occupancy[table] = occupancy.get(table, 0) + 1
+        for guest, table, seat in diff['inserts']:
+            occupancy[table] = occupancy.get(table, 0) + 1
+        for guest, assignment, table, seat in diff['moves']:
+            occupancy[table] = occupancy.get(table, 0) + 1
+        for table in sorted(occupancy):
+            if table in capacities and occupancy[table] > capacities[table]:
+                print(f"⚠️  Table {table}: {occupancy[table]} invités pour {capacities[table]} places")
+
+
+def apply_diff(client, diff, prune=False):
+    """Écrire uniquement les changements
+
+    Une suppression groupée (avec prune), les déplacements en deux upserts
+    groupés (voir seat_allocator.write_moves) et une insertion groupée.
+    Sans prune, les retraits sont seulement affichés.
+    """
+    written = {'removed': 0, 'moved': 0, 'inserted': 0}
+
+    if prune and diff['removals']:
+        ids = [a['id'] for a in diff['removals']]
+        for i in range(0, len(ids), CHUNK_SIZE):
+            client.table('seating_assignments').delete().in_('id', ids[i:i + CHUNK_SIZE]).execute()
+        written['removed'] = len(ids)
+
+    written['moved'] = write_moves(client, [{
+        'id': assignment['id'],
+        'guest_id': guest['id'],
+        'table_id': table,
+        'seat_number': seat
+    } for guest, assignment, table, seat in diff['moves']])
+
+    if diff['inserts']:
+        client.table('seating_assignments').insert([{
+            'guest_id': guest['id'],
+            'table_id': table,
+            'seat_number': seat,
+            'checked_in': False
+        } for guest, table, seat in diff['inserts']]).execute()
+        written['inserted'] = len(diff['inserts'])
+
+    return written
+
+
+def plan_diff(client, records, prune=False, allow_fuzzy=False):
+    """Charger l'état une fois et calculer la différence avec le plan CSV
+
+    Retourne (différence, capacités des tables).
+    """
+    index, assignments, capacities = load_current_state(client)
+    return diff_plan(iter_plan(records), index, assignments, prune, capacities, allow_fuzzy), capacities
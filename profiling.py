@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Instrumentation du client Supabase: nombre d'appels, lignes, octets et latences
+"""
+
+import json
+import time
+
+# Bornes (ms) de l'histogramme des latences
+BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+# Méthodes qui déterminent le type de requête
+QUERY_METHODS = ('select', 'insert', 'upsert', 'update', 'delete')
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class Profiler:
+    """Statistiques par (table ou rpc, méthode)"""
+
+    def __init__(self):
+        self.stats = {}
+        self.started = time.perf_counter()
+
+    def record(self, target, method, seconds, rows=0, size=0, error=False):
+        entry = self.stats.setdefault((target, method), {
+            'calls': 0, 'errors': 0, 'rows': 0, 'bytes': 0, 'latencies': []
+        })
+        entry['calls'] += 1
+        entry['errors'] += int(error)
+        entry['rows'] += rows
+        entry['bytes'] += size
+        entry['latencies'].append(seconds)
+
+    def summary(self):
+        """Une ligne par (cible, méthode), les plus coûteuses d'abord"""
+        rows = []
+        for (target, method), entry in self.stats.items():
+            latencies = sorted(entry['latencies'])
+            histogram = [0] * (len(BUCKETS_MS) + 1)
+            for seconds in latencies:
+                ms = seconds * 1000
+                histogram[next((i for i, bound in enumerate(BUCKETS_MS) if ms <= bound), len(BUCKETS_MS))] += 1
+            rows.append({
+                'target': target,
+                'method': method,
+                'calls': entry['calls'],
+                'errors': entry['errors'],
+                'rows': entry['rows'],
+                'bytes': entry['bytes'],
+                'total_ms': sum(latencies) * 1000,
+                'p50_ms': _percentile(latencies, 0.50) * 1000,
+                'p95_ms': _percentile(latencies, 0.95) * 1000,
+                'max_ms': latencies[-1] * 1000 if latencies else 0.0,
+                'histogram': dict(zip([f"<={b}ms" for b in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}ms"], histogram)),
+            })
+        rows.sort(key=lambda r: r['total_ms'], reverse=True)
+        return rows
+
+    def print_summary(self):
+        rows = self.summary()
+        print("\n=== PROFIL DES REQUÊTES ===")
+        print(f"{'Cible':<28} {'Méthode':<8} {'Appels':>7} {'Lignes':>8} {'Ko':>9} "
+              f"{'Total ms':>9} {'p50':>7} {'p95':>7} {'max':>7}")
+        print("-" * 101)
+        for r in rows:
+            print(f"{r['target']:<28} {r['method']:<8} {r['calls']:>7} {r['rows']:>8} "
+                  f"{r['bytes'] / 1024:>9.1f} {r['total_ms']:>9.1f} {r['p50_ms']:>7.1f} "
+                  f"{r['p95_ms']:>7.1f} {r['max_ms']:>7.1f}")
+        print("-" * 101)
+        print(f"Total: {sum(r['calls'] for r in rows)} requêtes, "
+              f"{sum(r['rows'] for r in rows)} lignes, "
+              f"{sum(r['total_ms'] for r in rows):.1f} ms cumulés, "
+              f"{(time.perf_counter() - self.started) * 1000:.1f} ms écoulés")
+
+    def write_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'elapsed_ms': (time.perf_counter() - self.started) * 1000,
+                'requests': self.summary(),
+            }, f, indent=2)
+
+
+class _InstrumentedQuery:
+    """Enveloppe un constructeur de requête et mesure son execute()"""
+
+    def __init__(self, profiler, builder, target, method):
+        self._profiler = profiler
+        self._builder = builder
+        self._target = target
+        self._method = method
+
+    def __getattr__(self, name):
+        attr = getattr(self._builder, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            method = name if name in QUERY_METHODS else self._method
+            return _InstrumentedQuery(self._profiler, result, self._target, method)
+        return call
+
+    def execute(self):
+        start = time.perf_counter()
+        try:
+            response = self._builder.execute()
+        except Exception:
+            self._profiler.record(self._target, self._method, time.perf_counter() - start, error=True)
+            raise
+        elapsed = time.perf_counter() - start
+
+        data = getattr(response, 'data', None)
+        rows = len(data) if isinstance(data, list) else int(data is not None)
+        size = len(json.dumps(data, default=str)) if data is not None else 0
+        self._profiler.record(self._target, self._method, elapsed, rows, size)
+        return response
+
+
+class InstrumentedClient:
+    """Remplace un supabase.Client de façon transparente et alimente un Profiler
+
+    Les lectures faites via async_db.AsyncDB.for_client() sont aussi comptées.
+    """
+
+    def __init__(self, client, profiler=None):
+        self._client = client
+        self.profiler = profiler or Profiler()
+
+    def table(self, name):
+        return _InstrumentedQuery(self.profiler, self._client.table(name), name, 'select')
+
+    from_ = table
+
+    def rpc(self, name, params=None, *args, **kwargs):
+        return _InstrumentedQuery(self.profiler, self._client.rpc(name, params, *args, **kwargs),
+                                  f"rpc:{name}", 'rpc')
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+def add_profile_arguments(parser):
+    """Ajouter --profile et --profile-json à un argparse"""
+    parser.add_argument('--profile', action='store_true', help="afficher le profil des requêtes")
+    parser.add_argument('--profile-json', metavar='FICHIER', help="écrire le profil en JSON (implique --profile)")
+
+
+def report(profiler, args):
+    """Afficher et/ou écrire le profil selon les options"""
+    if profiler is None:
+        return
+    profiler.print_summary()
+    if args.profile_json:
+        profiler.write_json(args.profile_json)
+        print(f"✓ Profil écrit dans {args.profile_json}")
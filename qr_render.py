@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Génération groupée des QR codes (PNG, SVG, ZIP et planches PDF imprimables)
+"""
+
+import argparse
+import hashlib
+import io
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+import qrcode
+import qrcode.image.svg
+from PIL import Image, ImageDraw, ImageFont
+
+from shared_client import get_client
+from snapshot import iter_rows
+
+QR_COLUMNS = "id, first_name, last_name, qr_code, table_number, table_name, color_code, is_assigned"
+
+# Mêmes réglages que QRCode.toDataURL dans app/admin/qrcodes/page.tsx
+QR_SIZE = 200
+QR_MARGIN = 2
+
+# À changer si le rendu change: invalide tout le cache
+RENDER_VERSION = 1
+
+# Planche A4 à 150 dpi, grille 3 x 4 comme l'impression de la page admin
+PAGE_SIZE = (1240, 1754)
+GRID = (3, 4)
+
+# Nombre de pages gardées en mémoire avant ajout au PDF
+PDF_CHUNK_PAGES = 25
+
+
+def qr_content(guest):
+    """Contenu du QR code (même repli que la page admin)"""
+    return guest.get('qr_code') or f"WEDDING-{guest['first_name']} {guest['last_name']}"
+
+
+def cache_key(content):
+    """Empreinte du contenu: un QR code inchangé n'est jamais régénéré"""
+    return hashlib.sha256(f"{RENDER_VERSION}|{QR_SIZE}|{QR_MARGIN}|{content}".encode('utf-8')).hexdigest()
+
+
+def render_job(job):
+    """Rendre un QR code en PNG et SVG dans le cache (exécuté dans un processus fils)"""
+    content, key, cache_dir = job
+
+    qr = qrcode.QRCode(border=QR_MARGIN, error_correction=qrcode.constants.ERROR_CORRECT_M)
+    qr.add_data(content)
+    qr.make(fit=True)
+
+    image = qr.make_image(fill_color='#000000', back_color='#FFFFFF').get_image()
+    image = image.convert('L').resize((QR_SIZE, QR_SIZE), Image.NEAREST)
+    png_path = os.path.join(cache_dir, f"{key}.png")
+    image.save(png_path + '.tmp', format='PNG', optimize=True)
+    os.replace(png_path + '.tmp', png_path)
+
+    svg = io.BytesIO()
+    qr.make_image(image_factory=qrcode.image.svg.SvgPathImage).save(svg)
+    svg_path = os.path.join(cache_dir, f"{key}.svg")
+    with open(svg_path + '.tmp', 'wb') as f:
+        f.write(svg.getvalue())
+    os.replace(svg_path + '.tmp', svg_path)
+
+    return key
+
+
+def render_all(guests, cache_dir, workers=None):
+    """Rendre en parallèle les QR codes absents du cache
+
+    Retourne ({guest_id: clé}, nombre rendu).
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    keys = {}
+    jobs = {}
+    for guest in guests:
+        content = qr_content(guest)
+        key = cache_key(content)
+        keys[guest['id']] = key
+        if key not in jobs and not os.path.exists(os.path.join(cache_dir, f"{key}.svg")):
+            jobs[key] = (content, key, cache_dir)
+
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunksize = max(1, len(jobs) // ((workers or os.cpu_count() or 1) * 4))
+            for _ in pool.map(render_job, jobs.values(), chunksize=chunksize):
+                pass
+
+    return keys, len(jobs)
+
+
+def _file_name(guest, used):
+    base = f"QR_{guest['first_name']}_{guest['last_name']}".replace('/', '-').replace(' ', '_')
+    name = base
+    if name in used:
+        name = f"{base}_{guest['id']}"
+    used.add(name)
+    return name
+
+
+def write_zip(path, guests, keys, cache_dir):
+    """Écrire toutes les images dans une seule archive, fichier par fichier"""
+    used = set()
+    with zipfile.ZipFile(path, 'w') as archive:
+        for guest in guests:
+            name = _file_name(guest, used)
+            key = keys[guest['id']]
+            # PNG déjà compressé: stocké tel quel ; SVG compressé
+            archive.write(os.path.join(cache_dir, f"{key}.png"), f"png/{name}.png", zipfile.ZIP_STORED)
+            archive.write(os.path.join(cache_dir, f"{key}.svg"), f"svg/{name}.svg", zipfile.ZIP_DEFLATED)
+
+
+def _load_font(size):
+    try:
+        return ImageFont.truetype("DejaVuSans.ttf", size)
+    except OSError:
+        return ImageFont.load_default()
+
+
+def iter_pages(guests, keys, cache_dir):
+    """Composer les planches A4 une par une (nom, table et pastille de couleur)"""
+    cols, rows = GRID
+    per_page = cols * rows
+    cell_w, cell_h = PAGE_SIZE[0] // cols, (PAGE_SIZE[1] - 120) // rows
+    title_font, name_font, info_font = _load_font(40), _load_font(24), _load_font(20)
+
+    for start in range(0, len(guests), per_page):
+        page = Image.new('RGB', PAGE_SIZE, 'white')
+        draw = ImageDraw.Draw(page)
+        draw.text((PAGE_SIZE[0] // 2, 50), "QR Codes - Mariage Karel & Lambert",
+                  fill='black', font=title_font, anchor='mm')
+
+        for i, guest in enumerate(guests[start:start + per_page]):
+            x = (i % cols) * cell_w
+            y = 120 + (i // cols) * cell_h
+            draw.rectangle((x + 10, y + 10, x + cell_w - 10, y + cell_h - 10), outline='#dddddd', width=2)
+
+            with Image.open(os.path.join(cache_dir, f"{keys[guest['id']]}.png")) as qr_image:
+                page.paste(qr_image, (x + (cell_w - QR_SIZE) // 2, y + 25))
+
+            center = x + cell_w // 2
+            draw.text((center, y + QR_SIZE + 50), f"{guest['first_name']} {guest['last_name']}",
+                      fill='black', font=name_font, anchor='mm')
+            if guest.get('table_number'):
+                info = f"Table {guest['table_number']} - {guest.get('table_name') or ''}"
+                left = center - draw.textlength(info, font=info_font) / 2
+                draw.ellipse((left - 24, y + QR_SIZE + 78, left - 8, y + QR_SIZE + 94),
+                             fill=guest.get('color_code') or '#cccccc')
+            else:
+                info = "Non assigné"
+            draw.text((center, y + QR_SIZE + 86), info, fill='#666666', font=info_font, anchor='mm')
+
+        yield page
+
+
+def write_pdf(path, guests, keys, cache_dir, chunk_pages=PDF_CHUNK_PAGES):
+    """Écrire le PDF par paquets de pages pour garder la mémoire bornée"""
+    pages = 0
+    chunk = []
+
+    def flush(append):
+        chunk[0].save(path, format='PDF', save_all=True, append_images=chunk[1:],
+                      append=append, resolution=150)
+        chunk.clear()
+
+    for page in iter_pages(guests, keys, cache_dir):
+        chunk.append(page)
+        if len(chunk) == chunk_pages:
+            flush(append=pages > 0)
+            pages += chunk_pages
+    if chunk:
+        count = len(chunk)
+        flush(append=pages > 0)
+        pages += count
+    return pages
+
+
+def load_guests(client, status='all'):
+    """Invités triés comme sur la page admin (nom puis prénom)"""
+    guests = list(iter_rows(client, 'all_guests_status', QR_COLUMNS))
+    if status == 'assigned':
+        guests = [g for g in guests if g.get('is_assigned')]
+    elif status == 'unassigned':
+        guests = [g for g in guests if not g.get('is_assigned')]
+    guests.sort(key=lambda g: (g['last_name'], g['first_name']))
+    return guests
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Générer tous les QR codes en parallèle")
+    parser.add_argument('--zip', default='qrcodes.zip', help="archive de sortie (PNG + SVG)")
+    parser.add_argument('--pdf', default='qrcodes.pdf', help="planches imprimables")
+    parser.add_argument('--filter', choices=['all', 'assigned', 'unassigned'], default='all')
+    parser.add_argument('--workers', type=int, default=None, help="nombre de processus (défaut: nombre de CPU)")
+    parser.add_argument('--cache', default='.qrcache', help="dossier du cache de rendu")
+    args = parser.parse_args()
+
+    client = get_client()
+
+    print("=== GÉNÉRATION DES QR CODES ===\n")
+    guests = load_guests(client, args.filter)
+    print(f"{len(guests)} invités")
+
+    start = time.perf_counter()
+    keys, rendered = render_all(guests, args.cache, args.workers)
+    print(f"✓ {rendered} QR codes rendus, {len(set(keys.values())) - rendered} repris du cache "
+          f"({time.perf_counter() - start:.2f}s)")
+
+    write_zip(args.zip, guests, keys, args.cache)
+    print(f"✓ Archive: {args.zip}")
+
+    pages = write_pdf(args.pdf, guests, keys, args.cache)
+    print(f"✓ PDF: {args.pdf} ({pages} pages)")
+
+    print(f"\n✅ Terminé en {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
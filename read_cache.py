@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Cache de lecture (TTL par source, éviction LRU) devant le client Supabase, invalidé par les écritures du processus
+"""
+
+import copy
+import json
+import threading
+import time
+from collections import OrderedDict
+
+# Durée de vie par table ou vue (secondes). Les tables bougent peu en dehors
+# du check-in; les vues de statut suivent les check-ins, d'où un TTL court
+DEFAULT_TTL = 30
+SOURCE_TTLS = {
+    'tables': 300,
+    'access_codes': 300,
+    'table_status': 15,
+    'table_occupancy_status': 15,
+    'all_guests_status': 15,
+    'event_statistics': 15,
+    'event_headcounts': 60,
+    'unassigned_guests': 30,
+}
+
+# Nombre maximal de réponses gardées
+MAX_ENTRIES = 256
+
+# Vues à invalider quand une table source est écrite (02-views.sql, 07, 09).
+# Une écriture sur guests touche aussi seating_assignments et table_occupancy:
+# le déclencheur occupancy_guests_checkin (07) y recopie checked_in, et
+# ON DELETE CASCADE supprime les assignations d'un invité supprimé.
+DEPENDENTS = {
+    'guests': ('all_guests_status', 'table_status', 'event_statistics', 'unassigned_guests',
+               'event_headcounts', 'seating_assignments', 'table_occupancy', 'table_occupancy_status'),
+    'seating_assignments': ('all_guests_status', 'table_status', 'event_statistics', 'unassigned_guests',
+                            'table_occupancy', 'table_occupancy_status'),
+    'tables': ('all_guests_status', 'table_status', 'event_statistics', 'table_occupancy',
+               'table_occupancy_status'),
+    'table_occupancy': ('table_occupancy_status',),
+}
+
+WRITE_METHODS = {'insert', 'upsert', 'update', 'delete', 'rpc'}
+
+
+class ReadCache:
+    """Réponses des lectures indexées par (source, forme de la requête)
+
+    La forme est la suite des appels du constructeur (select, eq, in_,
+    order, limit...) avec leurs arguments: deux requêtes identiques
+    partagent une entrée, un filtre différent crée une autre entrée.
+    """
+
+    def __init__(self, ttls=None, default_ttl=DEFAULT_TTL, max_entries=MAX_ENTRIES, clock=time.monotonic):
+        self.ttls = dict(SOURCE_TTLS if ttls is None else ttls)
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self.entries = OrderedDict()
+        self.stats = {}
+        self.lock = threading.Lock()
+
+    def _stat(self, source, name):
+        counters = self.stats.setdefault(source, {'hits': 0, 'misses': 0, 'expired': 0,
+                                                  'evicted': 0, 'invalidated': 0})
+        counters[name] += 1
+
+    def ttl(self, source):
+        return self.ttls.get(source, self.default_ttl)
+
+    def get(self, key):
+        """Réponse en cache (copie) ou None"""
+        source = key[0]
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] <= self.clock():
+                del self.entries[key]
+                self._stat(source, 'expired')
+                entry = None
+            if entry is None:
+                self._stat(source, 'misses')
+                return None
+            self.entries.move_to_end(key)
+            self._stat(source, 'hits')
+            response = entry[1]
+        # L'appelant peut modifier les lignes: ne jamais rendre l'objet gardé
+        return copy.deepcopy(response)
+
+    def put(self, key, response):
+        ttl = self.ttl(key[0])
+        if ttl <= 0:
+            return
+        with self.lock:
+            self.entries[key] = (self.clock() + ttl, copy.deepcopy(response))
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                evicted, _ = self.entries.popitem(last=False)
+                self._stat(evicted[0], 'evicted')
+
+    def invalidate(self, source=None):
+        """Oublier une source et les vues qui en dépendent (tout si source est None)"""
+        with self.lock:
+            if source is None:
+                doomed = list(self.entries)
+            else:
+                sources = {source, *DEPENDENTS.get(source, ())}
+                doomed = [key for key in self.entries if key[0] in sources]
+            for key in doomed:
+                del self.entries[key]
+                self._stat(key[0], 'invalidated')
+        return len(doomed)
+
+    def summary(self):
+        """Statistiques par source, triées par nombre de lectures"""
+        rows = []
+        for source, counters in self.stats.items():
+            reads = counters['hits'] + counters['misses']
+            rows.append({'source': source, 'reads': reads,
+                         'hit_rate': counters['hits'] / reads if reads else 0.0, **counters})
+        return sorted(rows, key=lambda r: -r['reads'])
+
+    def print_summary(self):
+        print("\n=== CACHE DE LECTURE ===")
+        print(f"{'Source':<26}{'Lectures':>9}{'Succès':>8}{'Échecs':>8}{'Taux':>7}{'Expirés':>9}{'Évincés':>9}{'Invalidés':>11}")
+        for row in self.summary():
+            print(f"{row['source']:<26}{row['reads']:>9}{row['hits']:>8}{row['misses']:>8}"
+                  f"{row['hit_rate']:>7.0%}{row['expired']:>9}{row['evicted']:>9}{row['invalidated']:>11}")
+        print(f"{len(self.entries)} réponses en cache (max {self.max_entries})")
+
+
+def _shape(value):
+    return json.dumps(value, sort_keys=True, default=str)
+
+
+class _CachedQuery:
+    """Enveloppe un constructeur de requête et note la forme de la requête"""
+
+    def __init__(self, cache, builder, source, calls=()):
+        self._cache = cache
+        self._builder = builder
+        self._source = source
+        self._calls = calls
+
+    def __getattr__(self, name):
+        attr = getattr(self._builder, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            return _CachedQuery(self._cache, result, self._source,
+                                self._calls + ((name, _shape(args), _shape(kwargs)),))
+        return call
+
+    def execute(self):
+        methods = {name for name, _, _ in self._calls}
+        if methods & WRITE_METHODS:
+            try:
+                return self._builder.execute()
+            finally:
+                # Même en cas d'erreur: l'écriture a pu passer côté serveur
+                self._cache.invalidate(None if 'rpc' in methods else self._source)
+        if 'select' not in methods:
+            return self._builder.execute()
+
+        key = (self._source, self._calls)
+        response = self._cache.get(key)
+        if response is None:
+            response = self._builder.execute()
+            self._cache.put(key, response)
+        return response
+
+
+class CachedClient:
+    """Remplace un supabase.Client: lectures mises en cache, écritures invalidantes
+
+    Les appels rpc() ne sont pas mis en cache et vident tout le cache (une
+    fonction comme check_in_guest_by_qr écrit). Les lectures asynchrones
+    (async_db) ne passent pas par ce cache.
+    """
+
+    def __init__(self, client, cache=None):
+        self._client = client
+        self.cache = cache or ReadCache()
+
+    def table(self, name):
+        return _CachedQuery(self.cache, self._client.table(name), name)
+
+    from_ = table
+
+    def rpc(self, name, params=None, *args, **kwargs):
+        return _CachedQuery(self.cache, self._client.rpc(name, params, *args, **kwargs),
+                            f"rpc:{name}", (('rpc', _shape(params), ''),))
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
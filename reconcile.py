@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Réconciliation groupée des assignations (nombre constant d'aller-retours)
+"""
+
+from name_index import SAFE_MATCHES
+from seat_allocator import SeatAllocator
+
+
+def _quote(value):
+    """Protéger une valeur pour un filtre PostgREST or=(...)"""
+    return '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def resolve_guests(client, wanted, index=None, uncertain=None):
+    """Retrouver les invités de (prénom, nom, table) en deux requêtes maximum
+
+    Retourne un dict {(prénom, nom): invité}. La première requête cherche les
+    prénoms exacts via in_(), la seconde regroupe les recherches ilike des
+    prénoms restants dans un seul filtre or_(). Avec un NameIndex, la
+    résolution est faite localement, sans requête, et seules les
+    correspondances de name_index.SAFE_MATCHES sont retenues: les autres
+    sont ajoutées à `uncertain` sous la forme (prénom, nom, table, invité,
+    méthode).
+    """
+    if index is not None:
+        resolved = {}
+        for first_name, last_name, table_num in wanted:
+            guest, method = index.match(first_name, last_name)
+            if guest is None:
+                continue
+            if method in SAFE_MATCHES:
+                resolved[(first_name, last_name)] = guest
+            elif uncertain is not None:
+                uncertain.append((first_name, last_name, table_num, guest, method))
+        return resolved
+
+    first_names = sorted({first for first, _, _ in wanted})
+    rows = client.table('guests').select("id, first_name, last_name") \
+        .in_('first_name', first_names).execute().data or []
+
+    by_first = {}
+    for row in rows:
+        by_first.setdefault(row['first_name'], []).append(row)
+
+    resolved = {}
+    pending = []
+    for first_name, last_name, _ in wanted:
+        candidates = by_first.get(first_name)
+        if candidates:
+            resolved[(first_name, last_name)] = _pick(candidates, last_name)
+        else:
+            pending.append((first_name, last_name))
+
+    if pending:
+        clauses = ','.join(f"first_name.ilike.{_quote('*' + first + '*')}" for first, _ in pending)
+        rows = client.table('guests').select("id, first_name, last_name") \
+            .or_(clauses).execute().data or []
+        for first_name, last_name in pending:
+            candidates = [r for r in rows if first_name.lower() in r['first_name'].lower()]
+            if candidates:
+                resolved[(first_name, last_name)] = _pick(candidates, last_name)
+
+    return resolved
+
+
+def _pick(candidates, last_name):
+    """Préférer le candidat dont le nom de famille correspond"""
+    wanted = last_name.strip().lower()
+    for candidate in candidates:
+        if wanted in candidate['last_name'].strip().lower():
+            return candidate
+    return candidates[0]
+
+
+def reconcile_assignments(client, wanted, index=None, mutation=None):
+    """Assigner en bloc une liste de (prénom, nom, table)
+
+    Six requêtes au plus (quatre avec un NameIndex), quel que soit le nombre
+    d'invités : résolution des noms (1 ou 2, aucune avec un NameIndex),
+    assignations existantes, capacités puis occupation des tables
+    concernées, et une insertion groupée. Les sièges sont pris au plus bas parmi les libres,
+    sans dépasser la capacité (sinon l'invité est dans report['table_full']).
+    Les correspondances de nom incertaines (par mots ou approchées, voir
+    resolve_guests) ne sont pas assignées mais listées dans report['uncertain'].
+    Avec un BulkMutation, l'insertion y est seulement planifiée: l'appelant
+    l'applique (et la journalise) avec mutation.apply().
+    """
+    uncertain = []
+    resolved = resolve_guests(client, wanted, index, uncertain)
+    held = {(first_name, last_name) for first_name, last_name, _, _, _ in uncertain}
+    guest_ids = sorted({g['id'] for g in resolved.values()})
+    table_ids = sorted({table_num for _, _, table_num in wanted})
+
+    already_assigned = set()
+    if guest_ids:
+        rows = client.table('seating_assignments').select("guest_id") \
+            .in_('guest_id', guest_ids).execute().data or []
+        already_assigned = {r['guest_id'] for r in rows}
+
+    # Capacités et sièges occupés des tables concernées: les trous sont réutilisés
+    seats = SeatAllocator()
+    if table_ids:
+        rows = client.table('tables').select("table_number, capacity") \
+            .in_('table_number', table_ids).execute().data or []
+        capacities = {row['table_number']: row['capacity'] or 10 for row in rows}
+        rows = client.table('seating_assignments').select("guest_id, table_id, seat_number") \
+            .in_('table_id', table_ids).execute().data or []
+        seats = SeatAllocator(capacities, rows)
+
+    report = {'assigned': [], 'already_assigned': [], 'not_found': [], 'table_full': [],
+              'uncertain': uncertain}
+    to_insert = []
+    for first_name, last_name, table_num in wanted:
+        guest = resolved.get((first_name, last_name))
+        if guest is None:
+            if (first_name, last_name) in held:
+                continue
+            report['not_found'].append((first_name, last_name))
+            continue
+
+        guest_id = guest['id']
+        if guest_id in already_assigned:
+            report['already_assigned'].append((first_name, last_name))
+            continue
+
+        seat = seats.assign(guest_id, table_num)
+        if seat is None:
+            report['table_full'].append((first_name, last_name, table_num))
+            continue
+        already_assigned.add(guest_id)
+        to_insert.append({
+            'guest_id': guest_id,
+            'table_id': table_num,
+            'seat_number': seat,
+            'checked_in': False
+        })
+        report['assigned'].append((first_name, last_name, table_num))
+
+    if mutation is not None:
+        mutation.insert('seating_assignments', to_insert)
+    elif to_insert:
+        client.table('seating_assignments').insert(to_insert).execute()
+
+    return report
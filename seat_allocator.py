@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Places libres par table (tas min), construites depuis un seul instantané des assignations
+"""
+
+import heapq
+
+from snapshot import iter_rows
+
+# Lignes par requête d'écriture groupée
+BATCH_SIZE = 500
+
+ALLOCATOR_ASSIGNMENT_COLUMNS = "id, guest_id, table_id, seat_number"
+
+# Capacité par défaut de tables.capacity (01-main-schema.sql)
+DEFAULT_CAPACITY = 10
+
+
+def load_capacities(client, default_capacity=DEFAULT_CAPACITY):
+    """Capacité de chaque table, indexée par numéro (une lecture paginée)"""
+    return {row['table_number']: row['capacity'] or default_capacity
+            for row in iter_rows(client, 'tables', "table_number, capacity")}
+
+
+class SeatAllocator:
+    """Attribution des sièges sans MAX(seat_number)+1
+
+    Pour chaque table: un tas des sièges libres sous le plus haut siège déjà
+    vu (les trous laissés par les suppressions sont réutilisés en premier),
+    puis les sièges suivants jusqu'à la capacité. Une table sans capacité
+    connue (None) n'est pas bornée. Allocation, libération et réservation
+    d'un siège précis sont en O(log n).
+
+    Les positions d'origine sont gardées: changes() et write() ne produisent
+    que les différences avec l'instantané.
+    """
+
+    def __init__(self, capacities=None, assignments=()):
+        self.capacities = dict(capacities or {})
+        self.seat_of = {}
+        self.original = {}
+        self._holes = {}
+        self._free = {}
+        self._high = {}
+
+        occupied = {}
+        for row in assignments:
+            table, seat = row['table_id'], row['seat_number']
+            self.seat_of[row['guest_id']] = (table, seat)
+            self.original[row['guest_id']] = (row.get('id'), table, seat)
+            occupied.setdefault(table, set()).add(seat)
+
+        for table in set(self.capacities) | set(occupied):
+            taken = occupied.get(table, set())
+            high = max(taken, default=0)
+            limit = self.capacity(table)
+            if limit is not None:
+                high = min(high, limit)
+            free = {seat for seat in range(1, high + 1) if seat not in taken}
+            holes = sorted(free)
+            self._free[table] = free
+            self._holes[table] = holes
+            self._high[table] = max(high, max(taken, default=0))
+
+    @classmethod
+    def load(cls, client, default_capacity=DEFAULT_CAPACITY):
+        """Capacités et assignations en deux lectures paginées"""
+        return cls(load_capacities(client, default_capacity),
+                   iter_rows(client, 'seating_assignments', ALLOCATOR_ASSIGNMENT_COLUMNS))
+
+    def capacity(self, table):
+        return self.capacities.get(table)
+
+    def _table(self, table):
+        if table not in self._free:
+            self._free[table] = set()
+            self._holes[table] = []
+            self._high[table] = 0
+        return self._free[table], self._holes[table]
+
+    def free_count(self, table):
+        """Sièges encore disponibles (None pour une table sans capacité)"""
+        free, _ = self._table(table)
+        limit = self.capacity(table)
+        if limit is None:
+            return None
+        return len(free) + max(0, limit - self._high[table])
+
+    # Opérations sur les sièges
+
+    def allocate(self, table):
+        """Plus petit siège libre de la table, ou None si elle est pleine"""
+        free, holes = self._table(table)
+        while holes:
+            seat = heapq.heappop(holes)
+            if seat in free:
+                free.discard(seat)
+                return seat
+        limit = self.capacity(table)
+        if limit is not None and self._high[table] >= limit:
+            return None
+        self._high[table] += 1
+        return self._high[table]
+
+    def reserve(self, table, seat):
+        """Occuper un siège précis; False s'il est déjà pris ou hors capacité"""
+        free, holes = self._table(table)
+        limit = self.capacity(table)
+        if seat < 1 or (limit is not None and seat > limit):
+            return False
+        if seat in free:
+            # Suppression paresseuse: l'entrée du tas est ignorée au prochain allocate()
+            free.discard(seat)
+            return True
+        if seat <= self._high[table]:
+            return False
+        for gap in range(self._high[table] + 1, seat):
+            free.add(gap)
+            heapq.heappush(holes, gap)
+        self._high[table] = seat
+        return True
+
+    def release(self, table, seat):
+        """Rendre un siège (un siège au-delà de la capacité n'est pas réattribué)"""
+        free, holes = self._table(table)
+        limit = self.capacity(table)
+        if seat in free or seat > self._high[table] or (limit is not None and seat > limit):
+            return
+        free.add(seat)
+        heapq.heappush(holes, seat)
+
+    # Opérations sur les invités
+
+    def assign(self, guest_id, table, seat=None):
+        """Placer un invité (le plus petit siège libre si `seat` est None)
+
+        Retourne le siège, ou None si la table est pleine ou le siège pris.
+        Un invité déjà placé est déplacé.
+        """
+        if guest_id in self.seat_of:
+            return self.move_guest_to_seat(guest_id, table, seat)
+        if seat is None:
+            seat = self.allocate(table)
+        elif not self.reserve(table, seat):
+            seat = None
+        if seat is not None:
+            self.seat_of[guest_id] = (table, seat)
+        return seat
+
+    def unassign(self, guest_id):
+        """Retirer un invité et libérer son siège"""
+        position = self.seat_of.pop(guest_id, None)
+        if position is not None:
+            self.release(*position)
+        return position
+
+    def move_guest_to_seat(self, guest_id, table, seat=None):
+        """Déplacer un invité; son ancien siège n'est libéré qu'après avoir pris le nouveau"""
+        old = self.seat_of.get(guest_id)
+        if old is not None and old[0] == table and seat in (None, old[1]):
+            return old[1]
+        if seat is None:
+            seat = self.allocate(table)
+        elif not self.reserve(table, seat):
+            seat = None
+        if seat is None:
+            return None
+        self.seat_of[guest_id] = (table, seat)
+        if old is not None:
+            self.release(*old)
+        return seat
+
+    def move_guests(self, moves):
+        """Déplacements groupés [(guest_id, table, seat)], échanges de sièges compris
+
+        Les anciens sièges sont tous libérés avant de réserver les nouveaux,
+        ce qui permet de permuter des invités. Lève ValueError (sans rien
+        modifier) si une cible reste occupée.
+        """
+        moves = [(guest_id, table, seat) for guest_id, table, seat in moves
+                 if self.seat_of.get(guest_id) != (table, seat)]
+        previous = {guest_id: self.seat_of.get(guest_id) for guest_id, _, _ in moves}
+        for guest_id, _, _ in moves:
+            if previous[guest_id] is not None:
+                self.release(*previous[guest_id])
+
+        reserved = []
+        for guest_id, table, seat in moves:
+            if not self.reserve(table, seat):
+                for position in reserved:
+                    self.release(*position)
+                for position in previous.values():
+                    if position is not None:
+                        self.reserve(*position)
+                raise ValueError(f"Siège {seat} de la table {table} indisponible pour l'invité {guest_id}")
+            reserved.append((table, seat))
+
+        for guest_id, table, seat in moves:
+            self.seat_of[guest_id] = (table, seat)
+        return len(moves)
+
+    # Écriture
+
+    def changes(self):
+        """Différences avec l'instantané: inserts, moves et removals (lignes prêtes à écrire)
+
+        Lève ValueError si un déplacement ou un retrait vise une assignation
+        dont l'identifiant n'est pas connu (instantané sans colonne id, ou
+        insertion dont la réponse n'a pas rendu la ligne): recharger avec
+        SeatAllocator.load().
+        """
+        inserts, moves, removals = [], [], []
+        for guest_id, (table, seat) in self.seat_of.items():
+            original = self.original.get(guest_id)
+            if original is None:
+                inserts.append({'guest_id': guest_id, 'table_id': table, 'seat_number': seat})
+            elif original[1:] != (table, seat):
+                moves.append({'id': original[0], 'guest_id': guest_id, 'table_id': table, 'seat_number': seat})
+        for guest_id, (assignment_id, table, seat) in self.original.items():
+            if guest_id not in self.seat_of:
+                removals.append({'id': assignment_id, 'guest_id': guest_id, 'table_id': table, 'seat_number': seat})
+        unknown = [row['guest_id'] for row in moves + removals if row['id'] is None]
+        if unknown:
+            raise ValueError(f"Assignations sans identifiant connu (invités {unknown[:5]}): "
+                             "recharger l'état avec SeatAllocator.load()")
+        return {'inserts': inserts, 'moves': moves, 'removals': removals}
+
+    def write(self, client, batch_size=BATCH_SIZE):
+        """Appliquer changes() en écritures groupées, puis repartir de l'état écrit
+
+        Les identifiants des lignes insérées sont repris de la réponse de
+        l'insertion: un second write() peut déplacer ou retirer ces lignes.
+        """
+        changes = self.changes()
+        removals = [row['id'] for row in changes['removals']]
+        for i in range(0, len(removals), batch_size):
+            client.table('seating_assignments').delete().in_('id', removals[i:i + batch_size]).execute()
+        write_moves(client, changes['moves'], batch_size)
+        inserted = {}
+        for i in range(0, len(changes['inserts']), batch_size):
+            rows = client.table('seating_assignments').insert(changes['inserts'][i:i + batch_size]).execute().data
+            inserted.update((row['guest_id'], row.get('id')) for row in rows or [])
+
+        self.original = {
+            guest_id: (self.original[guest_id][0] if guest_id in self.original else inserted.get(guest_id),
+                       table, seat)
+            for guest_id, (table, seat) in self.seat_of.items()
+        }
+        return {key: len(rows) for key, rows in changes.items()}
+
+
+def write_moves(client, moves, batch_size=BATCH_SIZE):
+    """Déplacer des assignations existantes sans violer UNIQUE(table_id, seat_number)
+
+    La contrainte est vérifiée ligne par ligne: une permutation écrite en une
+    passe heurterait le siège pas encore libéré. Les lignes sont d'abord
+    garées sur un siège négatif propre à chacune (-id), puis écrites à leur
+    place définitive: deux upserts groupés par lot de `batch_size`. Chaque ligne: id, guest_id, table_id, seat_number.
+    """
+    parked = [{**row, 'seat_number': -row['id']} for row in moves]
+    for rows in (parked, moves):
+        for i in range(0, len(rows), batch_size):
+            client.table('seating_assignments').upsert(rows[i:i + batch_size], on_conflict='id').execute()
+    return len(moves)
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Placement groupé des invités non assignés (remplace les appels auto_assign_guest un par un)
+"""
+
+import argparse
+import time
+
+from csv_ingest import CHILDREN_TABLE
+from name_index import name_tokens
+from seat_allocator import SeatAllocator
+from shared_client import get_client
+from snapshot import iter_rows
+
+# Nombre de lignes par insertion groupée
+BATCH_SIZE = 500
+
+SEATING_GUEST_COLUMNS = "id, first_name, last_name, email, qr_code"
+
+
+def load_seating_state(client):
+    """Charger capacités, sièges occupés et invités en trois lectures paginées"""
+    seats = SeatAllocator.load(client)
+    unassigned = [g for g in iter_rows(client, 'guests', SEATING_GUEST_COLUMNS)
+                  if g['id'] not in seats.seat_of]
+    return seats, unassigned
+
+
+def is_child(guest):
+    """Les fiches "Enfant 1", "Enfant2"... vont à la table des enfants"""
+    return any(t.startswith('enfant') for t in name_tokens(guest.get('first_name')))
+
+
+def households(guests):
+    """Regrouper les invités par e-mail partagé (ex: les deux Kalou)"""
+    groups = {}
+    for guest in guests:
+        email = (guest.get('email') or "").strip().casefold()
+        key = email or f"#{guest['id']}"
+        groups.setdefault(key, []).append(guest)
+    return list(groups.values())
+
+
+def _take(seats, table_number, guests, placements):
+    for guest in guests:
+        placements.append({
+            'guest_id': guest['id'],
+            'table_id': table_number,
+            'seat_number': seats.assign(guest['id'], table_number)
+        })
+
+
+def solve(seats, guests, children_table=CHILDREN_TABLE):
+    """Placer tous les invités en une passe
+
+    Les enfants vont à la table des enfants, qui reste fermée aux adultes.
+    Chaque ménage est placé entier à la première table (par numéro) qui a
+    assez de places, les plus grands ménages d'abord ; un ménage trop grand
+    pour toute table est réparti sur les tables suivantes.
+    Les sièges viennent du SeatAllocator `seats` (plus petit siège libre
+    d'abord). Retourne (placements, invités non placés).
+    """
+    adult_tables = sorted(t for t in seats.capacities if t != children_table)
+    placements = []
+    unplaced = []
+
+    children = [g for g in guests if is_child(g)]
+    adults = [g for g in guests if not is_child(g)]
+
+    if children_table in seats.capacities:
+        fit = min(len(children), seats.free_count(children_table))
+        _take(seats, children_table, children[:fit], placements)
+        unplaced.extend(children[fit:])
+    else:
+        unplaced.extend(children)
+
+    for group in sorted(households(adults), key=len, reverse=True):
+        table = next((t for t in adult_tables if seats.free_count(t) >= len(group)), None)
+        if table is not None:
+            _take(seats, table, group, placements)
+            continue
+
+        # Aucune table assez grande: répartir dans l'ordre des tables
+        remaining = list(group)
+        for t in adult_tables:
+            if not remaining:
+                break
+            fit = min(len(remaining), seats.free_count(t))
+            _take(seats, t, remaining[:fit], placements)
+            remaining = remaining[fit:]
+        unplaced.extend(remaining)
+
+    return placements, unplaced
+
+
+def write_placements(client, placements, guests, batch_size=BATCH_SIZE):
+    """Écrire les assignations par lots et générer les QR codes manquants
+
+    Chaque QR code est unique: une mise à jour par invité, limitée à la
+    colonne qr_code (un nom modifié entre-temps n'est pas écrasé) et aux
+    invités qui n'en ont toujours pas.
+    """
+    for i in range(0, len(placements), batch_size):
+        client.table('seating_assignments').insert(placements[i:i + batch_size]).execute()
+
+    placed = {p['guest_id'] for p in placements}
+    stamp = str(time.time())
+    for guest in guests:
+        if guest['id'] in placed and not guest.get('qr_code'):
+            client.table('guests').update({'qr_code': f"WEDDING-{guest['id']}-{stamp}"}) \
+                .eq('id', guest['id']).is_('qr_code', 'null').execute()
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Placer tous les invités non assignés en une passe")
+    parser.add_argument('--apply', action='store_true', help="écrire les assignations dans la base")
+    args = parser.parse_args()
+
+    client = get_client()
+
+    print("=== PLACEMENT AUTOMATIQUE ===\n")
+    seats, guests = load_seating_state(client)
+    placements, unplaced = solve(seats, guests)
+
+    per_table = {}
+    for placement in placements:
+        per_table[placement['table_id']] = per_table.get(placement['table_id'], 0) + 1
+    for table_number in sorted(per_table):
+        print(f"Table {table_number}: +{per_table[table_number]} invités")
+
+    print(f"\n{len(placements)} invités placés, {len(unplaced)} sans place")
+    for guest in unplaced[:10]:
+        print(f"✗ Pas de place pour {guest['first_name']} {guest['last_name']}")
+
+    if not args.apply:
+        print("\nMode simulation: relancer avec --apply pour écrire les assignations")
+        return
+
+    write_placements(client, placements, guests)
+    print("\n✅ Assignations enregistrées")
+
+
+if __name__ == "__main__":
+    main()
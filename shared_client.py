@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Client Supabase partagé, créé à la première utilisation (import paresseux du SDK)
+"""
+
+import os
+
+_client = None
+_profiler = None
+_cache = None
+
+
+def get_client():
+    """Retourner le client du processus, en le créant au premier appel
+
+    Le SDK supabase et .env.local ne sont chargés qu'ici: les commandes qui
+    ne touchent pas la base ne paient pas leur coût d'import.
+    """
+    global _client
+    if _client is None:
+        from dotenv import load_dotenv
+        from supabase import create_client
+
+        # Charger les variables d'environnement
+        load_dotenv('.env.local')
+        client = create_client(os.getenv('NEXT_PUBLIC_SUPABASE_URL'), os.getenv('NEXT_PUBLIC_SUPABASE_ANON_KEY'))
+        if _profiler is not None:
+            from profiling import InstrumentedClient
+            client = InstrumentedClient(client, _profiler)
+        if _cache is not None:
+            from read_cache import CachedClient
+            client = CachedClient(client, _cache)
+        _client = client
+    return _client
+
+
+def set_client(client):
+    """Remplacer le client partagé (None pour le recréer au prochain appel)"""
+    global _client
+    _client = client
+
+
+def enable_profiling():
+    """Instrumenter le client partagé; retourne le Profiler"""
+    global _client, _profiler
+    from profiling import InstrumentedClient, Profiler
+
+    if _profiler is None:
+        _profiler = Profiler()
+        if _client is not None:
+            _client = InstrumentedClient(_client, _profiler)
+    return _profiler
+
+
+def enable_caching(ttls=None):
+    """Mettre les lectures du client partagé en cache; retourne le ReadCache
+
+    Le cache enveloppe le client instrumenté: le profil ne compte que les
+    requêtes réellement envoyées.
+    """
+    global _client, _cache
+    from read_cache import CachedClient, ReadCache
+
+    if _cache is None:
+        _cache = ReadCache(ttls)
+        if _client is not None:
+            _client = CachedClient(_client, _cache)
+    return _cache
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Chargement paginé des données Supabase (pagination par clé sur id)
+"""
+
+# Taille d'une page PostgREST: égale à la limite max-rows par défaut (1000),
+# à baisser si le projet configure une limite plus basse
+PAGE_SIZE = 1000
+
+# Colonnes réellement utilisées par le rapport d'assignations
+GUEST_COLUMNS = "id, first_name, last_name"
+ASSIGNMENT_COLUMNS = "id, guest_id, table_id"
+
+
+def iter_rows(client, table, columns, page_size=PAGE_SIZE, key='id', filters=()):
+    """Parcourir une table page par page, triée sur la clé
+
+    Chaque page reprend après la dernière clé vue (keyset), ce qui évite
+    les OFFSET coûteux. Le parcours s'arrête à la première page de moins de
+    `page_size` lignes: `page_size` ne doit pas dépasser la limite max-rows
+    du serveur (1000 par défaut sur Supabase), sinon une page tronquée par
+    le serveur est prise pour la dernière et la suite est perdue sans erreur.
+    `filters` ajoute des conditions, ex: [('gte', 'updated_at', '2025-01-14')].
+    """
+    if key not in [c.strip() for c in columns.split(',')]:
+        columns = f"{key}, {columns}"
+
+    last_key = None
+    while True:
+        query = client.table(table).select(columns).order(key).limit(page_size)
+        for method, column, value in filters:
+            query = getattr(query, method)(column, value)
+        if last_key is not None:
+            query = query.gt(key, last_key)
+        rows = query.execute().data or []
+
+        yield from rows
+
+        if len(rows) < page_size:
+            return
+        last_key = rows[-1][key]
+
+
+def load_assignment_snapshot(client, page_size=PAGE_SIZE, sample_size=10):
+    """Calculer les agrégats d'assignation au fil des pages
+
+    Seuls les identifiants des invités assignés sont gardés en mémoire ;
+    les invités sont comptés sans être conservés.
+    """
+    tables_with_guests = {}
+    assigned_guest_ids = set()
+    total_assignments = 0
+
+    for assignment in iter_rows(client, 'seating_assignments', ASSIGNMENT_COLUMNS, page_size):
+        total_assignments += 1
+        table_id = assignment['table_id']
+        tables_with_guests[table_id] = tables_with_guests.get(table_id, 0) + 1
+        assigned_guest_ids.add(assignment['guest_id'])
+
+    total_guests = 0
+    unassigned_count = 0
+    unassigned_sample = []
+
+    for guest in iter_rows(client, 'guests', GUEST_COLUMNS, page_size):
+        total_guests += 1
+        if guest['id'] not in assigned_guest_ids:
+            unassigned_count += 1
+            if len(unassigned_sample) < sample_size:
+                unassigned_sample.append(guest)
+
+    return {
+        'total_guests': total_guests,
+        'total_assignments': total_assignments,
+        'unassigned_count': unassigned_count,
+        'unassigned_sample': unassigned_sample,
+        'tables_with_guests': tables_with_guests
+    }
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Écriture en flux de gros scripts SQL: transactions par lots, gzip optionnel, découpage en parties
+"""
+
+import gzip
+import os
+
+from bulk_sql import sql_literal
+
+# Instructions par transaction BEGIN/COMMIT
+BATCH_SIZE = 500
+
+# Même logique que bulk_sql.BULK_ASSIGN, mais sur un lot VALUES autonome: chaque
+# lot est une seule instruction, sans table temporaire partagée entre transactions.
+# L'instruction renvoie les lignes du lot restées sans place (table pleine, nom
+# ou table introuvable)
+BATCH_ASSIGN = """WITH s(line_no, first_name, last_name, table_number) AS (
+    VALUES
+{values}
+), placed AS (
+    INSERT INTO seating_assignments (guest_id, table_id, seat_number)
+    SELECT
+        m.guest_id,
+        m.table_number,
+        f.seat
+    FROM (
+        SELECT guest_id, table_number,
+               ROW_NUMBER() OVER (PARTITION BY table_number ORDER BY line_no) AS rank
+        FROM (
+            SELECT DISTINCT ON (guest_id) guest_id, table_number, line_no
+            FROM (
+                SELECT DISTINCT ON (s.line_no) g.id AS guest_id, s.table_number, s.line_no
+                FROM s
+                JOIN guests g
+                  ON UPPER(TRIM(g.first_name)) = UPPER(TRIM(s.first_name))
+                 AND UPPER(TRIM(g.last_name)) = UPPER(TRIM(s.last_name))
+                JOIN tables t ON t.table_number = s.table_number
+                ORDER BY s.line_no, g.id
+            ) per_line
+            ORDER BY guest_id, line_no
+        ) per_guest
+    ) m
+    JOIN (
+        -- Sièges libres (trous compris) numérotés par table, jusqu'à la capacité
+        SELECT t.table_number, s.seat,
+               ROW_NUMBER() OVER (PARTITION BY t.table_number ORDER BY s.seat) AS rank
+        FROM tables t
+        CROSS JOIN LATERAL generate_series(1, t.capacity) AS s(seat)
+        WHERE NOT EXISTS (
+            SELECT 1 FROM seating_assignments sa
+            WHERE sa.table_id = t.table_number AND sa.seat_number = s.seat
+        )
+    ) f ON f.table_number = m.table_number AND f.rank = m.rank
+    ON CONFLICT (guest_id) DO UPDATE
+    SET table_id = EXCLUDED.table_id,
+        seat_number = EXCLUDED.seat_number
+    RETURNING guest_id, table_id
+)
+SELECT s.line_no, s.first_name, s.last_name, s.table_number AS unplaced_table
+FROM s
+WHERE NOT EXISTS (
+    -- Placé par ce lot, ou déjà à cette table avant lui
+    SELECT 1 FROM guests g
+    WHERE UPPER(TRIM(g.first_name)) = UPPER(TRIM(s.first_name))
+      AND UPPER(TRIM(g.last_name)) = UPPER(TRIM(s.last_name))
+      AND (EXISTS (SELECT 1 FROM placed p WHERE p.guest_id = g.id AND p.table_id = s.table_number)
+           OR EXISTS (SELECT 1 FROM seating_assignments sa
+                      WHERE sa.guest_id = g.id AND sa.table_id = s.table_number))
+)
+ORDER BY s.line_no;"""
+
+
+def iter_batch_assign(plan, batch_size=BATCH_SIZE):
+    """Une instruction INSERT ... SELECT par lot de `batch_size` invités
+
+    `plan` est un itérable de paires (GuestRecord, table), voir csv_ingest.iter_plan.
+    """
+    values = []
+    for record, table in plan:
+        values.append(f"        ({record.line}, {sql_literal(record.first_name)}, "
+                      f"{sql_literal(record.last_name)}, {int(table)})")
+        if len(values) == batch_size:
+            yield BATCH_ASSIGN.format(values=',\n'.join(values))
+            values = []
+    if values:
+        yield BATCH_ASSIGN.format(values=',\n'.join(values))
+
+
+class StreamingSQLWriter:
+    """Écrit les instructions au fil de l'eau, par transactions de `batch_size`
+
+    Un lot en échec n'annule que ses propres instructions. Avec `max_bytes`,
+    le script est découpé en parties numérotées (nom.part001.sql, ...) dont
+    la taille non compressée reste sous la limite (sauf lot plus gros que la
+    limite à lui seul); une coupure n'a lieu qu'entre deux lots. `preamble`
+    ouvre la première partie, `postamble` ferme la dernière: exécuter les
+    parties dans l'ordre. Seul le lot en cours est gardé en mémoire.
+    """
+
+    def __init__(self, path, batch_size=BATCH_SIZE, max_bytes=None, compress=False,
+                 preamble="", postamble=""):
+        self.path = path
+        self.batch_size = batch_size
+        self.max_bytes = max_bytes
+        self.compress = compress
+        self.preamble = preamble
+        self.postamble = postamble
+        self.paths = []
+        self.statements = 0
+        self.batches = 0
+
+        self._file = None
+        self._size = 0
+        self._batch = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
+
+    def _part_path(self):
+        path = self.path
+        if self.max_bytes is not None:
+            root, ext = os.path.splitext(path)
+            path = f"{root}.part{len(self.paths) + 1:03d}{ext}"
+        if self.compress:
+            path += '.gz'
+        return path
+
+    def _open(self):
+        path = self._part_path()
+        if self.compress:
+            self._file = gzip.open(path, 'wt', encoding='utf-8')
+        else:
+            self._file = open(path, 'w', encoding='utf-8')
+        self._size = 0
+        if self.max_bytes is not None:
+            self._emit(f"-- Partie {len(self.paths) + 1}\n")
+        if not self.paths:
+            self._emit(self.preamble)
+        self.paths.append(path)
+
+    def _emit(self, text):
+        self._file.write(text)
+        self._size += len(text.encode('utf-8'))
+
+    def write(self, statement):
+        """Ajouter une instruction (le point-virgule final est ajouté si absent)"""
+        statement = statement.rstrip()
+        self._batch.append(statement + ("\n" if statement.endswith(';') else ";\n"))
+        self.statements += 1
+        if len(self._batch) >= self.batch_size:
+            self.commit()
+
+    def commit(self):
+        """Écrire le lot courant entre BEGIN et COMMIT"""
+        if not self._batch:
+            return
+        text = "\nBEGIN;\n" + ''.join(self._batch) + "COMMIT;\n"
+        self._batch = []
+
+        if (self._file is not None and self.max_bytes is not None
+                and self._size + len(text.encode('utf-8')) > self.max_bytes):
+            self._file.close()
+            self._file = None
+        if self._file is None:
+            self._open()
+        self._emit(text)
+        self.batches += 1
+
+    def close(self):
+        """Écrire le dernier lot et la conclusion; retourne les fichiers écrits"""
+        self.commit()
+        if self.postamble:
+            if self._file is not None and self.max_bytes is not None \
+                    and self._size + len(self.postamble.encode('utf-8')) > self.max_bytes:
+                self._file.close()
+                self._file = None
+            if self._file is None:
+                self._open()
+            self._emit(self.postamble)
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        return self.paths
+
+    def abort(self):
+        """Arrêt sur erreur: le lot en cours est abandonné et la conclusion n'est pas écrite
+
+        La partie ouverte se termine par un ROLLBACK commenté: le script ne
+        peut pas passer pour complet.
+        """
+        self._batch = []
+        if self._file is not None:
+            self._emit("\n-- Génération interrompue: script incomplet, ne pas exécuter\nROLLBACK;\n")
+            self._file.close()
+            self._file = None
+        return self.paths
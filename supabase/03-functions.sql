@@ -122,11 +122,13 @@ DECLARE
     v_guest_id INTEGER;
     v_already_checked BOOLEAN;
 BEGIN
-    -- Trouver l'invité par QR code
+    -- Trouver l'invité par QR code et verrouiller sa ligne: deux scanners
+    -- simultanés ne peuvent pas enregistrer deux fois le même invité
     SELECT g.id, g.checked_in
     INTO v_guest_id, v_already_checked
     FROM guests g
-    WHERE g.qr_code = p_qr_code;
+    WHERE g.qr_code = p_qr_code
+    FOR UPDATE OF g;
 
     IF v_guest_id IS NULL THEN
         RAISE EXCEPTION 'Invalid QR code';
@@ -139,10 +141,11 @@ BEGIN
             checked_in_at = CURRENT_TIMESTAMP
         WHERE id = v_guest_id;
 
-        UPDATE seating_assignments
+        -- Colonne qualifiée: guest_id est aussi une colonne de RETURNS TABLE
+        UPDATE seating_assignments sa
         SET checked_in = true,
             checked_in_at = CURRENT_TIMESTAMP
-        WHERE guest_id = v_guest_id;
+        WHERE sa.guest_id = v_guest_id;
     END IF;
 
     -- Retourner les informations
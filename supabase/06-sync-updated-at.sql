@@ -0,0 +1,31 @@
+-- ====================================================
+-- COLONNES updated_at POUR LA SYNCHRONISATION INCRÉMENTALE
+-- ====================================================
+-- Date: 2025-01-20
+-- Description: Ajoute updated_at (et son trigger) aux tables `tables` et
+-- `seating_assignments`, comme pour `guests`, afin que le miroir local
+-- (local_mirror.py) ne télécharge que les lignes modifiées.
+-- Idempotent: peut être exécuté plusieurs fois.
+
+ALTER TABLE tables
+  ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP;
+
+ALTER TABLE seating_assignments
+  ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP;
+
+DROP TRIGGER IF EXISTS update_tables_updated_at ON tables;
+CREATE TRIGGER update_tables_updated_at
+BEFORE UPDATE ON tables
+FOR EACH ROW
+EXECUTE FUNCTION update_updated_at();
+
+DROP TRIGGER IF EXISTS update_seating_assignments_updated_at ON seating_assignments;
+CREATE TRIGGER update_seating_assignments_updated_at
+BEFORE UPDATE ON seating_assignments
+FOR EACH ROW
+EXECUTE FUNCTION update_updated_at();
+
+-- Index pour les lectures "modifié depuis"
+CREATE INDEX IF NOT EXISTS idx_guests_updated_at ON guests(updated_at);
+CREATE INDEX IF NOT EXISTS idx_tables_updated_at ON tables(updated_at);
+CREATE INDEX IF NOT EXISTS idx_seating_updated_at ON seating_assignments(updated_at);
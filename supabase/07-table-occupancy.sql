@@ -0,0 +1,159 @@
+-- ====================================================
+-- COMPTEURS D'OCCUPATION PAR TABLE
+-- ====================================================
+-- Fichier généré par occupancy.py (ne pas modifier à la main)
+-- Description: table_occupancy garde, pour chaque table, le nombre de places
+-- occupées, d'invités présents et de places libres. Les triggers ci-dessous
+-- la tiennent à jour à chaque écriture ; la lecture coûte O(tables) au lieu
+-- de recalculer COUNT + JSON_AGG sur toutes les assignations.
+-- Idempotent: peut être exécuté plusieurs fois (recalcule les compteurs).
+
+-- ====================================================
+-- 1. TABLE DES COMPTEURS
+-- ====================================================
+CREATE TABLE IF NOT EXISTS table_occupancy (
+  table_number INTEGER PRIMARY KEY REFERENCES tables(table_number) ON DELETE CASCADE ON UPDATE CASCADE,
+  capacity INTEGER NOT NULL DEFAULT 0,
+  occupied_seats INTEGER NOT NULL DEFAULT 0,
+  checked_in_count INTEGER NOT NULL DEFAULT 0,
+  available_seats INTEGER GENERATED ALWAYS AS (capacity - occupied_seats) STORED,
+  updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- ====================================================
+-- 2. TRIGGERS
+-- ====================================================
+
+-- Ajuster les compteurs d'une table (une seule ligne verrouillée)
+CREATE OR REPLACE FUNCTION occupancy_bump(p_table_number INTEGER, p_occupied INTEGER, p_checked_in INTEGER)
+RETURNS VOID AS $$
+BEGIN
+  UPDATE table_occupancy
+  SET occupied_seats = occupied_seats + p_occupied,
+      checked_in_count = checked_in_count + p_checked_in,
+      updated_at = CURRENT_TIMESTAMP
+  WHERE table_number = p_table_number;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Assignations: insertion, suppression, déplacement, check-in
+CREATE OR REPLACE FUNCTION occupancy_on_assignment()
+RETURNS TRIGGER AS $$
+BEGIN
+  IF TG_OP = 'UPDATE'
+     AND OLD.table_id = NEW.table_id
+     AND COALESCE(OLD.checked_in, false) = COALESCE(NEW.checked_in, false) THEN
+    RETURN NULL;
+  END IF;
+
+  IF TG_OP IN ('DELETE', 'UPDATE') THEN
+    PERFORM occupancy_bump(OLD.table_id, -1, -(COALESCE(OLD.checked_in, false)::int));
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    PERFORM occupancy_bump(NEW.table_id, 1, COALESCE(NEW.checked_in, false)::int);
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS occupancy_seating_assignments ON seating_assignments;
+CREATE TRIGGER occupancy_seating_assignments
+AFTER INSERT OR DELETE OR UPDATE OF table_id, checked_in ON seating_assignments
+FOR EACH ROW
+EXECUTE FUNCTION occupancy_on_assignment();
+
+-- Invités: un check-in écrit seulement sur guests est reporté sur
+-- l'assignation, ce qui déclenche le trigger ci-dessus
+CREATE OR REPLACE FUNCTION occupancy_on_guest_checkin()
+RETURNS TRIGGER AS $$
+BEGIN
+  UPDATE seating_assignments
+  SET checked_in = NEW.checked_in,
+      checked_in_at = NEW.checked_in_at
+  WHERE guest_id = NEW.id
+    AND checked_in IS DISTINCT FROM NEW.checked_in;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS occupancy_guests_checkin ON guests;
+CREATE TRIGGER occupancy_guests_checkin
+AFTER UPDATE OF checked_in ON guests
+FOR EACH ROW
+WHEN (OLD.checked_in IS DISTINCT FROM NEW.checked_in)
+EXECUTE FUNCTION occupancy_on_guest_checkin();
+
+-- Tables: création et changement de capacité
+CREATE OR REPLACE FUNCTION occupancy_on_table()
+RETURNS TRIGGER AS $$
+BEGIN
+  INSERT INTO table_occupancy (table_number, capacity)
+  VALUES (NEW.table_number, COALESCE(NEW.capacity, 0))
+  ON CONFLICT (table_number) DO UPDATE
+  SET capacity = EXCLUDED.capacity,
+      updated_at = CURRENT_TIMESTAMP;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS occupancy_tables ON tables;
+CREATE TRIGGER occupancy_tables
+AFTER INSERT OR UPDATE OF capacity ON tables
+FOR EACH ROW
+EXECUTE FUNCTION occupancy_on_table();
+
+-- ====================================================
+-- 3. INITIALISATION / RECALCUL DES COMPTEURS
+-- ====================================================
+BEGIN;
+
+-- Bloquer les écritures sur les assignations pendant le recalcul
+LOCK TABLE seating_assignments IN SHARE MODE;
+
+INSERT INTO table_occupancy (table_number, capacity, occupied_seats, checked_in_count)
+SELECT
+    t.table_number,
+    COALESCE(t.capacity, 0),
+    COUNT(sa.id),
+    COUNT(sa.id) FILTER (WHERE sa.checked_in)
+FROM tables t
+LEFT JOIN seating_assignments sa ON sa.table_id = t.table_number
+GROUP BY t.table_number, t.capacity
+ON CONFLICT (table_number) DO UPDATE
+SET capacity = EXCLUDED.capacity,
+    occupied_seats = EXCLUDED.occupied_seats,
+    checked_in_count = EXCLUDED.checked_in_count,
+    updated_at = CURRENT_TIMESTAMP;
+
+COMMIT;
+
+-- ====================================================
+-- 4. VUE LÉGÈRE POUR LES ÉCRANS QUI INTERROGENT EN BOUCLE
+-- ====================================================
+DROP VIEW IF EXISTS table_occupancy_status CASCADE;
+
+CREATE VIEW table_occupancy_status AS
+SELECT
+    t.id,
+    t.table_number,
+    t.table_name,
+    t.capacity,
+    t.is_vip,
+    t.color_code,
+    t.color_name,
+    o.occupied_seats,
+    o.available_seats,
+    o.checked_in_count
+FROM tables t
+JOIN table_occupancy o ON o.table_number = t.table_number;
+
+-- ====================================================
+-- 5. VÉRIFICATION (doit retourner 0 ligne)
+-- ====================================================
+SELECT o.table_number, o.occupied_seats, COUNT(sa.id) AS expected_occupied,
+       o.checked_in_count, COUNT(sa.id) FILTER (WHERE sa.checked_in) AS expected_checked_in
+FROM table_occupancy o
+LEFT JOIN seating_assignments sa ON sa.table_id = o.table_number
+GROUP BY o.table_number, o.occupied_seats, o.checked_in_count
+HAVING o.occupied_seats <> COUNT(sa.id)
+    OR o.checked_in_count <> COUNT(sa.id) FILTER (WHERE sa.checked_in);
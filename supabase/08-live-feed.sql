@@ -0,0 +1,93 @@
+-- ====================================================
+-- FLUX EN DIRECT (LISTEN/NOTIFY)
+-- ====================================================
+-- Fichier généré par live_feed.py (ne pas modifier à la main)
+-- Description: chaque écriture validée sur seating_assignments, guests et
+-- tables envoie une courte notification JSON sur le canal karel_live avec le
+-- nouvel état de la ligne. Le service live_feed.py écoute ce canal, tient les
+-- compteurs en mémoire et les diffuse aux écrans: la charge de la base suit
+-- le rythme des écritures, pas le nombre d'écrans ouverts.
+-- Idempotent: peut être exécuté plusieurs fois.
+
+-- ====================================================
+-- 1. ASSIGNATIONS
+-- ====================================================
+-- {"k":"a","g":guest_id,"t":table_id,"c":checked_in} ; "t" null = assignation supprimée
+CREATE OR REPLACE FUNCTION live_feed_on_assignment()
+RETURNS TRIGGER AS $$
+BEGIN
+  IF TG_OP = 'UPDATE'
+     AND OLD.guest_id IS NOT DISTINCT FROM NEW.guest_id
+     AND OLD.table_id = NEW.table_id
+     AND COALESCE(OLD.checked_in, false) = COALESCE(NEW.checked_in, false) THEN
+    RETURN NULL;
+  END IF;
+
+  IF TG_OP = 'DELETE' OR (TG_OP = 'UPDATE' AND OLD.guest_id IS DISTINCT FROM NEW.guest_id) THEN
+    PERFORM pg_notify('karel_live', json_build_object(
+      'k', 'a', 'g', OLD.guest_id, 't', NULL, 'c', false)::text);
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    PERFORM pg_notify('karel_live', json_build_object(
+      'k', 'a', 'g', NEW.guest_id, 't', NEW.table_id, 'c', COALESCE(NEW.checked_in, false))::text);
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS live_feed_seating_assignments ON seating_assignments;
+CREATE TRIGGER live_feed_seating_assignments
+AFTER INSERT OR DELETE OR UPDATE OF guest_id, table_id, checked_in ON seating_assignments
+FOR EACH ROW
+EXECUTE FUNCTION live_feed_on_assignment();
+
+-- ====================================================
+-- 2. INVITÉS
+-- ====================================================
+-- {"k":"g","id":id,"c":checked_in} ; "c" null = invité supprimé
+CREATE OR REPLACE FUNCTION live_feed_on_guest()
+RETURNS TRIGGER AS $$
+BEGIN
+  IF TG_OP = 'UPDATE' AND OLD.checked_in IS NOT DISTINCT FROM NEW.checked_in THEN
+    RETURN NULL;
+  END IF;
+
+  IF TG_OP = 'DELETE' THEN
+    PERFORM pg_notify('karel_live', json_build_object('k', 'g', 'id', OLD.id, 'c', NULL)::text);
+  ELSE
+    PERFORM pg_notify('karel_live', json_build_object(
+      'k', 'g', 'id', NEW.id, 'c', COALESCE(NEW.checked_in, false))::text);
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS live_feed_guests ON guests;
+CREATE TRIGGER live_feed_guests
+AFTER INSERT OR DELETE OR UPDATE OF checked_in ON guests
+FOR EACH ROW
+EXECUTE FUNCTION live_feed_on_guest();
+
+-- ====================================================
+-- 3. TABLES
+-- ====================================================
+-- {"k":"t","n":table_number,"cap":capacity} ; "cap" null = table supprimée
+CREATE OR REPLACE FUNCTION live_feed_on_table()
+RETURNS TRIGGER AS $$
+BEGIN
+  IF TG_OP = 'DELETE' OR (TG_OP = 'UPDATE' AND OLD.table_number IS DISTINCT FROM NEW.table_number) THEN
+    PERFORM pg_notify('karel_live', json_build_object('k', 't', 'n', OLD.table_number, 'cap', NULL)::text);
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    PERFORM pg_notify('karel_live', json_build_object(
+      'k', 't', 'n', NEW.table_number, 'cap', COALESCE(NEW.capacity, 0))::text);
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS live_feed_tables ON tables;
+CREATE TRIGGER live_feed_tables
+AFTER INSERT OR DELETE OR UPDATE OF table_number, capacity ON tables
+FOR EACH ROW
+EXECUTE FUNCTION live_feed_on_table();
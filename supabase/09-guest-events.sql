@@ -0,0 +1,46 @@
+-- ====================================================
+-- ÉVÉNEMENTS PAR INVITÉ (MASQUE DE BITS)
+-- ====================================================
+-- Description: events_mask garde les événements choisis dans le formulaire
+-- RSVP (4e colonne de plandetable.csv), un bit par événement:
+--   1 = Le mariage civil
+--   2 = Le mariage religieux et le vin d'honneur
+--   4 = La réception (soirée dansante)
+-- Rempli par `python events.py --apply` (mêmes bits que events.py).
+-- Idempotent: peut être exécuté plusieurs fois.
+
+-- ====================================================
+-- 1. COLONNE
+-- ====================================================
+ALTER TABLE guests ADD COLUMN IF NOT EXISTS events_mask SMALLINT NOT NULL DEFAULT 0;
+
+ALTER TABLE guests DROP CONSTRAINT IF EXISTS guests_events_mask_check;
+ALTER TABLE guests ADD CONSTRAINT guests_events_mask_check CHECK (events_mask BETWEEN 0 AND 7);
+
+-- ====================================================
+-- 2. EFFECTIFS
+-- ====================================================
+-- Une ligne par combinaison (8 au plus): traiteur et placement lisent ces
+-- compteurs au lieu de comparer des libellés
+DROP VIEW IF EXISTS event_headcounts CASCADE;
+
+CREATE VIEW event_headcounts AS
+SELECT
+    events_mask,
+    (events_mask & 1) <> 0 AS civil,
+    (events_mask & 2) <> 0 AS religieux,
+    (events_mask & 4) <> 0 AS reception,
+    COUNT(*) AS guests
+FROM guests
+GROUP BY events_mask
+ORDER BY events_mask;
+
+-- ====================================================
+-- 3. VÉRIFICATION
+-- ====================================================
+SELECT
+    COUNT(*) FILTER (WHERE events_mask & 1 <> 0) AS civil,
+    COUNT(*) FILTER (WHERE events_mask & 2 <> 0) AS religieux,
+    COUNT(*) FILTER (WHERE events_mask & 4 <> 0) AS reception,
+    COUNT(*) FILTER (WHERE events_mask = 4) AS reception_seulement
+FROM guests;
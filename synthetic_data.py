@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Génération de données synthétiques (CSV du plan de table et jeux de données Supabase)
+"""
+
+import argparse
+import csv
+import random
+from datetime import datetime, timedelta, timezone
+
+from csv_ingest import CHILDREN_TABLE
+
+EVENTS = (
+    "Le mariage civil",
+    "Le mariage religieux et le vin d'honneur",
+    "La réception (soirée dansante)",
+)
+
+LAST_NAMES = (
+    "ADECHORI", "Kalou", "Laguerre", "NGANGA", "Saih", "Daho", "Bakayoko", "KOUAME",
+    "Mazamba", "Kiefer", "FONANT", "Dakouri", "Aouat", "Johnson", "Missoh", "Tamou",
+    "Oté", "Djeri", "Minka", "ZOUZOU", "Elegbede", "Wahounou", "Biaou", "Mambo",
+)
+
+FIRST_NAMES = (
+    "Iradatou", "Franck", "Florence", "Yverose", "Sephora", "Anne", "Aissata", "Werner",
+    "Gwladys", "Gisèle Valérie", "Marie Adéla", "Clémentine", "Victorine", "Chelsea",
+    "Manuella", "Marguerite", "Solange", "Laurent", "Melaine", "Alphonsine", "Prince",
+)
+
+TABLE_SIZE = 10
+
+
+def _events_fields(rng):
+    """Liste d'événements éclatée sur trois colonnes, comme l'export réel"""
+    events = [e for e in EVENTS if rng.random() < 0.8] or [EVENTS[2]]
+    rng.shuffle(events)
+    fields = [f'["{events[0]}"' if len(events) > 1 else f'["{events[0]}"]']
+    fields += events[1:]
+    if len(events) > 1:
+        fields[-1] += ']'
+    return fields + [''] * (3 - len(fields))
+
+
+def iter_plan_rows(count, seed=0):
+    """Générer des lignes au format de plandetable.csv
+
+    Ménages partageant un e-mail, enfants, e-mails avec retour à la ligne,
+    lignes sans événement et numéro de table sur la première ligne du bloc.
+    """
+    rng = random.Random(seed)
+    produced = 0
+    household = 0
+    while produced < count:
+        household += 1
+        last_name = rng.choice(LAST_NAMES) + (f" {household}" if rng.random() < 0.5 else "")
+        email = f"{last_name.lower().replace(' ', '.')}.{household}@example.com"
+        size = min(rng.choice((1, 1, 2, 2, 3, 4)), count - produced)
+        for member in range(size):
+            first_name = rng.choice(FIRST_NAMES)
+            if member >= 2 and rng.random() < 0.5:
+                first_name = f"Enfant {member - 1}"
+            row_email = email + ("\n" if rng.random() < 0.01 else "")
+            events = _events_fields(rng) if rng.random() > 0.05 else ['', '', '']
+            if rng.random() < 0.1:
+                last_name_cell = last_name + ' '
+            else:
+                last_name_cell = last_name
+            table = ''
+            if produced % TABLE_SIZE == 0:
+                table_number = produced // TABLE_SIZE + 1
+                table = "TABLE ENFANT" if table_number == CHILDREN_TABLE else str(table_number)
+            yield [last_name_cell, first_name, row_email] + events + [table]
+            produced += 1
+
+
+def write_plan_csv(path, count, seed=0):
+    """Écrire un CSV au format de plandetable.csv"""
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        for row in iter_plan_rows(count, seed):
+            writer.writerow(row)
+
+
+def generate_dataset(guest_count, assigned_ratio=0.9, checked_in_ratio=0.0,
+                     duplicate_ratio=0.01, seed=0):
+    """Construire guests / tables / seating_assignments cohérents avec le schéma
+
+    Les tables suivent 01-main-schema.sql (table 27 = enfants, 30 places) et
+    sont ajoutées au-delà de 29 si nécessaire. Une part des invités est
+    dupliquée avec des espaces ou une casse différente, comme dans l'import réel.
+    """
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 14, tzinfo=timezone.utc)
+
+    table_count = max(29, -(-guest_count // TABLE_SIZE) + 1)
+    tables = [
+        {
+            'id': n,
+            'table_number': n,
+            'table_name': f"TABLE {n}",
+            'capacity': 30 if n == CHILDREN_TABLE else (15 if n == 26 else TABLE_SIZE),
+            'is_vip': n == 1,
+            'color_code': f"#{rng.randrange(0x1000000):06X}",
+            'color_name': None,
+        }
+        for n in range(1, table_count + 1)
+    ]
+
+    guests = []
+    for guest_id in range(1, guest_count + 1):
+        created = (start + timedelta(seconds=guest_id)).isoformat()
+        if guests and rng.random() < duplicate_ratio:
+            original = rng.choice(guests)
+            first_name = original['first_name'].upper()
+            last_name = f"{original['last_name']} "
+            email = original['email']
+        else:
+            first_name = rng.choice(FIRST_NAMES)
+            last_name = f"{rng.choice(LAST_NAMES)} {guest_id}"
+            email = f"guest{guest_id}@example.com"
+        guests.append({
+            'id': guest_id,
+            'first_name': first_name,
+            'last_name': last_name,
+            'email': email,
+            'phone': None,
+            'has_plus_one': False,
+            'dietary_restrictions': None,
+            'rsvp_status': 'confirmed',
+            'invitation_code': None,
+            'guest_code': None,
+            'checked_in': False,
+            'checked_in_at': None,
+            'qr_code': f"WEDDING-{guest_id}-{1736812800 + guest_id}",
+            'created_at': created,
+            'updated_at': created,
+        })
+
+    assignments = []
+    free = [(t['table_number'], seat) for t in tables for seat in range(1, t['capacity'] + 1)]
+    for guest in guests:
+        if len(assignments) >= len(free) or rng.random() >= assigned_ratio:
+            continue
+        table_number, seat = free[len(assignments)]
+        checked_in = rng.random() < checked_in_ratio
+        assignments.append({
+            'id': len(assignments) + 1,
+            'guest_id': guest['id'],
+            'table_id': table_number,
+            'seat_number': seat,
+            'checked_in': checked_in,
+            'checked_in_at': guest['updated_at'] if checked_in else None,
+            'created_at': guest['created_at'],
+        })
+        if checked_in:
+            guest['checked_in'] = True
+            guest['checked_in_at'] = guest['updated_at']
+
+    return {'guests': guests, 'tables': tables, 'seating_assignments': assignments}
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Générer un plan de table CSV synthétique")
+    parser.add_argument('rows', type=int, help="nombre d'invités")
+    parser.add_argument('--output', default='plandetable-synthetic.csv')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    write_plan_csv(args.output, args.rows, args.seed)
+    print(f"✓ {args.rows} lignes écrites dans {args.output}")
+
+
+if __name__ == "__main__":
+    main()
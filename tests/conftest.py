@@ -0,0 +1,7 @@
+"""Tests des scripts de maintenance, contre fake_supabase.FakeClient"""
+
+import os
+import sys
+
+# Les scripts sont des modules plats à la racine du dépôt
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,130 @@
+"""Service de check-in: réponses en mémoire, file hors ligne, envoi idempotent"""
+
+import http.client
+import json
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from checkin_cache import CheckinCache, make_handler
+from fake_supabase import FakeClient
+
+
+def make_client():
+    return FakeClient({
+        'guests': [{'id': i, 'first_name': f"P{i}", 'last_name': f"N{i}", 'qr_code': f"QR{i}",
+                    'checked_in': False, 'checked_in_at': None} for i in (1, 2, 3)],
+        'tables': [{'id': 1, 'table_number': 4, 'table_name': "Table 4", 'capacity': 10}],
+        'seating_assignments': [{'id': i, 'guest_id': i, 'table_id': 4, 'seat_number': i,
+                                 'checked_in': False, 'checked_in_at': None} for i in (1, 2, 3)],
+    })
+
+
+class OfflineClient:
+    """Client dont toutes les requêtes échouent, comme pendant une coupure réseau"""
+
+    def table(self, name):
+        raise ConnectionError("réseau indisponible")
+
+
+def test_check_in_answers_from_memory(tmp_path):
+    client = make_client()
+    cache = CheckinCache(client, str(tmp_path / 'queue.json'))
+    cache.load()
+    client.reset_counters()
+
+    first = cache.check_in('QR2')
+    second = cache.check_in('QR2')
+
+    assert first['table_number'] == 4 and first['seat_number'] == 2
+    assert not first['already_checked_in']
+    assert second['already_checked_in']
+    assert client.round_trips == 0
+    with pytest.raises(KeyError):
+        cache.check_in('inconnu')
+
+
+def test_flush_writes_guest_and_assignment(tmp_path):
+    client = make_client()
+    cache = CheckinCache(client, str(tmp_path / 'queue.json'))
+    cache.load()
+    cache.check_in('QR1')
+
+    assert cache.flush() == 1
+    assert cache.pending == {}
+    assert client.data['guests'][0]['checked_in']
+    assert client.data['seating_assignments'][0]['checked_in']
+    assert not client.data['guests'][1]['checked_in']
+
+
+def test_offline_queue_survives_restart_and_replays(tmp_path):
+    queue_path = str(tmp_path / 'queue.json')
+    cache = CheckinCache(make_client(), queue_path)
+    cache.load()
+    cache.check_in('QR3')
+
+    cache.client = OfflineClient()
+    with pytest.raises(ConnectionError):
+        cache.flush()
+    assert list(cache.pending) == [3]
+
+    # Redémarrage: la file est relue et le check-in reste acquis au rechargement
+    client = make_client()
+    restarted = CheckinCache(client, queue_path)
+    assert list(restarted.pending) == [3]
+    restarted.load()
+    assert restarted.check_in('QR3')['already_checked_in']
+
+    assert restarted.flush() == 1
+    assert client.data['guests'][2]['checked_in']
+    assert CheckinCache(client, queue_path).pending == {}
+
+
+def test_replayed_batch_does_not_check_in_twice(tmp_path):
+    client = make_client()
+    cache = CheckinCache(client, str(tmp_path / 'queue.json'))
+    cache.load()
+    cache.check_in('QR1')
+    cache.flush()
+    checked_in_at = client.data['guests'][0]['checked_in_at']
+
+    # Lot rejoué (réponse perdue puis nouvel essai): checked_in = false filtre tout
+    cache.pending[1] = '2099-01-01T00:00:00+00:00'
+    cache.flush()
+
+    assert client.data['guests'][0]['checked_in_at'] == checked_in_at
+    assert client.data['seating_assignments'][0]['checked_in_at'] == checked_in_at
+
+
+@pytest.fixture
+def server(tmp_path):
+    cache = CheckinCache(make_client(), str(tmp_path / 'queue.json'))
+    cache.load()
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(cache))
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd.server_address
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_cors_preflight_then_post(server):
+    conn = http.client.HTTPConnection(*server)
+    conn.request('OPTIONS', '/check-in', headers={
+        'Origin': 'http://localhost:3000',
+        'Access-Control-Request-Method': 'POST',
+        'Access-Control-Request-Headers': 'content-type',
+    })
+    response = conn.getresponse()
+    response.read()
+    assert response.status == 204
+    assert response.getheader('Access-Control-Allow-Origin') == '*'
+    assert 'POST' in response.getheader('Access-Control-Allow-Methods')
+    assert 'Content-Type' in response.getheader('Access-Control-Allow-Headers')
+
+    conn.request('POST', '/check-in', body=json.dumps({'qr_code': 'QR1'}),
+                 headers={'Content-Type': 'application/json'})
+    response = conn.getresponse()
+    assert response.status == 200
+    assert json.loads(response.read())['guest_name'] == "P1 N1"
+    conn.close()
@@ -0,0 +1,67 @@
+"""Lecture du plan de table CSV"""
+
+import os
+from collections import Counter
+
+import pytest
+
+from csv_ingest import CHILDREN_TABLE, iter_guest_records, iter_plan, parse_events, parse_table
+
+PLAN_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'plandetable.csv')
+
+
+def test_real_plan_has_263_guests_without_rejects():
+    rejects = []
+    records = list(iter_guest_records(PLAN_PATH, rejects))
+
+    assert len(records) == 263
+    assert rejects == []
+    assert records[0].first_name == "Iradatou" and records[0].table == 1
+    assert sum(1 for r in records if r.table is not None) == 27
+
+
+def test_every_real_guest_inherits_a_table():
+    plan = list(iter_plan(iter_guest_records(PLAN_PATH)))
+    per_table = Counter(table for _, table in plan)
+
+    assert len(plan) == 263
+    assert set(per_table) == set(range(1, 28))
+    assert per_table[CHILDREN_TABLE] == 19
+
+
+def test_quoted_fields_and_rejected_lines(tmp_path):
+    path = tmp_path / 'plan.csv'
+    path.write_text(
+        'Nom,Prénom,Email,["Le mariage civil", La réception,3\n'
+        '"Kalou\n Jr",Jean,,"[""Le mariage civil""]",\n'
+        '\n'
+        'Seul\n'
+        ',Sans nom,,x,4\n'
+        'Ngoma,Marie,,[x],douze\n'
+        'Sossa,Paul,,[x],TABLE ENFANT\n',
+        encoding='utf-8')
+    rejects = []
+
+    records = list(iter_guest_records(str(path), rejects))
+
+    assert [(r.line, r.last_name, r.table) for r in records] == \
+        [(1, "Nom", 3), (2, "Kalou\n Jr", None), (8, "Sossa", CHILDREN_TABLE)]
+    assert records[0].events == ("Le mariage civil", "La réception")
+    assert [(line, reason) for line, reason, _ in rejects] == [
+        (5, "colonnes manquantes"), (6, "nom ou prénom manquant"), (7, "numéro de table invalide: 'douze'")]
+    assert [(r.line, table) for r, table in iter_plan(records)] == [(1, 3), (2, 3), (8, CHILDREN_TABLE)]
+
+
+def test_parse_helpers():
+    assert parse_events(['["A"', ' B', ' C]', '']) == ("A", "B", "C")
+    assert parse_table(' 12 ') == 12
+    assert parse_table('') is None
+    with pytest.raises(ValueError):
+        parse_table('12b')
+
+
+def test_rows_before_the_first_table_number_are_left_out():
+    records = list(iter_guest_records(PLAN_PATH))
+    orphan = records[0]._replace(table=None)
+
+    assert [table for _, table in iter_plan([orphan] + records[:2])] == [1, 1]
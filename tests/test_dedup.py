@@ -0,0 +1,66 @@
+"""same_person et regroupement des doublons"""
+
+from dedup import PROBABLE, SAME_CONTACT, SAME_NAME, find_duplicate_groups, plan_merges, same_person
+
+
+def guest(guest_id, first_name, last_name, email="", phone="", assigned=False, checked_in=False):
+    return {'id': guest_id, 'first_name': first_name, 'last_name': last_name, 'email': email,
+            'phone': phone, 'assigned': assigned, 'checked_in': checked_in}
+
+
+def test_same_normalized_name_is_sure():
+    assert same_person(guest(1, "Jean", "Kalou"), guest(2, " jean ", "KALOU")) == SAME_NAME
+    assert same_person(guest(1, "Sédami", "Adéchori"), guest(2, "Sedami", "ADECHORI")) == SAME_NAME
+
+
+def test_name_inclusion_needs_a_matching_contact():
+    short = guest(1, "Karimou", "ADECHORI", email="k@example.com")
+    long_ = guest(2, "Iradatou Karimou", "ADECHORI", email="K@Example.com ")
+
+    assert same_person(short, long_) == SAME_CONTACT
+    assert same_person(short, {**long_, 'email': "autre@example.com"}) == PROBABLE
+
+
+def test_phone_matches_with_or_without_country_code():
+    a = guest(1, "Jean", "Dupont", phone="+229 97 12 34 56")
+    b = guest(2, "Jean Pierre", "Dupont", phone="97123456")
+
+    assert same_person(a, b) == SAME_CONTACT
+    assert same_person(a, {**b, 'phone': "3456"}) == PROBABLE
+
+
+def test_household_sharing_an_email_is_not_merged():
+    assert same_person(guest(1, "Jean", "Kalou", email="kalou@example.com"),
+                       guest(2, "Awa", "Kalou", email="kalou@example.com")) is None
+
+
+def test_role_markers_keep_people_apart():
+    assert same_person(guest(1, "Enfant 1", "NGANGA"), guest(2, "Enfant 2", "NGANGA")) is None
+    assert same_person(guest(1, "Jean", "Kalou"), guest(2, "Jean", "Kalou accompagnant")) is None
+
+
+def test_identical_placeholder_names_need_a_matching_contact():
+    a = guest(1, "Epouse", "Kalou", email="a@example.com")
+    b = guest(2, "Epouse", "Kalou", email="b@example.com")
+
+    assert same_person(a, b) == PROBABLE
+    assert same_person(guest(1, "Enfant 1", "NGANGA"), guest(2, "Enfant 1", "NGANGA")) == PROBABLE
+    assert same_person(a, {**b, 'email': "A@example.com"}) == SAME_CONTACT
+
+
+def test_groups_merge_sure_pairs_and_list_probable_ones():
+    guests = [
+        guest(1, "Jean", "Kalou", assigned=True),
+        guest(2, "JEAN", "kalou"),
+        guest(3, "Jean", "Kálou", checked_in=True),
+        guest(4, "Epouse", "Kalou", email="a@example.com"),
+        guest(5, "Epouse", "Kalou", email="b@example.com"),
+        guest(6, "Marie", "Ngoma"),
+    ]
+    probable = []
+
+    merges = plan_merges(find_duplicate_groups(guests, probable=probable))
+
+    assert [(survivor['id'], sorted(g['id'] for g in duplicates)) for survivor, duplicates in merges] == \
+        [(3, [1, 2])]
+    assert [(a['id'], b['id']) for a, b in probable] == [(4, 5)]
@@ -0,0 +1,72 @@
+"""Masques d'événements: planification depuis le CSV et effectifs"""
+
+from csv_ingest import GuestRecord
+from events import ALL_EVENTS, CIVIL, RECEPTION, RELIGIOUS, EventIndex, event_mask, plan_event_masks
+from name_index import NameIndex
+
+CIVIL_LABEL = "Le mariage civil"
+RECEPTION_LABEL = "La réception (soirée dansante)"
+
+
+def record(line, first_name, last_name, *events):
+    return GuestRecord(line, last_name, first_name, "", events, None)
+
+
+def test_event_mask_ignores_case_accents_and_reports_unknown_labels():
+    unknown = []
+
+    assert event_mask(["le MARIAGE civil", "La reception (soiree dansante)", "Brunch"], unknown) == \
+        CIVIL | RECEPTION
+    assert unknown == ["Brunch"]
+
+
+def test_plan_writes_only_changed_masks():
+    index = NameIndex([
+        {'id': 1, 'first_name': "Jean", 'last_name': "Kalou", 'events_mask': CIVIL},
+        {'id': 2, 'first_name': "Awa", 'last_name': "Diallo", 'events_mask': 0},
+    ])
+    records = [record(1, "Jean", "Kalou", CIVIL_LABEL), record(2, "awa", "DIALLO", CIVIL_LABEL, RECEPTION_LABEL),
+               record(3, "Inconnu", "X", CIVIL_LABEL)]
+
+    rows, not_found, skipped = plan_event_masks(records, index)
+
+    assert rows == [{'id': 2, 'events_mask': CIVIL | RECEPTION}]
+    assert [r.line for r in not_found] == [3]
+    assert skipped == []
+
+
+def test_homonyms_take_distinct_guests_and_extra_lines_are_skipped():
+    index = NameIndex([{'id': i, 'first_name': "Enfant", 'last_name': "Nganga", 'events_mask': 0}
+                       for i in (1, 2)])
+    records = [record(1, "Enfant", "Nganga", CIVIL_LABEL), record(2, "Enfant", "Nganga", RECEPTION_LABEL),
+               record(3, "Enfant", "Nganga", CIVIL_LABEL, RECEPTION_LABEL)]
+
+    rows, not_found, skipped = plan_event_masks(records, index)
+
+    # La troisième ligne n'écrase pas le masque déjà attribué par la première
+    assert [(row['id'], row['events_mask']) for row in rows] == [(1, CIVIL), (2, RECEPTION)]
+    assert [(r.line, reason) for r, _, reason in skipped] == [(3, "invité déjà pris par une autre ligne")]
+
+
+def test_fuzzy_matches_need_allow_fuzzy():
+    index = NameIndex([{'id': 1, 'first_name': "Gisele Valerie Marie", 'last_name': "SAIH", 'events_mask': 0}])
+    records = [record(1, "Gisèle Valérie", "SAIH", CIVIL_LABEL)]
+
+    rows, _, skipped = plan_event_masks(records, index)
+    assert rows == [] and [reason for _, _, reason in skipped] == ["correspondance tokens"]
+
+    rows, _, skipped = plan_event_masks(records, index, allow_fuzzy=True)
+    assert [(row['id'], row['events_mask']) for row in rows] == [(1, CIVIL)] and skipped == []
+
+
+def test_event_index_counts_without_scanning_guests():
+    index = EventIndex([(1, ALL_EVENTS), (2, RECEPTION), (3, CIVIL | RECEPTION), (4, 0)])
+
+    assert index.headcounts() == {'civil': 2, 'religieux': 1, 'reception': 3}
+    assert index.guests(RECEPTION, CIVIL | RELIGIOUS) == {2}
+    assert index.count(0, ALL_EVENTS) == 1
+
+    index.set(2, CIVIL)
+    index.remove(4)
+    assert len(index) == 3
+    assert index.count(RECEPTION) == 2
@@ -0,0 +1,122 @@
+"""BulkMutation: journal écrit avant la base, annulation complète"""
+
+import copy
+
+from fake_supabase import FakeClient
+from mutations import BulkMutation, list_journals, read_journal, undo
+
+
+def make_client():
+    return FakeClient({
+        'guests': [{'id': i, 'first_name': f"P{i}", 'last_name': f"N{i}"} for i in (1, 2, 3, 4)],
+        'seating_assignments': [
+            {'id': 1, 'guest_id': 1, 'table_id': 1, 'seat_number': 1},
+            {'id': 2, 'guest_id': 2, 'table_id': 1, 'seat_number': 2},
+            {'id': 3, 'guest_id': 3, 'table_id': 2, 'seat_number': 1},
+        ],
+    })
+
+
+def plan(client, journal_dir):
+    mutation = BulkMutation(client, 'test', str(journal_dir))
+    mutation.delete('seating_assignments', 'guest_id', [3])
+    mutation.insert('seating_assignments', [{'guest_id': 4, 'table_id': 2, 'seat_number': 1}])
+    mutation.move([{'id': 1, 'guest_id': 1, 'table_id': 1, 'seat_number': 2},
+                   {'id': 2, 'guest_id': 2, 'table_id': 1, 'seat_number': 1}])
+    mutation.upsert('guests', [{'id': 1, 'first_name': "Paul", 'last_name': "N1"},
+                               {'id': 5, 'first_name': "P5", 'last_name': "N5"}])
+    return mutation
+
+
+def positions(client):
+    return sorted((r['guest_id'], r['table_id'], r['seat_number'])
+                  for r in client.data['seating_assignments'])
+
+
+def test_apply_writes_every_step_and_journals_it(tmp_path):
+    client = make_client()
+    mutation = plan(client, tmp_path)
+
+    summary = mutation.apply()
+
+    assert summary == {'delete': 1, 'insert': 1, 'upsert': 2, 'update': 0, 'move': 2}
+    assert positions(client) == [(1, 1, 2), (2, 1, 1), (4, 2, 1)]
+    assert client.data['guests'][0]['first_name'] == "Paul"
+    assert list_journals(str(tmp_path)) == [mutation.path]
+    header, steps, inserted, done, undone = read_journal(mutation.path)
+    assert header['steps'] == 4 and done == {0, 1, 2, 3} and not undone
+    assert steps[0]['before'] == [{'id': 3, 'guest_id': 3, 'table_id': 2, 'seat_number': 1}]
+    assert len(inserted[1]) == 1
+
+
+def test_undo_restores_the_initial_state(tmp_path):
+    client = make_client()
+    initial = copy.deepcopy(client.data)
+    mutation = plan(client, tmp_path)
+    mutation.apply()
+
+    summary = undo(client, mutation.path)
+
+    assert summary['removed'] == 2
+    assert positions(client) == [(1, 1, 1), (2, 1, 2), (3, 2, 1)]
+    assert sorted((g['id'], g['first_name']) for g in client.data['guests']) == \
+        sorted((g['id'], g['first_name']) for g in initial['guests'])
+    assert read_journal(mutation.path)[4]
+
+
+def test_undo_of_an_interrupted_run(tmp_path):
+    client = make_client()
+    mutation = plan(client, tmp_path)
+    real_table = client.table
+    calls = []
+
+    def failing_table(name):
+        # Trois photos, suppression, insertion, siège garé: panne avant la place définitive
+        calls.append(name)
+        if len(calls) == 7:
+            raise ConnectionError("réseau indisponible")
+        return real_table(name)
+
+    client.table = failing_table
+    try:
+        mutation.apply()
+    except ConnectionError:
+        pass
+    client.table = real_table
+    assert read_journal(mutation.path)[3] == {0, 1}
+    assert (1, 1, -1) in positions(client)
+
+    undo(client, mutation.path)
+    assert positions(client) == [(1, 1, 1), (2, 1, 2), (3, 2, 1)]
+
+
+def test_empty_plan_writes_nothing(tmp_path):
+    client = make_client()
+    mutation = BulkMutation(client, 'vide', str(tmp_path))
+    mutation.delete('guests', 'id', [])
+
+    assert len(mutation) == 0
+    assert mutation.apply() == {'delete': 0, 'insert': 0, 'upsert': 0, 'update': 0, 'move': 0}
+    assert mutation.path is None and client.round_trips == 0
+
+
+def test_update_touches_only_its_columns_and_undo_restores_them(tmp_path):
+    client = make_client()
+    for guest, mask in zip(client.data['guests'], (0, 1, 1, 4)):
+        guest['events_mask'] = mask
+    mutation = BulkMutation(client, 'masques', str(tmp_path))
+    mutation.update('guests', {'events_mask': 7}, 'id', [1, 2, 4])
+    mutation.apply()
+    # Nom corrigé par un autre poste après l'écriture
+    client.data['guests'][1]['first_name'] = "Pierre"
+
+    assert [g['events_mask'] for g in client.data['guests']] == [7, 7, 1, 7]
+    assert read_journal(mutation.path)[1][0]['before'] == [
+        {'id': 1, 'events_mask': 0}, {'id': 2, 'events_mask': 1}, {'id': 4, 'events_mask': 4}]
+
+    client.reset_counters()
+    undo(client, mutation.path)
+
+    assert [g['events_mask'] for g in client.data['guests']] == [0, 1, 1, 4]
+    assert client.data['guests'][1]['first_name'] == "Pierre"
+    assert client.calls[('guests', 'update')] == 3
@@ -0,0 +1,144 @@
+"""diff_plan / apply_diff: n'écrire que l'écart entre le plan CSV et la base"""
+
+from csv_ingest import GuestRecord
+from fake_supabase import FakeClient
+from plan_diff import apply_diff, diff_plan, load_current_state, plan_diff
+
+
+def record(line, first_name, last_name, table=None):
+    return GuestRecord(line, last_name, first_name, "", (), table)
+
+
+def make_client(guests, assignments=(), capacities=None):
+    capacities = capacities or {1: 10, 2: 10, 3: 10}
+    return FakeClient({
+        'guests': [{'id': i, 'first_name': first, 'last_name': last} for i, first, last in guests],
+        'tables': [{'id': t, 'table_number': t, 'capacity': c} for t, c in capacities.items()],
+        'seating_assignments': [{'id': i, 'guest_id': g, 'table_id': t, 'seat_number': s}
+                                for i, (g, t, s) in enumerate(assignments, 1)],
+    })
+
+
+def positions(client):
+    return {r['guest_id']: (r['table_id'], r['seat_number']) for r in client.data['seating_assignments']}
+
+
+def compute(client, plan, prune=False, allow_fuzzy=False):
+    index, assignments, capacities = load_current_state(client)
+    return diff_plan(plan, index, assignments, prune, capacities, allow_fuzzy)
+
+
+GUESTS = [(1, "Awa", "Diallo"), (2, "Jean", "Kalou"), (3, "Marie", "Ngoma"), (4, "Paul", "Sossa")]
+
+
+def test_diff_lists_only_changes_and_apply_writes_them():
+    client = make_client(GUESTS, [(1, 1, 1), (2, 1, 2), (4, 3, 1)])
+    plan = [(record(1, "awa", "DIALLO"), 1), (record(2, "Jean", "Kalou"), 2), (record(3, "Marie", "Ngoma"), 1)]
+
+    diff = compute(client, plan, prune=True)
+
+    assert [guest['id'] for guest, _ in diff['unchanged']] == [1]
+    assert [(guest['id'], table, seat) for guest, _, table, seat in diff['moves']] == [(2, 2, 1)]
+    # Le siège 2 libéré par le départ de Jean est repris
+    assert [(guest['id'], table, seat) for guest, table, seat in diff['inserts']] == [(3, 1, 2)]
+    assert [a['guest_id'] for a in diff['removals']] == [4]
+
+    client.reset_counters()
+    written = apply_diff(client, diff, prune=True)
+
+    assert written == {'removed': 1, 'moved': 1, 'inserted': 1}
+    assert positions(client) == {1: (1, 1), 2: (2, 1), 3: (1, 2)}
+    assert client.round_trips == 4
+
+
+def test_without_prune_removals_are_only_reported():
+    client = make_client(GUESTS, [(1, 1, 1), (4, 1, 2)])
+
+    diff = compute(client, [(record(1, "Awa", "Diallo"), 1), (record(2, "Jean", "Kalou"), 1)])
+    apply_diff(client, diff)
+
+    # Le siège 2 de l'invité absent du plan reste occupé
+    assert [(guest['id'], seat) for guest, _, seat in diff['inserts']] == [(2, 3)]
+    assert positions(client) == {1: (1, 1), 4: (1, 2), 2: (1, 3)}
+
+
+def test_full_table_leaves_guests_unplaced():
+    client = make_client(GUESTS, [(1, 1, 1)], {1: 2, 2: 10})
+    plan = [(record(1, "Awa", "Diallo"), 1), (record(2, "Jean", "Kalou"), 1), (record(3, "Marie", "Ngoma"), 1)]
+
+    diff = compute(client, plan)
+    apply_diff(client, diff)
+
+    assert [guest['id'] for guest, _, _ in diff['inserts']] == [2]
+    assert [(guest['id'], table) for guest, table in diff['unplaced']] == [(3, 1)]
+    assert set(positions(client)) == {1, 2}
+
+
+def test_move_into_table_freed_by_another_move():
+    # Table 2 pleine: Awa n'y entre qu'après le départ de Jean vers la table 1
+    client = make_client(GUESTS, [(1, 1, 1), (2, 2, 1)], {1: 1, 2: 1})
+    plan = [(record(1, "Awa", "Diallo"), 2), (record(2, "Jean", "Kalou"), 1)]
+
+    diff = compute(client, plan)
+    apply_diff(client, diff)
+
+    assert diff['unplaced'] == []
+    assert positions(client) == {1: (2, 1), 2: (1, 1)}
+
+
+def test_uncertain_match_is_held_and_never_pruned():
+    client = make_client([(1, "Gisele Valerie Marie", "SAIH"), (2, "Jean", "Kalou")], [(1, 1, 1)])
+    plan = [(record(1, "Gisèle Valérie", "SAIH"), 2), (record(2, "Jean", "Kalou"), 2)]
+
+    diff = compute(client, plan, prune=True)
+
+    assert [(rec.line, guest['id'], method) for rec, guest, method in diff['uncertain']] == [(1, 1, 'tokens')]
+    assert diff['removals'] == [] and diff['moves'] == []
+    assert diff['methods'] == {2: 'exact'}
+
+    diff = compute(client, plan, prune=True, allow_fuzzy=True)
+    assert [(guest['id'], table) for guest, _, table, _ in diff['moves']] == [(1, 2)]
+    assert diff['methods'][1] == 'tokens'
+
+
+def test_exact_homonyms_each_take_a_guest():
+    client = make_client([(1, "Enfant", "Nganga"), (2, "Enfant", "Nganga"), (3, "Jean", "Kalou")])
+    plan = [(record(1, "Enfant", "Nganga"), 3), (record(2, "Enfant", "Nganga"), 3),
+            (record(3, "Enfant", "Nganga"), 3), (record(4, "Inconnu", "Personne"), 3)]
+
+    diff = compute(client, plan)
+
+    assert sorted(guest['id'] for guest, _, _ in diff['inserts']) == [1, 2]
+    assert [rec.line for rec, _ in diff['duplicates']] == [3]
+    assert [rec.line for rec in diff['not_found']] == [4]
+
+
+def test_plan_diff_inherits_block_table_numbers():
+    client = make_client(GUESTS)
+    records = [record(1, "Awa", "Diallo", 2), record(2, "Jean", "Kalou"), record(3, "Marie", "Ngoma", 3)]
+
+    diff, capacities = plan_diff(client, records)
+
+    assert capacities == {1: 10, 2: 10, 3: 10}
+    assert [(guest['id'], table) for guest, table, _ in diff['inserts']] == [(1, 2), (2, 2), (3, 3)]
+
+
+def test_move_waits_for_a_departure_from_a_full_table():
+    client = make_client(GUESTS, [(1, 1, 1), (2, 2, 1)], {1: 1, 2: 1, 3: 1})
+    plan = [(record(1, "Awa", "Diallo"), 2), (record(2, "Jean", "Kalou"), 3)]
+
+    diff = compute(client, plan)
+    apply_diff(client, diff)
+
+    assert positions(client) == {1: (2, 1), 2: (3, 1)}
+
+
+def test_blocked_cycle_keeps_everyone_in_place():
+    # Awa et Jean échangeraient, mais Marie veut aussi la table 2: aucun déplacement
+    client = make_client(GUESTS, [(1, 1, 1), (2, 2, 1), (3, 3, 1)], {1: 1, 2: 1, 3: 1})
+    plan = [(record(1, "Awa", "Diallo"), 2), (record(2, "Jean", "Kalou"), 1), (record(3, "Marie", "Ngoma"), 2)]
+
+    diff = compute(client, plan)
+
+    assert diff['moves'] == []
+    assert sorted(guest['id'] for guest, _ in diff['unplaced']) == [1, 2, 3]
@@ -0,0 +1,109 @@
+"""ReadCache / CachedClient: succès, expiration et invalidation par les écritures"""
+
+from fake_supabase import FakeClient
+from read_cache import CachedClient, ReadCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_cached(max_entries=256):
+    client = FakeClient({
+        'guests': [{'id': 1, 'first_name': "Jean", 'last_name': "Kalou", 'checked_in': False}],
+        'tables': [{'id': 1, 'table_number': 1, 'capacity': 10}],
+        'seating_assignments': [{'id': 1, 'guest_id': 1, 'table_id': 1, 'seat_number': 1}],
+    })
+    clock = Clock()
+    cached = CachedClient(client, ReadCache(clock=clock, max_entries=max_entries))
+    return client, cached, clock
+
+
+def read(cached, source, columns="*"):
+    return cached.table(source).select(columns).execute().data
+
+
+def test_identical_reads_hit_and_different_filters_miss():
+    client, cached, _ = make_cached()
+
+    read(cached, 'tables')
+    read(cached, 'tables')
+    cached.table('tables').select("*").eq('table_number', 1).execute()
+
+    assert client.calls[('tables', 'select')] == 2
+    stats = {row['source']: row for row in cached.cache.summary()}
+    assert stats['tables']['hits'] == 1 and stats['tables']['misses'] == 2
+
+
+def test_cached_rows_are_copies():
+    _, cached, _ = make_cached()
+
+    read(cached, 'tables')[0]['capacity'] = 99
+
+    assert read(cached, 'tables')[0]['capacity'] == 10
+
+
+def test_entries_expire_after_their_ttl():
+    client, cached, clock = make_cached()
+    read(cached, 'table_status')
+
+    clock.now += cached.cache.ttl('table_status') + 1
+    read(cached, 'table_status')
+
+    assert client.calls[('table_status', 'select')] == 2
+
+
+def test_guest_write_invalidates_views_assignments_and_occupancy():
+    client, cached, _ = make_cached()
+    for source in ('all_guests_status', 'table_status', 'seating_assignments', 'tables'):
+        read(cached, source)
+    cached.cache.put(('table_occupancy', ()), object())
+    cached.cache.put(('table_occupancy_status', ()), object())
+
+    cached.table('guests').update({'checked_in': True}).eq('id', 1).execute()
+
+    remaining = {key[0] for key in cached.cache.entries}
+    assert remaining == {'tables'}
+    assert read(cached, 'all_guests_status')[0]['checked_in'] is True
+
+
+def test_assignment_write_invalidates_dependent_views_only():
+    _, cached, _ = make_cached()
+    for source in ('guests', 'table_status', 'seating_assignments'):
+        read(cached, source)
+
+    cached.table('seating_assignments').delete().eq('id', 1).execute()
+
+    assert {key[0] for key in cached.cache.entries} == {'guests'}
+
+
+def test_rpc_clears_everything_and_failed_writes_still_invalidate():
+    _, cached, _ = make_cached()
+    read(cached, 'tables')
+    read(cached, 'guests')
+
+    try:
+        cached.table('guests').insert({'id': 1, 'first_name': "Double", 'last_name': "Id"}).execute()
+    except Exception:
+        pass
+    assert {key[0] for key in cached.cache.entries} == {'tables'}
+
+    try:
+        cached.rpc('inconnue', {}).execute()
+    except Exception:
+        pass
+    assert not cached.cache.entries
+
+
+def test_least_recently_used_entry_is_evicted():
+    _, cached, _ = make_cached(max_entries=2)
+    read(cached, 'tables')
+    read(cached, 'guests')
+    read(cached, 'tables')
+    read(cached, 'seating_assignments')
+
+    assert {key[0] for key in cached.cache.entries} == {'tables', 'seating_assignments'}
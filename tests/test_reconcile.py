@@ -0,0 +1,73 @@
+"""reconcile_assignments: nombre de requêtes constant, sièges bornés par la capacité"""
+
+import pytest
+
+from fake_supabase import FakeClient
+from name_index import NameIndex
+from reconcile import reconcile_assignments
+
+
+def make_world(count):
+    guests = [{'id': i, 'first_name': f"P{i}", 'last_name': f"N{i}"} for i in range(1, count + 1)]
+    client = FakeClient({
+        'guests': guests,
+        'tables': [{'id': t, 'table_number': t, 'capacity': 100} for t in range(1, 5)],
+    })
+    wanted = [(f"P{i}", f"N{i}", i % 4 + 1) for i in range(1, count + 1)] + [("Inconnu", "X", 1)]
+    return client, guests, wanted
+
+
+@pytest.mark.parametrize('count', [3, 300])
+def test_request_count_does_not_grow_with_guests(count):
+    client, guests, wanted = make_world(count)
+
+    report = reconcile_assignments(client, wanted)
+
+    assert client.round_trips == 6
+    assert len(report['assigned']) == count
+    assert report['not_found'] == [("Inconnu", "X")]
+    assert len(client.data['seating_assignments']) == count
+
+
+@pytest.mark.parametrize('count', [3, 300])
+def test_name_index_resolves_without_requests(count):
+    client, guests, wanted = make_world(count)
+
+    reconcile_assignments(client, wanted, NameIndex(guests))
+
+    assert client.round_trips == 4
+    assert client.calls[('guests', 'select')] == 0
+
+
+def test_second_run_reports_already_assigned_and_full_tables():
+    client = FakeClient({
+        'guests': [{'id': i, 'first_name': f"P{i}", 'last_name': "N"} for i in (1, 2, 3)],
+        'tables': [{'id': 1, 'table_number': 1, 'capacity': 2}],
+        'seating_assignments': [{'id': 1, 'guest_id': 1, 'table_id': 1, 'seat_number': 2}],
+    })
+    guests = client.data['guests']
+
+    report = reconcile_assignments(client, [("P1", "N", 1), ("P2", "N", 1), ("P3", "N", 1)],
+                                   NameIndex(guests))
+
+    assert report['already_assigned'] == [("P1", "N")]
+    assert report['assigned'] == [("P2", "N", 1)]
+    assert report['table_full'] == [("P3", "N", 1)]
+    assert {r['guest_id']: r['seat_number'] for r in client.data['seating_assignments']} == {1: 2, 2: 1}
+
+
+def test_uncertain_matches_are_reported_not_seated():
+    guests = [{'id': 1, 'first_name': "Gisele Valerie Marie", 'last_name': "SAIH"},
+              {'id': 2, 'first_name': "Marie Adela", 'last_name': "FONANTE"},
+              {'id': 3, 'first_name': "Gwladys", 'last_name': "Mazamba"}]
+    client = FakeClient({'guests': guests,
+                         'tables': [{'id': t, 'table_number': t, 'capacity': 10} for t in (18, 20)]})
+
+    report = reconcile_assignments(client, [("Gisèle Valérie", "SAIH", 20), ("Marie Adéla", "FONANT", 18),
+                                            ("gwladys", " MAZAMBA", 20)], NameIndex(guests))
+
+    assert report['assigned'] == [("gwladys", " MAZAMBA", 20)]
+    assert [(first, method) for first, _, _, _, method in report['uncertain']] == \
+        [("Gisèle Valérie", 'tokens'), ("Marie Adéla", 'fuzzy')]
+    assert report['not_found'] == []
+    assert [r['guest_id'] for r in client.data['seating_assignments']] == [3]
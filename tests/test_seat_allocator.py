@@ -0,0 +1,114 @@
+"""SeatAllocator: trous réutilisés, capacité, écriture des déplacements"""
+
+import pytest
+
+from fake_supabase import FakeAPIError, FakeClient
+from seat_allocator import SeatAllocator, write_moves
+
+
+def seated(*positions):
+    """Assignations (guest_id, table, seat) au format seating_assignments"""
+    return [{'id': guest_id, 'guest_id': guest_id, 'table_id': table, 'seat_number': seat}
+            for guest_id, table, seat in positions]
+
+
+def test_allocate_fills_holes_lowest_first():
+    seats = SeatAllocator({1: 10}, seated((1, 1, 1), (2, 1, 4), (3, 1, 6)))
+
+    assert [seats.allocate(1) for _ in range(5)] == [2, 3, 5, 7, 8]
+
+
+def test_allocate_stops_at_capacity():
+    seats = SeatAllocator({1: 3}, seated((1, 1, 2)))
+
+    assert [seats.allocate(1) for _ in range(3)] == [1, 3, None]
+    assert seats.free_count(1) == 0
+
+
+def test_seats_beyond_capacity_are_not_reused():
+    # Table surchargée en base: le siège 5 libéré n'est pas réattribué
+    seats = SeatAllocator({1: 4}, seated(*((g, 1, g) for g in range(1, 6))))
+
+    seats.unassign(5)
+    assert seats.allocate(1) is None
+    seats.unassign(2)
+    assert seats.allocate(1) == 2
+
+
+def test_table_without_capacity_is_unbounded():
+    seats = SeatAllocator({}, seated((1, 9, 1)))
+
+    assert seats.free_count(9) is None
+    assert [seats.allocate(9) for _ in range(3)] == [2, 3, 4]
+
+
+def test_move_keeps_old_seat_until_new_one_is_taken():
+    seats = SeatAllocator({1: 2, 2: 1}, seated((1, 1, 1), (2, 2, 1)))
+
+    assert seats.move_guest_to_seat(1, 2) is None
+    assert seats.seat_of[1] == (1, 1)
+    assert seats.move_guest_to_seat(1, 1, 2) == 2
+    assert seats.allocate(1) == 1
+
+
+def test_move_guests_swaps_or_rolls_back():
+    seats = SeatAllocator({1: 2}, seated((1, 1, 1), (2, 1, 2), (3, 1, 3)))
+
+    assert seats.move_guests([(1, 1, 2), (2, 1, 1)]) == 2
+    assert seats.seat_of[1] == (1, 2) and seats.seat_of[2] == (1, 1)
+
+    with pytest.raises(ValueError):
+        seats.move_guests([(1, 1, 1)])
+    assert seats.seat_of[1] == (1, 2)
+
+
+def test_changes_lists_only_differences():
+    seats = SeatAllocator({1: 10, 2: 10}, seated((1, 1, 1), (2, 1, 2), (3, 1, 3)))
+    seats.assign(1, 2)
+    seats.unassign(3)
+    seats.assign(4, 1)
+
+    changes = seats.changes()
+
+    assert changes['moves'] == [{'id': 1, 'guest_id': 1, 'table_id': 2, 'seat_number': 1}]
+    assert changes['removals'] == [{'id': 3, 'guest_id': 3, 'table_id': 1, 'seat_number': 3}]
+    assert changes['inserts'] == [{'guest_id': 4, 'table_id': 1, 'seat_number': 1}]
+
+
+def test_changes_refuses_moves_without_known_id():
+    seats = SeatAllocator({1: 10, 2: 10}, [{'guest_id': 1, 'table_id': 1, 'seat_number': 1}])
+    seats.assign(1, 2)
+
+    with pytest.raises(ValueError):
+        seats.changes()
+
+
+def test_write_moves_parks_rows_to_swap_seats():
+    client = FakeClient({'seating_assignments': seated((1, 1, 1), (2, 1, 2))})
+    swap = [{'id': 1, 'guest_id': 1, 'table_id': 1, 'seat_number': 2},
+            {'id': 2, 'guest_id': 2, 'table_id': 1, 'seat_number': 1}]
+
+    # Sans passage par un siège garé, UNIQUE(table_id, seat_number) refuse l'échange
+    with pytest.raises(FakeAPIError):
+        client.table('seating_assignments').upsert(swap, on_conflict='id').execute()
+
+    client = FakeClient({'seating_assignments': seated((1, 1, 1), (2, 1, 2))})
+    client.reset_counters()
+    assert write_moves(client, swap) == 2
+    assert {r['guest_id']: r['seat_number'] for r in client.data['seating_assignments']} == {1: 2, 2: 1}
+    assert client.round_trips == 2
+
+
+def test_write_then_write_again_uses_inserted_ids():
+    client = FakeClient({'tables': [{'id': 1, 'table_number': 1, 'capacity': 10},
+                                    {'id': 2, 'table_number': 2, 'capacity': 10}],
+                         'seating_assignments': seated((1, 1, 1))})
+    seats = SeatAllocator.load(client)
+    seats.assign(2, 1)
+    assert seats.write(client) == {'inserts': 1, 'moves': 0, 'removals': 0}
+
+    seats.assign(2, 2)
+    seats.unassign(1)
+    assert seats.write(client) == {'inserts': 0, 'moves': 1, 'removals': 1}
+    assert [(r['guest_id'], r['table_id'], r['seat_number'])
+            for r in client.data['seating_assignments']] == [(2, 2, 1)]
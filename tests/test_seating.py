@@ -0,0 +1,52 @@
+"""Placement groupé: solveur et écriture des QR codes"""
+
+from fake_supabase import FakeClient
+from seat_allocator import SeatAllocator
+from seating import load_seating_state, solve, write_placements
+
+
+def make_client():
+    return FakeClient({
+        'guests': [
+            {'id': 1, 'first_name': "Jean", 'last_name': "Kalou", 'email': "kalou@example.com"},
+            {'id': 2, 'first_name': "Awa", 'last_name': "Kalou", 'email': "kalou@example.com"},
+            {'id': 3, 'first_name': "Enfant 1", 'last_name': "Kalou", 'email': "kalou@example.com"},
+            {'id': 4, 'first_name': "Marie", 'last_name': "Ngoma", 'qr_code': "QR-4"},
+            {'id': 5, 'first_name': "Paul", 'last_name': "Sossa"},
+        ],
+        'tables': [{'id': 1, 'table_number': 1, 'capacity': 1},
+                   {'id': 2, 'table_number': 2, 'capacity': 2},
+                   {'id': 27, 'table_number': 27, 'capacity': 10}],
+        'seating_assignments': [{'id': 1, 'guest_id': 5, 'table_id': 1, 'seat_number': 1}],
+    })
+
+
+def test_households_stay_together_and_children_go_to_their_table():
+    seats = SeatAllocator({1: 1, 2: 2, 3: 4, 27: 10})
+    guests = [{'id': 1, 'first_name': "Jean", 'email': "k@x"}, {'id': 2, 'first_name': "Awa", 'email': "K@X "},
+              {'id': 3, 'first_name': "Enfant2", 'email': "k@x"}, {'id': 4, 'first_name': "Marie"}]
+
+    placements, unplaced = solve(seats, guests)
+
+    tables = {p['guest_id']: p['table_id'] for p in placements}
+    assert tables == {3: 27, 1: 2, 2: 2, 4: 1}
+    assert unplaced == []
+
+
+def test_write_placements_sets_only_missing_qr_codes():
+    client = make_client()
+    seats, guests = load_seating_state(client)
+    placements, unplaced = solve(seats, guests)
+    # Nom corrigé par un autre poste entre la lecture et l'écriture
+    client.data['guests'][0]['first_name'] = "Jean-Marc"
+
+    write_placements(client, placements, guests)
+
+    by_id = {g['id']: g for g in client.data['guests']}
+    assert by_id[1]['first_name'] == "Jean-Marc"
+    assert by_id[1]['qr_code'].startswith("WEDDING-1-")
+    assert by_id[4]['qr_code'] == "QR-4"
+    assert 'qr_code' not in by_id[5]
+    assert [g['id'] for g in unplaced] == [4]
+    assert client.calls[('guests', 'upsert')] == 0
+    assert len(client.data['seating_assignments']) == 4